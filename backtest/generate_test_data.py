@@ -0,0 +1,175 @@
+"""
+Vectorized synthetic tick generator for stress tests, benchmarks and offline
+backtests.
+
+    python -m backtest.generate_test_data --ticks 2000000 --seed 7 --out data/synthetic_ticks.csv
+"""
+import argparse
+import time
+from datetime import datetime
+
+import numpy as np
+
+from utils.symbol_spec import get_spec
+
+# Mean ticks per second by UTC hour: quiet Asia, busy London, busiest London/New York overlap
+SESSION_INTENSITY = np.array([
+    0.4, 0.4, 0.5, 0.5, 0.5, 0.6, 0.8,  # 00-06 Asia
+    2.5, 3.0, 3.0, 3.0, 2.5,  # 07-11 London
+    3.5, 4.0, 4.0, 3.5,  # 12-15 London/New York overlap
+    2.0, 1.5, 1.2, 1.0, 0.8,  # 16-20 New York
+    0.3, 0.3, 0.3,  # 21-23 rollover
+])
+
+# Typical spread in points by UTC hour (wide around rollover, tight in the overlap)
+SESSION_SPREAD_POINTS = np.array([
+    4, 4, 3, 3, 3, 3, 3,
+    2, 2, 2, 2, 2,
+    1, 1, 1, 2,
+    2, 2, 3, 3, 4,
+    8, 8, 6,
+])
+
+# Volatility regimes: per-tick noise in pips, spread widening factor, mean duration in ticks
+REGIMES = (
+    {"noise_pips": 0.08, "spread_factor": 1.0, "mean_ticks": 20000},  # calm
+    {"noise_pips": 0.15, "spread_factor": 1.2, "mean_ticks": 15000},  # normal
+    {"noise_pips": 0.35, "spread_factor": 2.0, "mean_ticks": 4000},  # volatile
+)
+REGIME_TRANSITIONS = np.array([
+    [0.0, 0.8, 0.2],
+    [0.6, 0.0, 0.4],
+    [0.3, 0.7, 0.0],
+])
+
+
+def _legs(rng, n, ticks_per_candle, flip_prob, range_prob):
+    """
+    Per-tick drift from alternating impulse and pullback legs, sized so the
+    strategy's impulse (8+ pips over 5+ candles) and 20-65% pullback rules fire.
+    Some pairs are flat ranges instead.
+    """
+    mean_pair = 10 * ticks_per_candle
+    pairs = n // mean_pair + 2
+    direction = np.where(np.cumsum(rng.random(pairs) < flip_prob) % 2 == 0, 1.0, -1.0)
+    impulse = rng.uniform(8.5, 12.0, pairs) * direction
+    impulse_len = rng.integers(5, 7, pairs) * ticks_per_candle
+    pullback = -impulse * rng.uniform(0.25, 0.5, pairs)
+    pullback_len = rng.integers(4, 8, pairs) * ticks_per_candle
+    flat = rng.random(pairs) < range_prob
+    impulse[flat] = 0.0
+    pullback[flat] = 0.0
+
+    moves = np.column_stack((impulse, pullback)).ravel()
+    lengths = np.column_stack((impulse_len, pullback_len)).ravel()
+    return np.repeat(moves / lengths, lengths)[:n]
+
+
+def _regimes(rng, n):
+    """Regime index per tick from a Markov chain with geometric durations."""
+    states = []
+    lengths = []
+    state = 1
+    total = 0
+    while total < n:
+        length = int(rng.geometric(1.0 / REGIMES[state]["mean_ticks"]))
+        states.append(state)
+        lengths.append(length)
+        total += length
+        state = int(rng.choice(len(REGIMES), p=REGIME_TRANSITIONS[state]))
+    return np.repeat(np.array(states, dtype=np.int8), lengths)[:n]
+
+
+def _arrival_times(rng, n, start, intensity):
+    """
+    Inhomogeneous Poisson arrivals with hourly intensities, weekends skipped.
+    Unit-rate arrivals are mapped through the inverse cumulative intensity.
+    Returns epoch milliseconds.
+    """
+    operational = np.cumsum(rng.exponential(1.0, n))
+    hourly = SESSION_INTENSITY * intensity
+    days = int(operational[-1] / (hourly.sum() * 3600) * 7 / 5) + 3
+    start_ms = int((start - datetime(1970, 1, 1)).total_seconds() * 1000)
+    hour_starts = start_ms - start_ms % 3_600_000 + np.arange(days * 24, dtype=np.int64) * 3_600_000
+    weekday = ((hour_starts // 86_400_000) + 3) % 7  # 0 = Monday
+    hour_starts = hour_starts[(weekday < 5) & (hour_starts >= start_ms - start_ms % 3_600_000)]
+    rates = hourly[(hour_starts // 3_600_000) % 24]
+
+    cumulative = np.concatenate(([0.0], np.cumsum(rates * 3600.0)))
+    idx = np.searchsorted(cumulative, operational, side="right") - 1
+    offset_s = (operational - cumulative[idx]) / rates[idx]
+    times = hour_starts[idx] + (offset_s * 1000).astype(np.int64)
+    return np.maximum(times, start_ms)
+
+
+def generate_ticks(n, seed=None, symbol="EURUSD", start=datetime(2026, 1, 5), start_price=1.1,
+                   ticks_per_candle=70, intensity=1.0, flip_prob=0.15, range_prob=0.15, spike_prob=0.0005):
+    """
+    Generates `n` ticks as NumPy arrays: `time_msc` (int64 epoch ms, UTC), `bid`, `ask`, `spread`.
+
+    Price follows trending impulse/pullback legs plus regime-switching noise.
+    Spreads follow the hour of day and the volatility regime, with short-lived
+    spikes. Tick arrival rate follows the trading session. Output is
+    reproducible for a given `seed`.
+    """
+    rng = np.random.default_rng(seed)
+    spec = get_spec(symbol)
+
+    regimes = _regimes(rng, n)
+    noise = np.array([r["noise_pips"] for r in REGIMES])[regimes] * rng.standard_normal(n)
+    mid = start_price + np.cumsum(_legs(rng, n, ticks_per_candle, flip_prob, range_prob) + noise) * spec.pip
+    time_msc = _arrival_times(rng, n, start, intensity)
+
+    hours = (time_msc // 3_600_000) % 24
+    spread_points = SESSION_SPREAD_POINTS[hours] * np.array([r["spread_factor"] for r in REGIMES])[regimes]
+    spread_points += rng.integers(0, 2, n)
+    # Spikes decay over a few ticks
+    spikes = (rng.random(n) < spike_prob) * rng.uniform(5, 20, n)
+    spread_points += np.convolve(spikes, np.array([1.0, 0.7, 0.45, 0.25, 0.1]))[:n]
+    spread_points = np.maximum(np.round(spread_points), 1)
+
+    digits = spec.digits
+    bid = np.round(mid - spread_points * spec.point / 2, digits)
+    ask = np.round(bid + spread_points * spec.point, digits)
+    return {"time_msc": time_msc, "bid": bid, "ask": ask, "spread": ask - bid}
+
+
+def to_ticks(arrays, symbol="EURUSD"):
+    """Converts generated arrays into the tick dicts used by `ReplayEngine` and the live pipeline."""
+    timestamps = arrays["time_msc"].astype("datetime64[ms]").astype(datetime).tolist()
+    return [
+        {"symbol": symbol, "bid": bid, "ask": ask, "spread": spread, "time_msc": msc, "timestamp": ts}
+        for bid, ask, spread, msc, ts in zip(arrays["bid"].tolist(), arrays["ask"].tolist(),
+                                             arrays["spread"].tolist(), arrays["time_msc"].tolist(), timestamps)
+    ]
+
+
+def write_csv(arrays, path, digits=5):
+    """Writes a CSV that `DataLoader.load_from_csv` and the replay broker read."""
+    timestamps = np.datetime_as_string(arrays["time_msc"].astype("datetime64[ms]"), unit="ms")
+    with open(path, "w") as f:
+        f.write("timestamp,bid,ask,time_msc\n")
+        for ts, bid, ask, msc in zip(timestamps.tolist(), arrays["bid"].tolist(), arrays["ask"].tolist(),
+                                     arrays["time_msc"].tolist()):
+            f.write(f"{ts},{bid:.{digits}f},{ask:.{digits}f},{msc}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic ticks")
+    parser.add_argument("--ticks", type=int, default=1000000, help="Number of ticks (default: 1000000)")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible output")
+    parser.add_argument("--symbol", type=str, default="EURUSD")
+    parser.add_argument("--start", type=str, default="2026-01-05", help="First trading day (UTC)")
+    parser.add_argument("--out", type=str, default="data/synthetic_ticks.csv")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    arrays = generate_ticks(args.ticks, seed=args.seed, symbol=args.symbol, start=datetime.fromisoformat(args.start))
+    elapsed = time.perf_counter() - start
+    print(f"Generated {args.ticks:,} ticks in {elapsed:.2f}s ({args.ticks / elapsed:,.0f} ticks/s)")
+    write_csv(arrays, args.out, digits=get_spec(args.symbol).digits)
+    print(f"Saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import math
+from collections import Counter, deque
+from risk.risk_engine import RiskEngine
+from runtime.symbol_pipeline import SymbolPipeline
+from utils.news_filter import load_calendar
+from utils.session_journal import DECISIONS, SessionJournal, read_journal
+from utils.symbol_spec import SPECS, SymbolSpec
+from utils.time_utils import load_sessions
+
+
+def _same(a, b):
+    """Equality that treats NaN as equal to itself, for indicator values."""
+    if isinstance(a, float) and isinstance(b, float):
+        return a == b or (math.isnan(a) and math.isnan(b))
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+class JournalReplay:
+    """
+    Re-runs a recorded session through freshly built pipelines and diffs every
+    decision (candle, indicators, state transition, signal) against the one
+    recorded after the same tick.
+
+    Pipelines are built from the journaled config and symbol specs and start
+    from the journaled state, so a replay of an unmodified tree reproduces the
+    recording exactly; any mismatch is a real behaviour difference.
+    """
+
+    def __init__(self, max_mismatches=20):
+        self.max_mismatches = max_mismatches
+        self.config = None
+        self.risk_engine = None
+        self.journal = None
+        self.pipelines = {}
+        self.pending = {}  # symbol -> decisions the replay made that the recording hasn't confirmed yet
+        self.capture = None
+        self.tick_index = 0
+        self.last_tick = {}
+        self.counts = Counter()
+        self.matched = Counter()
+        self.mismatches = []
+        self.mismatch_count = 0
+
+    def run(self, records):
+        for wall_ns, kind, symbol, data in records:
+            self.counts[kind] += 1
+            if kind == "session":
+                self._start_session(data)
+            elif kind == "state":
+                self._load_state(symbol, data)
+            elif kind == "tick":
+                self._replay_tick(symbol, *data)
+            elif kind in DECISIONS:
+                self._check(symbol, kind, data)
+        for symbol in self.pending:
+            self._flush_unconfirmed(symbol)
+        return self.report()
+
+    def _start_session(self, session):
+        config = session["config"]
+        self.config = config
+        for spec in session["specs"]:
+            SPECS.register(SymbolSpec.from_dict(spec))
+        load_calendar(config)
+        load_sessions(config)
+        self.risk_engine = RiskEngine.from_config(config)
+        self.journal = SessionJournal()
+        self.capture = self.journal.capture()
+        self.pipelines.clear()
+        self.pending.clear()
+
+    def _load_state(self, symbol, state):
+        pipeline = SymbolPipeline.from_config(symbol, self.risk_engine, self.config)
+        pipeline.load_state(state)
+        pipeline.journal = self.journal
+        self.pipelines[symbol] = pipeline
+        self.pending[symbol] = deque()
+
+    def _replay_tick(self, symbol, tick, live):
+        pipeline = self.pipelines.get(symbol)
+        if pipeline is None:
+            return
+        # Decisions follow their tick in the recording, so anything left is extra
+        self._flush_unconfirmed(symbol)
+        self.tick_index += 1
+        self.last_tick[symbol] = tick
+        pipeline.on_tick(tick, live=live)
+        self._drain(symbol)
+
+    def _drain(self, symbol):
+        pending = self.pending[symbol]
+        for _, kind, _, data in self.capture:
+            if kind in DECISIONS:
+                pending.append((kind, data))
+        self.capture.clear()
+
+    def _flush_unconfirmed(self, symbol):
+        pending = self.pending[symbol]
+        while pending:
+            kind, data = pending.popleft()
+            self._mismatch(symbol, kind, None, (kind, data))
+
+    def _check(self, symbol, kind, recorded):
+        pending = self.pending.get(symbol)
+        if pending is None:
+            return
+        if not pending:
+            self._mismatch(symbol, kind, recorded, None)
+            return
+        replayed_kind, replayed = pending.popleft()
+        if replayed_kind == kind and _same(recorded, replayed):
+            self.matched[kind] += 1
+        else:
+            self._mismatch(symbol, kind, recorded, (replayed_kind, replayed))
+
+    def _mismatch(self, symbol, kind, recorded, replayed):
+        self.mismatch_count += 1
+        if len(self.mismatches) < self.max_mismatches:
+            tick = self.last_tick.get(symbol) or {}
+            self.mismatches.append({
+                "symbol": symbol, "kind": kind, "tick": self.tick_index, "time_msc": tick.get("time_msc"),
+                "recorded": recorded, "replayed": replayed,
+            })
+
+    def report(self):
+        return {
+            "records": dict(self.counts),
+            "ticks": self.tick_index,
+            "matched": dict(self.matched),
+            "mismatches": self.mismatch_count,
+            "first_mismatches": self.mismatches,
+        }
+
+
+def replay_journal(path, max_mismatches=20):
+    """Replays one journal file; returns the diff report."""
+    return JournalReplay(max_mismatches).run(read_journal(path))
@@ -1,17 +1,34 @@
 import logging
+from collections import OrderedDict
 from datetime import datetime
+from data.broker import BrokerBackend
 
-class MockMT5Adapter:
-    def __init__(self):
+class MockMT5Adapter(BrokerBackend):
+    def __init__(self, balance=10000.0, deal_history=1000):
         self.connected = True
         self.current_tick = None
         self.positions = {}
+        self.close_deals = OrderedDict()  # ticket -> closing deal, the newest `deal_history` kept
+        self.deal_history = deal_history
         self.next_ticket = 1000
+        self.balance = balance
 
-    def connect(self):
+    def connect(self, login=None, password=None, server=None, magic=None):
         self.connected = True
         return True
 
+    def get_account_info(self):
+        return {
+            "login": 0,
+            "balance": self.balance,
+            "equity": self.balance,
+            "margin": 0.0,
+            "margin_free": self.balance,
+            "margin_level": 0.0,
+            "leverage": 0,
+            "currency": "USD"
+        }
+
     def shutdown(self):
         self.connected = False
 
@@ -21,10 +38,17 @@ class MockMT5Adapter:
     def set_tick(self, tick):
         self.current_tick = tick
 
+    def get_spread(self, symbol):
+        if self.current_tick is None:
+            return float("inf")
+        return self.current_tick["ask"] - self.current_tick["bid"]
+
     def place_market_order(self, symbol, direction, volume, sl, tp, comment=""):
         ticket = self.next_ticket
         self.next_ticket += 1
-        self.positions[ticket] = {"symbol": symbol, "type": 0 if direction == "BUY" else 1, "volume": volume, "sl": sl, "tp": tp, "price": self.current_tick["ask"] if direction == "BUY" else self.current_tick["bid"]}
+        price = self.current_tick["ask"] if direction == "BUY" else self.current_tick["bid"]
+        self.positions[ticket] = {"symbol": symbol, "type": 0 if direction == "BUY" else 1, "volume": volume, "sl": sl, "tp": tp, "price": price}
+        self.last_fill = {"ticket": ticket, "price": price, "time_msc": self.current_tick.get("time_msc")}
         return ticket
 
     def modify_sl(self, ticket, new_sl):
@@ -36,12 +60,29 @@ class MockMT5Adapter:
     def position_exists(self, ticket):
         return ticket in self.positions
 
+    def get_positions(self, magic=None):
+        return [
+            {"ticket": ticket, "symbol": pos["symbol"], "direction": "BUY" if pos["type"] == 0 else "SELL",
+             "volume": pos["volume"], "price_open": pos["price"], "sl": pos["sl"], "tp": pos["tp"]}
+            for ticket, pos in self.positions.items()
+        ]
+
+    def get_close_deal(self, ticket):
+        return self.close_deals.get(ticket)
+
     def close_position(self, ticket):
         if ticket in self.positions:
-            del self.positions[ticket]
+            pos = self.positions.pop(ticket)
+            tick = self.current_tick
+            self._record_close(ticket, tick["bid"] if pos["type"] == 0 else tick["ask"])
             return True
         return False
 
+    def _record_close(self, ticket, price):
+        self.close_deals[ticket] = {"price": price, "time_msc": self.current_tick.get("time_msc")}
+        if len(self.close_deals) > self.deal_history:
+            self.close_deals.popitem(last=False)
+
     def check_sl_tp(self):
         if not self.current_tick:
             return []
@@ -56,5 +97,7 @@ class MockMT5Adapter:
                 if ask >= pos["sl"]: closed_tickets.append((ticket, "SL"))
                 elif ask <= pos["tp"]: closed_tickets.append((ticket, "TP"))
         for ticket, reason in closed_tickets:
-            del self.positions[ticket]
+            pos = self.positions.pop(ticket)
+            # Stops fill at their level, as in the simulator
+            self._record_close(ticket, pos["sl"] if reason == "SL" else pos["tp"])
         return closed_tickets
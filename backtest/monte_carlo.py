@@ -0,0 +1,189 @@
+import math
+import numpy as np
+from backtest.performance import _seconds, _session_of
+from risk.risk_engine import RiskEngine
+
+METHODS = ("bootstrap", "shuffle", "sessions")
+PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+# Upper bound on simulated trade slots held in memory at once (~32 MB of float64)
+CHUNK_ELEMENTS = 1 << 22
+
+
+def trade_sessions(trades):
+    """`(profits, session keys)` of `ReplayEngine.completed_trades`; keys are the UTC day of the close."""
+    profits = [t["profit"] for t in trades]
+    sessions = [_session_of(_seconds(t["close_time"])) if t.get("close_time") is not None else None for t in trades]
+    return profits, sessions
+
+
+def apply_risk_limits(candidates, max_trades_session, max_consecutive_losses):
+    """
+    Trades `RiskEngine` would take from `candidates` of shape (..., sessions,
+    slots): NaN slots are no setup, each session starts with fresh counters,
+    takes at most `max_trades_session` and halts after
+    `max_consecutive_losses` losses in a row. Returns the taken profits (0
+    where skipped), the trades taken and a boolean "halted" per session.
+    """
+    shape = candidates.shape[:-1]
+    taken = np.zeros(candidates.shape)
+    count = np.zeros(shape, dtype=np.int32)
+    run = np.zeros(shape, dtype=np.int32)
+    halted = np.zeros(shape, dtype=bool)
+    # Slots per session are few, so the loop is over slots, vectorized over every path and session
+    for k in range(candidates.shape[-1]):
+        x = candidates[..., k]
+        take = ~np.isnan(x) & ~halted & (count < max_trades_session)
+        count += take
+        loss = take & (x <= 0)
+        run = np.where(loss, run + 1, np.where(take, 0, run))
+        halted |= run >= max_consecutive_losses
+        taken[..., k] = np.where(take, x, 0.0)
+    return taken, count, halted
+
+
+class MonteCarloReport:
+    """
+    Per-path outcomes of a Monte Carlo run over resampled trade sequences:
+    `max_drawdown`, `net`, `profit_factor`, `min_equity` and `trades` (all in
+    pips or counts, one entry per path) plus the share of halted sessions.
+    """
+
+    def __init__(self, method, paths, sessions, max_drawdown, net, profit_factor, min_equity, trades,
+                 halted_sessions, ruin_levels):
+        self.method = method
+        self.paths = paths
+        self.sessions = sessions
+        self.max_drawdown = max_drawdown
+        self.net = net
+        self.profit_factor = profit_factor
+        self.min_equity = min_equity
+        self.trades = trades
+        self.halted_sessions = halted_sessions
+        self.ruin_levels = ruin_levels
+
+    def ruin_probability(self, level):
+        """Share of paths whose equity fell `level` pips or more below the start."""
+        return float(np.mean(self.min_equity <= -level))
+
+    def summary(self):
+        def dist(values):
+            # "nearest" keeps infinite profit factors from turning percentiles into NaN
+            return dict(zip(PERCENTILES, np.percentile(values, PERCENTILES, method="nearest").tolist()))
+
+        return {
+            "method": self.method,
+            "paths": self.paths,
+            "sessions": self.sessions,
+            "max_drawdown": dict(dist(self.max_drawdown), mean=float(self.max_drawdown.mean())),
+            "net": dict(dist(self.net), mean=float(self.net.mean())),
+            "profit_factor": dist(self.profit_factor),
+            "trades": float(self.trades.mean()),
+            "halted_sessions": self.halted_sessions,
+            "losing_paths": float(np.mean(self.net <= 0)),
+            "ruin": {level: self.ruin_probability(level) for level in self.ruin_levels},
+        }
+
+    def display(self):
+        s = self.summary()
+        print("\n" + "="*40 + "\n🎲 MONTE CARLO ROBUSTNESS\n" + "="*40)
+        print(f"Paths:           {s['paths']:,} ({s['method']}, {s['sessions']} sessions each)")
+        print(f"Trades/Path:     {s['trades']:.1f} | Halted Sessions: {s['halted_sessions'] * 100:.1f}%")
+        print("Percentile:      " + " ".join(f"{f'p{p}':>8}" for p in PERCENTILES))
+        for key, label in (("max_drawdown", "Max Drawdown:   "), ("net", "Net Profit:     "), ("profit_factor", "Profit Factor:  ")):
+            print(f"{label} " + " ".join(f"{s[key][p]:8.2f}" for p in PERCENTILES))
+        print(f"Losing Paths:    {s['losing_paths'] * 100:.1f}%")
+        for level, p in s["ruin"].items():
+            print(f"Ruin (-{level:g} pips): {p * 100:.2f}%")
+        print("="*40 + "\n")
+
+
+def simulate(profits, sessions=None, method="bootstrap", paths=100000, n_sessions=None, session_size=None,
+             risk_engine=None, ruin_levels=(50, 100, 200), seed=None):
+    """
+    Resamples trade results (pips) into `paths` equity paths in batched numpy
+    passes and re-applies the risk engine's per-session limits to each path.
+
+    - "bootstrap": every session draws `session_size` setups with replacement
+    - "shuffle": each path is a permutation of all results, cut into sessions
+      of `session_size` setups
+    - "sessions": every session is one recorded session (its setups in order)
+      drawn with replacement; needs `sessions`, one key per result
+
+    `session_size` defaults to the observed setups per recorded session (the
+    mean, rounded up), so sessions hold as many setups as the source did and
+    the cap binds wherever it did there; without session keys it must be
+    given. `n_sessions` defaults to the number of recorded sessions (or as many
+    as the results fill; "shuffle" always uses as many as the results fill).
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown Monte Carlo method {method!r}; expected one of {METHODS}")
+    risk_engine = risk_engine or RiskEngine()
+    profits = np.asarray(profits, dtype=np.float64)
+    if not len(profits):
+        raise ValueError("Monte Carlo needs at least one trade")
+    rng = np.random.default_rng(seed)
+    known = {key for key in sessions if key is not None} if sessions is not None else set()
+    if not session_size and method != "sessions":
+        if not known:
+            raise ValueError("Trades without session keys need an explicit session_size")
+        session_size = math.ceil(len(profits) / len(known))
+
+    if method == "sessions":
+        if sessions is None or any(key is None for key in sessions):
+            raise ValueError("The sessions method needs a session key for every trade")
+        keys = {}
+        for key, profit in zip(sessions, profits.tolist()):
+            keys.setdefault(key, []).append(profit)
+        blocks = np.full((len(keys), max(len(v) for v in keys.values())), np.nan)
+        for row, values in enumerate(keys.values()):
+            blocks[row, :len(values)] = values
+        n_sessions = n_sessions or len(keys)
+        slots = blocks.shape[1]
+    elif method == "shuffle":
+        # Every result is used exactly once per path
+        n_sessions = math.ceil(len(profits) / session_size)
+        slots = session_size
+    else:
+        if n_sessions is None:
+            n_sessions = len(known) or math.ceil(len(profits) / session_size)
+        slots = session_size
+
+    width = n_sessions * slots
+    chunk = max(1, CHUNK_ELEMENTS // width)
+    max_drawdown, net, profit_factor, min_equity = (np.empty(paths) for _ in range(4))
+    trades = np.empty(paths, dtype=np.int32)
+    halted_total = 0
+
+    for start in range(0, paths, chunk):
+        p = min(chunk, paths - start)
+        if method == "bootstrap":
+            candidates = profits[rng.integers(0, len(profits), size=(p, n_sessions, slots))]
+        elif method == "shuffle":
+            order = rng.permuted(np.broadcast_to(profits, (p, len(profits))), axis=1)
+            candidates = np.full((p, width), np.nan)
+            candidates[:, :len(profits)] = order
+            candidates = candidates.reshape(p, n_sessions, slots)
+        else:
+            candidates = blocks[rng.integers(0, len(blocks), size=(p, n_sessions))]
+
+        taken, count, halted = apply_risk_limits(candidates, risk_engine.max_trades_session,
+                                                 risk_engine.max_consecutive_losses)
+        halted_total += int(halted.sum())
+        taken = taken.reshape(p, width)
+        equity = np.cumsum(taken, axis=1)
+        # Peak starts at the initial equity, as in PerformanceReport
+        peak = np.maximum(np.maximum.accumulate(equity, axis=1), 0)
+        gains = np.where(taken > 0, taken, 0).sum(axis=1)
+        losses = -np.where(taken < 0, taken, 0).sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pf = np.where(losses > 0, gains / losses, np.inf)
+
+        out = slice(start, start + p)
+        max_drawdown[out] = (peak - equity).max(axis=1)
+        net[out] = equity[:, -1]
+        min_equity[out] = np.minimum(equity.min(axis=1), 0)
+        profit_factor[out] = pf
+        trades[out] = count.sum(axis=1)
+
+    return MonteCarloReport(method, paths, n_sessions, max_drawdown, net, profit_factor, min_equity, trades,
+                            halted_total / (paths * n_sessions), ruin_levels)
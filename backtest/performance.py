@@ -1,28 +1,278 @@
-import numpy as np
+import math
+import os
+from datetime import datetime, timezone
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _seconds(value):
+    """Unix seconds from a number or a datetime (naive datetimes are UTC, as elsewhere)."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if value.tzinfo is not None:
+        return value.timestamp()
+    return (value - _EPOCH).total_seconds()
+
+
+def _session_of(close_time):
+    return datetime.fromtimestamp(close_time, timezone.utc).strftime("%Y-%m-%d")
+
+
+def _ratios(values):
+    """(mean / std, mean / downside deviation) of a sequence, None where undefined."""
+    n = len(values)
+    if n < 2:
+        return None, None
+    mean = sum(values) / n
+    std = math.sqrt(sum((v - mean) ** 2 for v in values) / (n - 1))
+    downside = math.sqrt(sum(min(v, 0.0) ** 2 for v in values) / n)
+    return (mean / std if std > 0 else None), (mean / downside if downside > 0 else None)
+
+
+class PerformanceAccumulator:
+    """
+    Trade statistics updated one closed trade at a time, in O(1) memory per
+    trade: Welford mean/variance, running equity, peak and drawdown, win/loss
+    streaks, downside deviation and the union of time in the market. Sharpe
+    and Sortino per session are computed from one P&L total per session.
+
+    Profits are in pips. Accumulators of consecutive shards (e.g. a sweep split
+    by date) combine exactly with `merge()`; `get_state()`/`from_state()` carry
+    them between processes. With `equity_path` every trade's equity point is
+    appended to a CSV in batches of `spill_every`, so the curve is kept on disk
+    rather than in memory.
+    """
+
+    _STATE = (
+        "count", "wins", "gross_profit", "gross_loss", "mean", "m2", "downside_sq",
+        "equity", "peak", "min_equity", "max_drawdown", "largest_win", "largest_loss",
+        "lead", "run", "max_win_streak", "max_loss_streak",
+        "time_in_market", "hold_time", "timed", "first_open", "last_close", "market_until",
+    )
+
+    def __init__(self, equity_path=None, spill_every=1000):
+        self.count = 0
+        self.wins = 0
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.downside_sq = 0.0
+        self.equity = 0.0
+        self.peak = 0.0  # never below the starting equity, as in PerformanceReport
+        self.min_equity = 0.0
+        self.max_drawdown = 0.0
+        self.largest_win = 0.0
+        self.largest_loss = 0.0
+        self.lead = 0  # signed length of the opening streak (+ wins, - losses)
+        self.run = 0  # signed length of the current streak
+        self.max_win_streak = 0
+        self.max_loss_streak = 0
+        self.time_in_market = 0.0
+        self.hold_time = 0.0
+        self.timed = 0
+        self.first_open = None
+        self.last_close = None
+        self.market_until = None
+        self.sessions = {}  # session key -> [pnl, trades]
+        self.equity_path = equity_path
+        self.spill_every = spill_every
+        self._curve = []
+
+    @classmethod
+    def from_config(cls, config):
+        perf_cfg = config.get('performance', {})
+        return cls(equity_path=perf_cfg.get('equity_curve') or None, spill_every=perf_cfg.get('spill_every', 1000))
+
+    def add(self, profit, close_time=None, open_time=None, session=None):
+        """Adds one closed trade. Times are unix seconds or datetimes; `session` defaults to the UTC day of the close."""
+        close_time, open_time = _seconds(close_time), _seconds(open_time)
+        self.count += 1
+        delta = profit - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (profit - self.mean)
+
+        win = profit > 0
+        if win:
+            self.wins += 1
+            self.gross_profit += profit
+            self.largest_win = max(self.largest_win, profit)
+        else:
+            self.gross_loss -= profit
+            self.downside_sq += profit * profit
+            self.largest_loss = min(self.largest_loss, profit)
+
+        step = 1 if win else -1
+        if abs(self.lead) == self.count - 1 and self.lead * step >= 0:
+            self.lead += step
+        self.run = self.run + step if self.run * step > 0 else step
+        if win:
+            self.max_win_streak = max(self.max_win_streak, self.run)
+        else:
+            self.max_loss_streak = max(self.max_loss_streak, -self.run)
+
+        self.equity += profit
+        self.peak = max(self.peak, self.equity)
+        self.min_equity = min(self.min_equity, self.equity)
+        self.max_drawdown = max(self.max_drawdown, self.peak - self.equity)
+
+        if close_time is not None:
+            self.last_close = close_time if self.last_close is None else max(self.last_close, close_time)
+            if open_time is not None and close_time >= open_time:
+                self.timed += 1
+                self.hold_time += close_time - open_time
+                self.first_open = open_time if self.first_open is None else min(self.first_open, open_time)
+                # Concurrent trades count once
+                start = open_time if self.market_until is None else max(open_time, self.market_until)
+                if close_time > start:
+                    self.time_in_market += close_time - start
+                    self.market_until = close_time
+            if session is None:
+                session = _session_of(close_time)
+        if session is not None:
+            totals = self.sessions.get(session)
+            if totals is None:
+                totals = self.sessions[session] = [0.0, 0]
+            totals[0] += profit
+            totals[1] += 1
+
+        if self.equity_path:
+            self._curve.append((close_time, profit, self.equity, self.peak - self.equity))
+            if len(self._curve) >= self.spill_every:
+                self.flush()
+
+    def merge(self, other):
+        """Appends `other`, an accumulator over the trades that came after this one's."""
+        if not other.count:
+            return self
+        if not self.count:
+            self._load(other.get_state())
+            return self
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / n
+        self.m2 += other.m2 + delta * delta * self.count * other.count / n
+
+        # Drawdown inside `other` measured from this shard's peak
+        self.max_drawdown = max(self.max_drawdown, other.max_drawdown, self.peak - (self.equity + other.min_equity))
+        self.min_equity = min(self.min_equity, self.equity + other.min_equity)
+        self.peak = max(self.peak, self.equity + other.peak)
+        self.equity += other.equity
+
+        if self.run * other.lead > 0:
+            joined = self.run + other.lead
+            if joined > 0:
+                self.max_win_streak = max(self.max_win_streak, joined)
+            else:
+                self.max_loss_streak = max(self.max_loss_streak, -joined)
+        if abs(self.lead) == self.count and self.lead * other.lead > 0:
+            self.lead += other.lead
+        self.run = self.run + other.run if abs(other.run) == other.count and self.run * other.run > 0 else other.run
+        self.max_win_streak = max(self.max_win_streak, other.max_win_streak)
+        self.max_loss_streak = max(self.max_loss_streak, other.max_loss_streak)
+
+        self.count = n
+        self.wins += other.wins
+        self.gross_profit += other.gross_profit
+        self.gross_loss += other.gross_loss
+        self.downside_sq += other.downside_sq
+        self.largest_win = max(self.largest_win, other.largest_win)
+        self.largest_loss = min(self.largest_loss, other.largest_loss)
+        # Shards are disjoint in time, so their market time adds up
+        self.time_in_market += other.time_in_market
+        self.hold_time += other.hold_time
+        self.timed += other.timed
+        self.first_open = min((t for t in (self.first_open, other.first_open) if t is not None), default=None)
+        self.last_close = max((t for t in (self.last_close, other.last_close) if t is not None), default=None)
+        self.market_until = max((t for t in (self.market_until, other.market_until) if t is not None), default=None)
+        for session, (pnl, trades) in other.sessions.items():
+            totals = self.sessions.setdefault(session, [0.0, 0])
+            totals[0] += pnl
+            totals[1] += trades
+        return self
+
+    def snapshot(self):
+        """Metrics so far; includes every key of `PerformanceReport.calculate_metrics`."""
+        n = self.count
+        if not n:
+            return {"total_trades": 0}
+        losses = n - self.wins
+        win_rate = self.wins / n
+        avg_win = self.gross_profit / self.wins if self.wins else 0
+        avg_loss = -self.gross_loss / losses if losses else 0
+        std = math.sqrt(self.m2 / (n - 1)) if n > 1 else None
+        downside = math.sqrt(self.downside_sq / n)
+        session_sharpe, session_sortino = _ratios([pnl for pnl, _ in self.sessions.values()])
+        span = self.last_close - self.first_open if self.first_open is not None and self.last_close is not None else None
+        return {
+            "total_trades": n,
+            "win_rate": win_rate * 100,
+            "profit_factor": self.gross_profit / self.gross_loss if self.gross_loss > 0 else float('inf'),
+            "total_net_profit": self.equity,
+            "max_drawdown": self.max_drawdown,
+            "avg_win": avg_win,
+            "avg_loss": avg_loss,
+            "expectancy": (win_rate * avg_win) + ((1 - win_rate) * avg_loss),
+            "std": std,
+            "sharpe": self.mean / std if std else None,
+            "sortino": self.mean / downside if downside > 0 else None,
+            "sessions": len(self.sessions),
+            "session_sharpe": session_sharpe,
+            "session_sortino": session_sortino,
+            "largest_win": self.largest_win,
+            "largest_loss": self.largest_loss,
+            "max_win_streak": self.max_win_streak,
+            "max_loss_streak": self.max_loss_streak,
+            "current_streak": self.run,
+            "drawdown": self.peak - self.equity,
+            "avg_hold_s": self.hold_time / self.timed if self.timed else None,
+            "time_in_market_s": self.time_in_market,
+            "exposure": self.time_in_market / span if span else None,
+        }
+
+    def get_state(self):
+        state = {name: getattr(self, name) for name in self._STATE}
+        state["sessions"] = {key: list(totals) for key, totals in self.sessions.items()}
+        return state
+
+    @classmethod
+    def from_state(cls, state, equity_path=None, spill_every=1000):
+        acc = cls(equity_path=equity_path, spill_every=spill_every)
+        acc._load(state)
+        return acc
+
+    def _load(self, state):
+        for name in self._STATE:
+            setattr(self, name, state[name])
+        self.sessions = {key: list(totals) for key, totals in state["sessions"].items()}
+
+    def flush(self):
+        """Appends the buffered equity points to `equity_path`."""
+        if not self.equity_path or not self._curve:
+            return
+        new = not os.path.exists(self.equity_path)
+        os.makedirs(os.path.dirname(self.equity_path) or ".", exist_ok=True)
+        with open(self.equity_path, "a") as f:
+            if new:
+                f.write("close_time,profit,equity,drawdown\n")
+            f.writelines(f"{'' if t is None else t},{p!r},{e!r},{d!r}\n" for t, p, e, d in self._curve)
+        self._curve = []
+
 
 class PerformanceReport:
-    def __init__(self, trades):
+    def __init__(self, trades, accumulator=None):
         self.trades = trades
+        self.accumulator = accumulator
 
     def calculate_metrics(self):
-        if not self.trades:
+        acc = self.accumulator
+        if acc is None:
+            acc = PerformanceAccumulator()
+            for t in self.trades:
+                acc.add(t["profit"], close_time=t.get("close_time"), open_time=t.get("open_time"))
+        if not acc.count:
             return {"status": "No trades executed"}
-        profits = [t["profit"] for t in self.trades]
-        wins = [p for p in profits if p > 0]
-        losses = [p for p in profits if p <= 0]
-        total_trades = len(self.trades)
-        win_rate = len(wins) / total_trades if total_trades > 0 else 0
-        gross_profit = sum(wins)
-        gross_loss = abs(sum(losses))
-        profit_factor = gross_profit / gross_loss if gross_loss > 0 else float('inf')
-        avg_win = np.mean(wins) if wins else 0
-        avg_loss = np.mean(losses) if losses else 0
-        cumulative_profit = np.cumsum(profits)
-        peak = np.maximum.accumulate(cumulative_profit)
-        peak = np.maximum(peak, 0)
-        drawdowns = peak - cumulative_profit
-        max_drawdown = np.max(drawdowns) if len(drawdowns) > 0 else 0
-        return {"total_trades": total_trades, "win_rate": win_rate * 100, "profit_factor": profit_factor, "total_net_profit": sum(profits), "max_drawdown": max_drawdown, "avg_win": avg_win, "avg_loss": avg_loss, "expectancy": (win_rate * avg_win) + ((1 - win_rate) * avg_loss)}
+        return acc.snapshot()
 
     def display(self):
         metrics = self.calculate_metrics()
@@ -31,4 +281,11 @@ class PerformanceReport:
             print(metrics["status"])
         else:
             print(f"Total Trades:    {metrics['total_trades']}\nWin Rate:        {metrics['win_rate']:.2f}%\nProfit Factor:   {metrics['profit_factor']:.2f}\nTotal Net Profit:{metrics['total_net_profit']:.2f} pips\nMax Drawdown:    {metrics['max_drawdown']:.2f} pips\nExpectancy:      {metrics['expectancy']:.2f} pips/trade\nAvg Win/Loss:    {metrics['avg_win']:.2f} / {metrics['avg_loss']:.2f}")
+            ratio = lambda v: f"{v:.2f}" if v is not None else "n/a"
+            print(f"Sharpe/Sortino:  {ratio(metrics['sharpe'])} / {ratio(metrics['sortino'])} per trade, "
+                  f"{ratio(metrics['session_sharpe'])} / {ratio(metrics['session_sortino'])} per session ({metrics['sessions']})")
+            print(f"Streaks:         {metrics['max_win_streak']} wins / {metrics['max_loss_streak']} losses")
+            if metrics['exposure'] is not None:
+                print(f"Time in Market:  {metrics['time_in_market_s'] / 3600:.1f} h ({metrics['exposure'] * 100:.1f}%) | "
+                      f"Avg Hold {metrics['avg_hold_s'] / 60:.1f} min")
         print("="*40 + "\n")
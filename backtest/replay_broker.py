@@ -0,0 +1,58 @@
+import logging
+from datetime import timezone
+from backtest.mock_adapter import MockMT5Adapter
+from data.broker import epoch_ms
+from data.data_loader import DataLoader
+
+
+class ReplayBroker(MockMT5Adapter):
+    """
+    Broker backend that serves archived ticks, one per `get_tick` call, so the
+    live `VolmanTradingBot` loop can run against recorded data without MT5.
+    Fills and SL/TP are simulated by `MockMT5Adapter`.
+    """
+
+    def __init__(self, ticks=None, csv_path=None):
+        super().__init__()
+        if ticks is None:
+            ticks = DataLoader.load_from_csv(csv_path) if csv_path else []
+        self.ticks = ticks
+        self.cursor = 0
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(csv_path=config.get('broker', {}).get('replay_file', 'data/sample_ticks.csv'))
+
+    @staticmethod
+    def _normalize(tick, symbol):
+        tick.setdefault("symbol", symbol)
+        if tick.get("spread") is None:
+            tick["spread"] = tick["ask"] - tick["bid"]
+        if tick.get("time_msc") is None and tick.get("timestamp") is not None:
+            tick["time_msc"] = int(tick["timestamp"].replace(tzinfo=timezone.utc).timestamp() * 1000)
+        return tick
+
+    def exhausted(self) -> bool:
+        return self.cursor >= len(self.ticks)
+
+    def get_tick(self, symbol):
+        if self.exhausted():
+            return None
+        tick = self._normalize(self.ticks[self.cursor], symbol)
+        self.cursor += 1
+        self.set_tick(tick)
+        for ticket, reason in self.check_sl_tp():
+            logging.info(f"Replay broker closed {ticket} on {reason}")
+        return tick
+
+    def copy_ticks_from(self, symbol, date_from, count=100000):
+        start = epoch_ms(date_from)
+        served = [self._normalize(t, symbol) for t in self.ticks[:self.cursor]]
+        return [t for t in served if t["time_msc"] >= start][:count]
+
+    def server_time(self):
+        if self.current_tick is not None:
+            return self.current_tick["timestamp"]
+        if self.ticks:
+            return self.ticks[0].get("timestamp")
+        return None
@@ -1,29 +1,53 @@
 import logging
 from data.tick_engine import TickCandleEngine
+from data.multi_candle_engine import MultiCandleEngine
 from indicators.indicator_engine import IndicatorEngine
 from strategy.strategy_engine import StrategyEngine
 from risk.risk_engine import RiskEngine
 from execution.execution_engine import ExecutionEngine
 from backtest.mock_adapter import MockMT5Adapter
-from backtest.performance import PerformanceReport
-from utils.pip_utils import price_to_pips, pips_to_price
+from backtest.performance import PerformanceAccumulator, PerformanceReport
+from utils.symbol_spec import get_spec
+from utils.spread_model import SpreadModel
+from utils.latency import LatencyRecorder
+from strategy.funnel import FunnelRecorder, funnel_summary
 
 class ReplayEngine:
-    def __init__(self, symbol="EURUSD"):
+    def __init__(self, symbol="EURUSD", tick_count=70, timeframes=(), profile=False, funnel=False,
+                 equity_curve=None, keep_trades=True):
         self.symbol = symbol
+        self.spec = get_spec(symbol)
         self.mock_mt5 = MockMT5Adapter()
-        self.tick_engine = TickCandleEngine(70)
+        self.tick_engine = TickCandleEngine(tick_count)
         self.ind_engine = IndicatorEngine()
+        # Extra candle series, built in the same pass as the strategy's candles
+        self.timeframes = MultiCandleEngine(timeframes)
+        self.timeframe_ind = {name: IndicatorEngine() for name in self.timeframes.names}
+        self.timeframe_indicators = {}
         self.risk_engine = RiskEngine()
-        self.strategy_engine = StrategyEngine(self.risk_engine, symbol=self.symbol)
+        self.spread_model = SpreadModel(self.spec)
+        self.strategy_engine = StrategyEngine(self.risk_engine, symbol=self.symbol, spec=self.spec, spread_model=self.spread_model)
         self.exec_engine = ExecutionEngine(self.mock_mt5)
+        # Same stage hooks as the live loop; mock broker calls are timed too
+        self.latency = LatencyRecorder(enabled=profile)
+        self.latency.instrument(self.mock_mt5)
+        # Every strategy decision point with its measured values; save with `funnel.save(path)`
+        self.funnel = FunnelRecorder() if funnel else None
+        self.strategy_engine.funnel = self.funnel
         self.last_indicators = {}
         self.completed_trades = []
+        # Metrics are accumulated per closed trade; long sweeps can pass keep_trades=False
+        self.performance = PerformanceAccumulator(equity_path=equity_curve)
+        self.keep_trades = keep_trades
+        self._open_times = {}  # ticket -> tick timestamp of the entry
+        self._closed_seq = 0  # last closed-trade sequence consumed from the execution engine
         
         # Statistics tracking
         self.stats = {
             "ticks_processed": 0,
+            "spread_rejects": 0,
             "candles_formed": 0,
+            "timeframe_candles": 0,
             "impulses_detected": 0,
             "pullbacks_qualified": 0,
             "triggers_waiting": 0,
@@ -45,7 +69,7 @@ class ReplayEngine:
                     tick["spread"] = tick["ask"] - tick["bid"]
                 else:
                     # Default to 0.5 pips for backtest
-                    tick["spread"] = pips_to_price(0.5, self.symbol)
+                    tick["spread"] = self.spec.pips_to_price(0.5)
             
             # FIXED: Ensure bid/ask exist
             if "bid" not in tick or tick["bid"] == 0:
@@ -61,12 +85,23 @@ class ReplayEngine:
             if "timestamp" not in tick and "time" in tick:
                 tick["timestamp"] = tick["time"]
             
+            t = self.latency.start()
+            accepted = self.spread_model.update(tick["spread"])
+            if t:
+                t = self.latency.lap("spread_gate", t)
             self.mock_mt5.set_tick(tick)
             
             # Check SL/TP hits
             closed = self.mock_mt5.check_sl_tp()
             for ticket, reason in closed:
                 self._record_closed_trade(ticket, reason)
+            if t:
+                t = self.latency.lap("fills", t)
+
+            # As in the live pipeline, a gated tick still fills stops at the broker but goes no further
+            if not accepted:
+                self.stats["spread_rejects"] += 1
+                continue
             
             # Process tick-level entries
             if self.strategy_engine.state == "WAITING_TRIGGER":
@@ -74,20 +109,25 @@ class ReplayEngine:
                 signal = self.strategy_engine.process_tick(tick, self.last_indicators)
                 if signal: 
                     self._handle_signal(signal)
+                if t:
+                    t = self.latency.lap("strategy_tick", t)
             
             # Process candles
             candle = self.tick_engine.process_tick(tick)
+            if t:
+                t = self.latency.lap("candle_build", t)
             if candle:
                 self.stats["candles_formed"] += 1
                 
                 indicators = self.ind_engine.update(candle)
                 self.last_indicators = indicators
+                if t:
+                    t = self.latency.lap("indicators", t)
                 
                 # Track state changes
                 old_state = self.strategy_engine.state
                 
-                spread_pips = price_to_pips(tick["spread"], self.symbol)
-                signal = self.strategy_engine.process_candle(candle, indicators, spread_pips=spread_pips)
+                signal = self.strategy_engine.process_candle(candle, indicators, spread=tick["spread"])
                 
                 # Update statistics
                 new_state = self.strategy_engine.state
@@ -103,27 +143,42 @@ class ReplayEngine:
                     self._handle_signal(signal)
                     
                 self.exec_engine.update_candles_count()
+                if t:
+                    t = self.latency.lap("strategy_candle", t)
+
+            if self.timeframe_ind:
+                for name, tf_candle in self.timeframes.process_tick(tick):
+                    self.stats["timeframe_candles"] += 1
+                    self.timeframe_indicators[name] = self.timeframe_ind[name].update(tf_candle)
+                if t:
+                    t = self.latency.lap("timeframes", t)
             
             # Manage active trades
             self.exec_engine.manage_trades(self.symbol, self.risk_engine)
+            if t:
+                self.latency.lap("manage_trades", t)
             
             # Process closed trades from execution engine
-            while self.exec_engine.closed_trades_history:
-                ticket, trade = self.exec_engine.closed_trades_history.pop(0)
-                self._record_closed_trade_from_history(ticket, trade)
+            history = self.exec_engine.closed_trades_history
+            if history.total > self._closed_seq:
+                for trade in history.since(self._closed_seq):
+                    self._record_closed_trade_from_history(trade.ticket, trade)
+                self._closed_seq = history.total
         
         # Close remaining positions
         self._close_all_remaining()
         
         # Print statistics
         self._print_statistics()
+        self.performance.flush()
         
-        return PerformanceReport(self.completed_trades)
+        return PerformanceReport(self.completed_trades, accumulator=self.performance)
 
     def _handle_signal(self, signal):
         if self.risk_engine.can_trade():
-            ticket = self.exec_engine.execute_signal(signal, self.symbol, 0.1)
+            ticket = self.exec_engine.execute_signal(signal, self.symbol, 0.1, risk_engine=self.risk_engine)
             if ticket > 0: 
+                self._open_times[ticket] = self.mock_mt5.current_tick.get("timestamp")
                 self.risk_engine.register_new_trade()
                 self.stats["trades_executed"] += 1
                 logging.info(f"✓ Trade #{self.stats['trades_executed']} executed: {signal['direction']} @ {signal['entry_price']:.5f}")
@@ -132,38 +187,44 @@ class ReplayEngine:
         if ticket in self.exec_engine.active_trades:
             trade = self.exec_engine.active_trades[ticket]
             self._record_closed_trade_from_history(ticket, trade, reason)
-            del self.exec_engine.active_trades[ticket]
+            self.exec_engine.remove_trade(ticket)
 
     def _record_closed_trade_from_history(self, ticket, trade, reason=None):
-        entry_price = trade["entry_price"]
-        reason = reason or trade.get("exit_reason", "UNKNOWN")
+        entry_price = trade.entry_price
+        reason = reason or trade.exit_reason or "UNKNOWN"
         
         # Determine exit price based on reason
         if reason == "SL":
-            exit_price = trade["sl"]
+            exit_price = trade.sl
         elif reason == "TP":
-            exit_price = trade["tp"]
+            exit_price = trade.tp
         elif self.mock_mt5.current_tick:
             # For MARKET or TIME_STOP, use current tick price
-            exit_price = self.mock_mt5.current_tick["bid"] if trade["direction"] == "BUY" else self.mock_mt5.current_tick["ask"]
+            exit_price = self.mock_mt5.current_tick["bid"] if trade.direction == "BUY" else self.mock_mt5.current_tick["ask"]
         else:
             # Fallback to entry price if no tick available
             exit_price = entry_price
         
-        if trade["direction"] == "BUY": 
-            profit_pips = price_to_pips(exit_price - entry_price, self.symbol)
+        if trade.direction == "BUY": 
+            profit_pips = self.spec.price_to_pips(exit_price - entry_price)
         else: 
-            profit_pips = price_to_pips(entry_price - exit_price, self.symbol)
+            profit_pips = self.spec.price_to_pips(entry_price - exit_price)
         
-        self.completed_trades.append({
-            "ticket": ticket, 
-            "profit": profit_pips, 
-            "reason": reason or trade.get("exit_reason", "UNKNOWN"), 
-            "direction": trade["direction"]
-        })
+        close_time = self.mock_mt5.current_tick.get("timestamp") if self.mock_mt5.current_tick else None
+        open_time = self._open_times.pop(ticket, None)
+        self.performance.add(profit_pips, close_time=close_time, open_time=open_time)
+        if self.keep_trades:
+            self.completed_trades.append({
+                "ticket": ticket, 
+                "profit": profit_pips, 
+                "reason": reason, 
+                "direction": trade.direction,
+                "open_time": open_time,
+                "close_time": close_time
+            })
 
         # Only register if not already registered by ExecutionEngine
-        if not trade.get("result_registered"):
+        if not trade.result_registered:
             self.risk_engine.register_trade_result(win=(profit_pips > 0))
 
     def _close_all_remaining(self):
@@ -175,6 +236,7 @@ class ReplayEngine:
         print("📈 BACKTEST STATISTICS")
         print("="*60)
         print(f"Ticks Processed:         {self.stats['ticks_processed']:,}")
+        print(f"Spread Rejects:          {self.stats['spread_rejects']:,}")
         print(f"Candles Formed:          {self.stats['candles_formed']:,}")
         print(f"Impulses Detected:       {self.stats['impulses_detected']}")
         print(f"Pullbacks Qualified:     {self.stats['pullbacks_qualified']}")
@@ -188,5 +250,30 @@ class ReplayEngine:
         if self.stats['pullbacks_qualified'] > 0:
             trade_rate = self.stats['trades_executed'] / self.stats['pullbacks_qualified'] * 100
             print(f"Trade Execution Rate:    {trade_rate:.1f}%")
+
+        slippage = self.exec_engine.fill_summary().get("slippage_pips")
+        if slippage:
+            print(f"Entry Slippage:          {slippage['mean']:.2f} pips avg | p99 {slippage['p99']:.2f} | max {slippage['max']:.2f}")
+
+        if self.funnel is not None:
+            self._print_funnel()
+
+        if self.latency.stages:
+            print("-"*60)
+            print(f"{'Stage':<26} {'Count':>9} {'p50 us':>9} {'p99 us':>9} {'Max us':>9}")
+            for stage, s in self.latency.snapshot().items():
+                print(f"{stage:<26} {s['count']:>9,} {s['p50_us']:>9.2f} {s['p99_us']:>9.2f} {s['max_us']:>9.1f}")
             
-        print("="*60 + "\n")
\ No newline at end of file
+        print("="*60 + "\n")
+
+    def _print_funnel(self):
+        print("-"*60)
+        print(f"Setup Funnel ({len(self.funnel):,} decision records)")
+        by_check = {}
+        for check, reason, count in funnel_summary(self.funnel.to_arrays()):
+            by_check.setdefault(check, []).append((reason, count))
+        for check, reasons in by_check.items():
+            passed = dict(reasons).get("passed", 0)
+            rejected = ", ".join(f"{reason} {count:,}" for reason, count in sorted(reasons, key=lambda r: -r[1])
+                                 if reason != "passed")
+            print(f"{check:<12} passed {passed:>9,} | {rejected or '-'}")
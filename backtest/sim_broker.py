@@ -0,0 +1,311 @@
+import argparse
+import logging
+import threading
+import time
+from datetime import timedelta, timezone
+from multiprocessing.connection import Client, Listener
+from backtest.mock_adapter import MockMT5Adapter
+from data.broker import BrokerBackend, epoch_ms
+from data.data_loader import DataLoader
+
+DEFAULT_ADDRESS = ("127.0.0.1", 18812)
+DEFAULT_AUTHKEY = b"volman-sim"
+
+
+class SimBrokerState:
+    """
+    Broker-side state of the simulator: a clock running `speed` times faster than
+    wall time over an archived tick stream, plus positions with SL/TP handling.
+
+    Every archived tick is released in order once the simulated clock passes its
+    timestamp, and SL/TP are checked on each one, so fills don't depend on how
+    often the client polls.
+    """
+
+    def __init__(self, ticks, symbol="EURUSD", speed=1.0, latency_ms=0.0, balance=10000.0, clock=time.monotonic):
+        if not 1.0 <= speed <= 1000.0:
+            raise ValueError("speed must be between 1x and 1000x")
+        if not ticks:
+            raise ValueError("SimBrokerState needs at least one tick")
+        self.symbol = symbol
+        self.speed = speed
+        self.latency_ms = latency_ms
+        self.clock = clock
+        self.lock = threading.Lock()
+
+        self.ticks = [self._normalize(t) for t in ticks]
+        self.cursor = 0
+        self.start_wall = None
+        self.start_time = self.ticks[0]["timestamp"]
+
+        self.book = MockMT5Adapter(balance=balance)
+        self.closed_trades = []
+
+    def _normalize(self, tick):
+        tick = dict(tick)
+        tick["symbol"] = self.symbol
+        tick["spread"] = tick["ask"] - tick["bid"]
+        if tick.get("time_msc") is None:
+            tick["time_msc"] = int(tick["timestamp"].replace(tzinfo=timezone.utc).timestamp() * 1000)
+        return tick
+
+    # Clock
+    def server_time(self):
+        if self.start_wall is None:
+            return self.start_time
+        return self.start_time + timedelta(seconds=(self.clock() - self.start_wall) * self.speed)
+
+    def finished(self) -> bool:
+        return self.cursor >= len(self.ticks)
+
+    def advance(self):
+        """Releases every tick whose timestamp is at or before the simulated clock."""
+        if self.start_wall is None:
+            self.start_wall = self.clock()
+        now = self.server_time()
+        while self.cursor < len(self.ticks) and self.ticks[self.cursor]["timestamp"] <= now:
+            tick = self.ticks[self.cursor]
+            self.cursor += 1
+            positions = dict(self.book.positions)
+            self.book.set_tick(tick)
+            for ticket, reason in self.book.check_sl_tp():
+                self._settle(ticket, positions[ticket], reason)
+
+    def _settle(self, ticket, pos, reason):
+        if reason == "SL":
+            exit_price = pos["sl"]
+        elif reason == "TP":
+            exit_price = pos["tp"]
+        else:
+            tick = self.book.current_tick
+            exit_price = tick["bid"] if pos["type"] == 0 else tick["ask"]
+        sign = 1 if pos["type"] == 0 else -1
+        profit = sign * (exit_price - pos["price"]) * pos["volume"] * 100000
+        self.book.balance += profit
+        self.closed_trades.append({"ticket": ticket, "reason": reason, "exit_price": exit_price, "profit": profit})
+
+    # Broker API served to clients
+    def get_tick(self, symbol):
+        self.advance()
+        return self.book.current_tick
+
+    def get_ticks(self, symbols):
+        self.advance()
+        tick = self.book.current_tick
+        return {self.symbol: tick} if tick and self.symbol in symbols else {}
+
+    def copy_ticks_from(self, symbol, date_from, count=100000):
+        self.advance()
+        start = epoch_ms(date_from)
+        released = self.ticks[:self.cursor]
+        return [t for t in released if t["time_msc"] >= start][:count]
+
+    def get_account_info(self):
+        return self.book.get_account_info()
+
+    def place_market_order(self, symbol, direction, volume, sl, tp, comment=""):
+        self.advance()
+        if self.book.current_tick is None:
+            return -1
+        return self.book.place_market_order(symbol, direction, volume, sl, tp, comment)
+
+    def place_order_with_fill(self, symbol, direction, volume, sl, tp, comment=""):
+        """`place_market_order` plus the fill details, in one round trip."""
+        ticket = self.place_market_order(symbol, direction, volume, sl, tp, comment)
+        return ticket, self.book.last_fill if ticket > 0 else None
+
+    def modify_sl(self, ticket, new_sl):
+        self.advance()
+        return self.book.modify_sl(ticket, new_sl)
+
+    def position_exists(self, ticket):
+        self.advance()
+        return self.book.position_exists(ticket)
+
+    def get_positions(self, magic=None):
+        self.advance()
+        return self.book.get_positions(magic)
+
+    def get_close_deal(self, ticket):
+        self.advance()
+        return self.book.get_close_deal(ticket)
+
+    def close_position(self, ticket):
+        self.advance()
+        pos = self.book.positions.get(ticket)
+        if pos is None:
+            return False
+        self.book.close_position(ticket)
+        self._settle(ticket, pos, "CLOSE")
+        return True
+
+
+class SimBrokerServer:
+    """Serves a `SimBrokerState` over a local socket, one thread per client."""
+
+    METHODS = {
+        "get_tick", "get_ticks", "copy_ticks_from", "get_account_info", "place_market_order",
+        "place_order_with_fill", "modify_sl", "position_exists", "close_position", "get_positions",
+        "get_close_deal", "server_time", "finished"
+    }
+    ORDER_METHODS = {"place_market_order", "place_order_with_fill", "modify_sl", "close_position"}
+
+    def __init__(self, state, address=DEFAULT_ADDRESS, authkey=DEFAULT_AUTHKEY):
+        self.state = state
+        self.listener = Listener(address, authkey=authkey)
+        self._stopped = False
+
+    @property
+    def address(self):
+        return self.listener.address
+
+    def serve_forever(self):
+        logging.info(f"Sim broker listening on {self.address} at {self.state.speed:g}x")
+        while not self._stopped:
+            try:
+                conn = self.listener.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._handle_client, args=(conn,), daemon=True).start()
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, name="sim-broker", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stopped = True
+        self.listener.close()
+
+    def _handle_client(self, conn):
+        with conn:
+            while True:
+                try:
+                    method, args, kwargs = conn.recv()
+                except (EOFError, OSError):
+                    return
+                if method not in self.METHODS:
+                    conn.send(("error", f"unknown method {method}"))
+                    continue
+                # Network + broker latency, expressed in simulated time
+                if method in self.ORDER_METHODS and self.state.latency_ms > 0:
+                    time.sleep(self.state.latency_ms / 1000.0 / self.state.speed)
+                try:
+                    with self.state.lock:
+                        result = getattr(self.state, method)(*args, **kwargs)
+                    conn.send(("ok", result))
+                except Exception as e:
+                    conn.send(("error", str(e)))
+
+
+class SimBrokerAdapter(BrokerBackend):
+    """Broker backend that talks to a running `SimBrokerServer`."""
+
+    def __init__(self, address=DEFAULT_ADDRESS, authkey=DEFAULT_AUTHKEY):
+        self.address = tuple(address)
+        self.authkey = authkey
+        self.conn = None
+        self.connected = False
+
+    @classmethod
+    def from_config(cls, config):
+        sim_cfg = config.get('broker', {}).get('sim', {})
+        address = (sim_cfg.get('host', DEFAULT_ADDRESS[0]), sim_cfg.get('port', DEFAULT_ADDRESS[1]))
+        authkey = sim_cfg.get('authkey', DEFAULT_AUTHKEY.decode()).encode()
+        return cls(address=address, authkey=authkey)
+
+    def connect(self, login=None, password=None, server=None, magic=None) -> bool:
+        try:
+            self.conn = Client(self.address, authkey=self.authkey)
+        except OSError as e:
+            logging.error(f"Sim broker connect failed: {e}")
+            self.connected = False
+            return False
+        self.connected = True
+        logging.info(f"Connected to sim broker at {self.address}")
+        return True
+
+    def shutdown(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        self.connected = False
+
+    def _call(self, method, *args, default=None, **kwargs):
+        if not self.connected:
+            return default
+        try:
+            self.conn.send((method, args, kwargs))
+            status, result = self.conn.recv()
+        except (EOFError, OSError):
+            logging.error("Sim broker connection dropped")
+            self.connected = False
+            return default
+        if status != "ok":
+            logging.error(f"Sim broker error in {method}: {result}")
+            return default
+        return result
+
+    def get_tick(self, symbol):
+        return self._call("get_tick", symbol)
+
+    def get_ticks(self, symbols):
+        # One round trip for every symbol
+        return self._call("get_ticks", list(symbols), default={})
+
+    def copy_ticks_from(self, symbol, date_from, count=100000):
+        return self._call("copy_ticks_from", symbol, date_from, count, default=[])
+
+    def server_time(self):
+        return self._call("server_time")
+
+    def get_account_info(self):
+        return self._call("get_account_info")
+
+    def place_market_order(self, symbol, direction, volume, sl, tp, comment=""):
+        ticket, fill = self._call("place_order_with_fill", symbol, direction, volume, sl, tp, comment, default=(-1, None))
+        if ticket > 0:
+            self.last_fill = fill
+        return ticket
+
+    def modify_sl(self, ticket, new_sl):
+        return self._call("modify_sl", ticket, new_sl, default=False)
+
+    def position_exists(self, ticket):
+        # Unknown while disconnected; don't report the trade as closed
+        return self._call("position_exists", ticket, default=True)
+
+    def close_position(self, ticket):
+        return self._call("close_position", ticket, default=False)
+
+    def get_positions(self, magic=None):
+        return self._call("get_positions", magic)
+
+    def get_close_deal(self, ticket):
+        return self._call("get_close_deal", ticket)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local simulated broker for paper-trading main.py")
+    parser.add_argument("--csv", type=str, default="data/sample_ticks.csv", help="Tick archive to replay")
+    parser.add_argument("--symbol", type=str, default="EURUSD", help="Symbol served by the simulator")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed, 1 to 1000 times real time")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated order latency (broker time)")
+    parser.add_argument("--host", type=str, default=DEFAULT_ADDRESS[0])
+    parser.add_argument("--port", type=int, default=DEFAULT_ADDRESS[1])
+    parser.add_argument("--authkey", type=str, default=DEFAULT_AUTHKEY.decode())
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    ticks = DataLoader.load_from_csv(args.csv)
+    state = SimBrokerState(ticks, symbol=args.symbol, speed=args.speed, latency_ms=args.latency_ms)
+    server = SimBrokerServer(state, address=(args.host, args.port), authkey=args.authkey.encode())
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
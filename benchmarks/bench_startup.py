@@ -0,0 +1,66 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Heavy modules that the live entry point should not load unless the chosen backend needs them
+HEAVY_MODULES = ("MetaTrader5", "pandas", "numpy")
+
+# Runs in a fresh interpreter so module caches from the parent don't hide import cost
+_SNIPPET = """
+import time
+t0 = time.perf_counter()
+import json, sys
+from main import VolmanTradingBot
+config = json.loads(sys.argv[1])
+bot = VolmanTradingBot(config=config)
+t_import = time.perf_counter()
+bot.initialize()
+symbol = bot.symbols[0]
+tick = bot.mt5.get_tick(symbol)
+bot._ingest_tick(bot.pipelines[symbol], tick)
+t_tick = time.perf_counter()
+print(json.dumps({
+    "import_s": t_import - t0,
+    "import_to_first_tick_s": t_tick - t0,
+    "heavy_modules": [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def startup_config(state_dir, backend="replay", replay_file="data/sample_ticks.csv"):
+    return {
+        "mt5": {"login": 0, "password": "", "server": "", "magic": 701970},
+        "broker": {"backend": backend, "replay_file": replay_file},
+        "trading": {"symbols": ["EURUSD"], "tick_count": 70, "volume": 0.1, "max_spread_pips": 0.8},
+        "execution": {
+            "ledger_path": os.path.join(state_dir, "ledger.db"),
+            "closed_trade_journal": os.path.join(state_dir, "closed_trades.jsonl"),
+        },
+        "checkpoint": {"path": os.path.join(state_dir, "checkpoint.bin")},
+        "logging": {"level": "WARNING"},
+    }
+
+
+def measure_import_to_first_tick(backend="replay", replay_file="data/sample_ticks.csv"):
+    """
+    Measures wall time from interpreter start of `main` import to the first
+    tick passing through the pipeline, in a clean subprocess.
+    """
+    with tempfile.TemporaryDirectory() as state_dir:
+        config = startup_config(state_dir, backend, replay_file)
+        out = subprocess.run(
+            [sys.executable, "-c", _SNIPPET, json.dumps(config)],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    result = measure_import_to_first_tick()
+    print(f"Import:              {result['import_s'] * 1000:.1f} ms")
+    print(f"Import -> 1st tick:  {result['import_to_first_tick_s'] * 1000:.1f} ms")
+    print(f"Heavy modules:       {', '.join(result['heavy_modules']) or 'none'}")
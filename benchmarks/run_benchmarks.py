@@ -0,0 +1,235 @@
+"""
+Throughput benchmarks for each pipeline stage and the full replay, on synthetic
+ticks, with JSON baselines and a regression gate. Runs offline, without MT5.
+
+    python -m benchmarks.run_benchmarks --save-baseline   # record this machine's baseline
+    python -m benchmarks.run_benchmarks --check           # exit 1 on a regression
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from backtest.generate_test_data import generate_ticks, to_ticks
+from backtest.mock_adapter import MockMT5Adapter
+from backtest.replay_engine import ReplayEngine
+from benchmarks.bench_startup import measure_import_to_first_tick
+from data.tick_engine import TickCandleEngine
+from execution.execution_engine import ExecutionEngine
+from indicators.indicator_engine import IndicatorEngine
+from risk.risk_engine import RiskEngine
+from strategy.strategy_engine import StrategyEngine
+from utils.price_levels import ABOVE
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Metrics where a smaller value is better; everything else is a throughput
+LOWER_IS_BETTER = {"peak_memory_mb", "startup_ms"}
+
+
+def synthetic_ticks(n, seed=7):
+    """Seeded ticks from the synthetic generator: trending legs, regime noise and session intensity."""
+    return to_ticks(generate_ticks(n, seed=seed))
+
+
+def _best_rate(fn, count, repeat):
+    """Best of `repeat` runs, as operations per second."""
+    best = float("inf")
+    for _ in range(repeat):
+        elapsed = fn()
+        best = min(best, elapsed)
+    return count / best if best > 0 else float("inf")
+
+
+def bench_tick_engine(ticks, repeat):
+    def run():
+        engine = TickCandleEngine(70)
+        start = time.perf_counter()
+        for tick in ticks:
+            engine.process_tick(tick)
+        return time.perf_counter() - start
+    return _best_rate(run, len(ticks), repeat)
+
+
+def _candles(ticks):
+    engine = TickCandleEngine(70)
+    return [c for c in (engine.process_tick(t) for t in ticks) if c]
+
+
+def bench_indicators(candles, repeat):
+    def run():
+        engine = IndicatorEngine()
+        start = time.perf_counter()
+        for candle in candles:
+            engine.update(candle)
+        return time.perf_counter() - start
+    return _best_rate(run, len(candles), repeat)
+
+
+def bench_strategy_candle(candles, repeat):
+    engine = IndicatorEngine()
+    indicators = [engine.update(c) for c in candles]
+
+    def run():
+        strategy = StrategyEngine(RiskEngine())
+        start = time.perf_counter()
+        for candle, ind in zip(candles, indicators):
+            strategy.process_candle(candle, ind, spread=0.00003)
+        return time.perf_counter() - start
+    return _best_rate(run, len(candles), repeat)
+
+
+def trigger_path_ticks(ticks):
+    """
+    Copies of `ticks` moved into the London/New York overlap with a spread under
+    the gate, so `StrategyEngine.process_tick` passes its filters.
+    """
+    start = datetime(2026, 1, 6, 14, 0)
+    return [dict(t, ask=t["bid"] + 0.00002, timestamp=start + timedelta(milliseconds=i)) for i, t in enumerate(ticks)]
+
+
+def bench_strategy_tick(ticks, repeat):
+    ticks = trigger_path_ticks(ticks)
+
+    def run():
+        strategy = StrategyEngine(RiskEngine())
+        # An armed entry far from the market: every tick passes the filters and checks the levels without firing
+        strategy.state = "WAITING_TRIGGER"
+        strategy.current_setup = {"direction": "BUY", "pb_extreme": 0.0, "pb_candles": []}
+        strategy.ask_levels.arm("entry", 100.0, ABOVE, strategy._on_entry_level)
+        # `_tick_signal` is only reset once the spread and session filters pass
+        strategy._tick_signal = False
+        strategy.process_tick(ticks[0], {})
+        if strategy._tick_signal is not None:
+            raise RuntimeError("Benchmark ticks stop at the strategy filters, not the trigger check")
+        start = time.perf_counter()
+        for tick in ticks:
+            strategy.process_tick(tick, {})
+        return time.perf_counter() - start
+    return _best_rate(run, len(ticks), repeat)
+
+
+def bench_manage_trades(ticks, repeat, open_trades=5):
+    def run():
+        broker = MockMT5Adapter()
+        broker.set_tick(ticks[0])
+        risk = RiskEngine()
+        execution = ExecutionEngine(broker)
+        for i in range(open_trades):
+            direction = "BUY" if i % 2 == 0 else "SELL"
+            # TP and break-even levels out of reach, so trades stay open
+            far = 50.0 if direction == "BUY" else -50.0
+            execution.execute_signal({"direction": direction, "entry_price": ticks[0]["bid"] + far * 0.001,
+                                      "sl": 0.0, "tp": ticks[0]["bid"] + far}, "EURUSD", risk_engine=risk)
+        start = time.perf_counter()
+        for tick in ticks:
+            broker.set_tick(tick)
+            execution.manage_trades("EURUSD", risk, tick=tick)
+        return time.perf_counter() - start
+    return _best_rate(run, len(ticks), repeat)
+
+
+def bench_replay(ticks, repeat):
+    def run():
+        engine = ReplayEngine()
+        batch = [dict(t) for t in ticks]
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            engine.run(batch)
+        return time.perf_counter() - start
+    return _best_rate(run, len(ticks), repeat)
+
+
+def peak_replay_memory_mb(ticks):
+    """Peak traced allocation of a full replay, including its tick copies."""
+    tracemalloc.start()
+    try:
+        engine = ReplayEngine()
+        with contextlib.redirect_stdout(io.StringIO()):
+            engine.run([dict(t) for t in ticks])
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmarks(n_ticks=200000, repeat=3, startup=True):
+    """Returns `{metric: value}`; throughputs are per second."""
+    # Strategy logging would dominate the measurement
+    logging.disable(logging.CRITICAL)
+    try:
+        ticks = synthetic_ticks(n_ticks)
+        candles = _candles(ticks)
+        results = {
+            "tick_engine_ticks_per_s": bench_tick_engine(ticks, repeat),
+            "indicators_candles_per_s": bench_indicators(candles, repeat),
+            "strategy_candles_per_s": bench_strategy_candle(candles, repeat),
+            "strategy_ticks_per_s": bench_strategy_tick(ticks, repeat),
+            "manage_trades_ticks_per_s": bench_manage_trades(ticks, repeat),
+            "replay_ticks_per_s": bench_replay(ticks, repeat),
+            "peak_memory_mb": peak_replay_memory_mb(ticks),
+        }
+        if startup:
+            results["startup_ms"] = min(measure_import_to_first_tick()["import_to_first_tick_s"] for _ in range(repeat)) * 1000
+        return results
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def compare(results, baseline, threshold):
+    """Returns a message per metric that regressed by more than `threshold` (a fraction)."""
+    failures = []
+    for metric, base in baseline.items():
+        current = results.get(metric)
+        if current is None or not base:
+            continue
+        if metric in LOWER_IS_BETTER:
+            change = current / base - 1.0
+        else:
+            change = 1.0 - current / base
+        if change > threshold:
+            failures.append(f"{metric}: {current:,.1f} vs baseline {base:,.1f} ({change * 100:.0f}% worse)")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Volman bot throughput benchmarks")
+    parser.add_argument("--ticks", type=int, default=200000, help="Synthetic ticks per stage (default: 200000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage; the best is kept (default: 3)")
+    parser.add_argument("--no-startup", action="store_true", help="Skip the subprocess startup measurement")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, help="Write results as the baseline")
+    parser.add_argument("--check", nargs="?", const=DEFAULT_BASELINE, help="Fail if results regress against a baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed regression as a fraction (default: 0.25)")
+    parser.add_argument("--json", type=str, help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.ticks, args.repeat, startup=not args.no_startup)
+    for metric, value in results.items():
+        print(f"{metric:<28} {value:>14,.1f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+    if args.check:
+        with open(args.check, "r") as f:
+            baseline = json.load(f)
+        failures = compare(results, baseline, args.threshold)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            return 1
+        print(f"No regressions beyond {args.threshold * 100:.0f}% against {args.check}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
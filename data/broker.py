@@ -0,0 +1,146 @@
+import importlib
+from abc import ABC, abstractmethod
+from datetime import timezone
+
+
+def epoch_ms(value):
+    """Unix milliseconds of a datetime; naive datetimes are UTC, like archived tick timestamps."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+class BrokerBackend(ABC):
+    """
+    Interface shared by every broker implementation (live MT5, mock, replay, simulator).
+
+    Quotes and ticks are returned as dicts with `symbol`, `bid`, `ask`, `spread`,
+    `time_msc` and `timestamp` keys. Orders return a positive ticket on success and -1
+    on failure. After a successful order `last_fill` holds `{"ticket", "price",
+    "time_msc"}`: the fill price and the broker time of the quote it was priced at.
+    `last_retcode` is the broker's result code for the last order, when it has one.
+
+    Connection, quote and order methods are abstract, so a backend missing one
+    fails when it is instantiated rather than on its first call.
+    """
+
+    connected = False
+    last_fill = None
+    last_retcode = None
+
+    @classmethod
+    def from_config(cls, config):
+        return cls()
+
+    # Connection
+    @abstractmethod
+    def connect(self, login=None, password=None, server=None, magic=None) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def shutdown(self) -> None:
+        raise NotImplementedError
+
+    # Quotes and ticks
+    @abstractmethod
+    def get_tick(self, symbol: str):
+        raise NotImplementedError
+
+    def get_ticks(self, symbols):
+        """
+        Latest quote for each of `symbols` as a `{symbol: tick}` dict, skipping symbols
+        without a quote. Backends that can batch the request override this.
+        """
+        ticks = {}
+        for symbol in symbols:
+            tick = self.get_tick(symbol)
+            if tick:
+                ticks[symbol] = tick
+        return ticks
+
+    def get_spread(self, symbol: str) -> float:
+        tick = self.get_tick(symbol)
+        if tick is None:
+            return float("inf")
+        return tick["ask"] - tick["bid"]
+
+    def copy_ticks_from(self, symbol: str, date_from, count: int = 100000):
+        """
+        Up to `count` ticks at or after `date_from`, an aware datetime (naive
+        ones are taken as UTC). Backends select on the ticks' `time_msc`, so the
+        window does not depend on the host's time zone.
+        """
+        return []
+
+    def copy_ticks_range(self, symbol: str, date_from, date_to):
+        end = epoch_ms(date_to)
+        return [t for t in self.copy_ticks_from(symbol, date_from, 10_000_000) if t["time_msc"] <= end]
+
+    def get_symbol_info(self, symbol: str):
+        """
+        Contract metadata as a dict with `digits`, `point`, `tick_size`, `tick_value`
+        and `stops_level`, or None when the backend can't provide it.
+        """
+        return None
+
+    def server_time(self):
+        """Broker-side clock for session filtering; None means use the local clock."""
+        return None
+
+    # Account
+    def get_account_info(self):
+        return None
+
+    # Orders and positions
+    @abstractmethod
+    def place_market_order(self, symbol: str, direction: str, volume: float, sl: float, tp: float, comment: str = "") -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def modify_sl(self, ticket: int, new_sl: float) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def position_exists(self, ticket: int) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def close_position(self, ticket: int) -> bool:
+        raise NotImplementedError
+
+    def get_positions(self, magic=None):
+        """
+        All open positions (optionally only those with `magic`) in one call, as dicts with
+        `ticket`, `symbol`, `direction`, `volume`, `price_open`, `sl` and `tp`.
+        Returns None when the broker can't be queried.
+        """
+        return None
+
+    def get_close_deal(self, ticket: int):
+        """
+        `{"price", "time_msc"}` of the deal that closed position `ticket`, from the
+        broker's deal history. None when the backend keeps no history or the deal
+        isn't known (yet).
+        """
+        return None
+
+
+# Backends are imported on demand so that e.g. choosing "replay" on Linux
+# never touches the MetaTrader5 package.
+BACKENDS = {
+    "mt5": ("data.mt5_adapter", "MT5Adapter"),
+    "mock": ("backtest.mock_adapter", "MockMT5Adapter"),
+    "replay": ("backtest.replay_broker", "ReplayBroker"),
+    "sim": ("backtest.sim_broker", "SimBrokerAdapter"),
+}
+
+
+def create_broker(config):
+    """Instantiates the backend named by `broker.backend` in the config (default: mt5)."""
+    name = config.get('broker', {}).get('backend', 'mt5')
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown broker backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+
+    module_name, class_name = BACKENDS[name]
+    module = importlib.import_module(module_name)
+    return getattr(module, class_name).from_config(config)
@@ -0,0 +1,146 @@
+import logging
+import random
+import threading
+import time
+from collections import deque
+
+
+class ConnectionMonitor:
+    """
+    Non-blocking reconnection state machine for a broker adapter.
+
+    States:
+    - CONNECTED: adapter reports a live connection.
+    - BACKOFF: connection lost, waiting for the next probe slot.
+    - PROBING: a reconnect attempt is running on a background thread.
+
+    `poll()` never sleeps, so the trading loop keeps its state (candles,
+    indicators, setups, open trades) while the terminal is unreachable.
+    """
+
+    CONNECTED = "CONNECTED"
+    BACKOFF = "BACKOFF"
+    PROBING = "PROBING"
+
+    def __init__(self, adapter, connect_kwargs=None, base_delay=1.0, max_delay=30.0, jitter=0.25,
+                 clock=time.monotonic, rng=random.random, history_size=50):
+        self.adapter = adapter
+        self.connect_kwargs = connect_kwargs or {}
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.clock = clock
+        self.rng = rng
+
+        self.state = self.CONNECTED if adapter.connected else self.BACKOFF
+        self.attempts = 0
+        self.next_probe_at = clock()
+        self.outage_started = None if adapter.connected else clock()
+        self.outage_count = 0
+        self.last_outage_seconds = None
+        self.recovery_times = deque(maxlen=history_size)
+
+        self._probe_thread = None
+        self._probe_result = None
+        self._on_reconnect = []
+
+    def add_reconnect_listener(self, callback):
+        """Registers `callback(outage_seconds)`, called on the polling thread after recovery."""
+        self._on_reconnect.append(callback)
+
+    def is_connected(self) -> bool:
+        return self.state == self.CONNECTED
+
+    def report_failure(self, reason=""):
+        """Marks the connection as lost after a failed adapter call."""
+        if self.state != self.CONNECTED:
+            return
+        self.adapter.connected = False
+        self._enter_outage(reason)
+
+    def next_delay(self) -> float:
+        """Exponential backoff capped at `max_delay`, with +/- `jitter` proportional noise."""
+        delay = min(self.max_delay, self.base_delay * (2 ** max(0, self.attempts - 1)))
+        spread = delay * self.jitter
+        return max(0.0, delay - spread + 2 * spread * self.rng())
+
+    def poll(self) -> bool:
+        """
+        Advances the state machine without blocking.
+        Returns True while the adapter is usable.
+        """
+        now = self.clock()
+
+        if self.state == self.CONNECTED:
+            if self.adapter.connected:
+                return True
+            self._enter_outage("adapter reported disconnect")
+            return False
+
+        if self.state == self.PROBING:
+            if self._probe_thread.is_alive():
+                return False
+            self._probe_thread = None
+            if self._probe_result:
+                self._recover(now)
+                return True
+            self.attempts += 1
+            self.next_probe_at = now + self.next_delay()
+            self.state = self.BACKOFF
+            logging.warning(f"[!] Reconnect attempt {self.attempts} failed. Next probe in {self.next_probe_at - now:.1f}s")
+            return False
+
+        if now >= self.next_probe_at:
+            self._start_probe()
+        return False
+
+    def outage_seconds(self):
+        """Duration of the current outage, or None while connected."""
+        if self.outage_started is None:
+            return None
+        return self.clock() - self.outage_started
+
+    def stats(self) -> dict:
+        times = sorted(self.recovery_times)
+        return {
+            "state": self.state,
+            "outages": self.outage_count,
+            "attempts": self.attempts,
+            "current_outage_s": self.outage_seconds(),
+            "last_outage_s": self.last_outage_seconds,
+            "max_outage_s": times[-1] if times else None,
+            "median_outage_s": times[len(times) // 2] if times else None,
+        }
+
+    def _enter_outage(self, reason):
+        self.state = self.BACKOFF
+        self.attempts = 0
+        self.outage_started = self.clock()
+        self.outage_count += 1
+        # First probe goes out immediately; backoff only applies to repeated failures
+        self.next_probe_at = self.outage_started
+        logging.warning(f"[!] Broker connection lost ({reason or 'unknown'}). Reconnecting in background...")
+
+    def _start_probe(self):
+        self.state = self.PROBING
+        self._probe_result = None
+        self._probe_thread = threading.Thread(target=self._probe, name="broker-reconnect", daemon=True)
+        self._probe_thread.start()
+
+    def _probe(self):
+        try:
+            self._probe_result = bool(self.adapter.connect(**self.connect_kwargs))
+        except Exception as e:
+            logging.error(f"Reconnect probe raised: {e}")
+            self._probe_result = False
+
+    def _recover(self, now):
+        outage = now - self.outage_started if self.outage_started is not None else 0.0
+        self.state = self.CONNECTED
+        self.attempts = 0
+        self.outage_started = None
+        self.last_outage_seconds = outage
+        self.recovery_times.append(outage)
+        logging.info(f"[OK] Broker reconnected after {outage:.2f}s")
+        for callback in self._on_reconnect:
+            callback(outage)
@@ -1,13 +1,35 @@
-import pandas as pd
-from datetime import datetime, timedelta
+import csv
+from datetime import datetime, timedelta, timezone
 import logging
 import os
 
-try:
-    import MetaTrader5 as mt5
-except ImportError:
-    mt5 = None
-    logging.warning("MetaTrader5 package not found. Historical data download will be unavailable.")
+
+def _load_mt5():
+    try:
+        import MetaTrader5 as mt5
+    except ImportError:
+        return None
+    return mt5
+
+
+def _parse_value(value):
+    if value == "":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def _parse_timestamp(value):
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+    return datetime.fromisoformat(value)
+
 
 class DataLoader:
     """
@@ -20,6 +42,9 @@ class DataLoader:
         Downloads historical tick data from MT5.
         Requires MT5 terminal to be running on Windows.
         """
+        import pandas as pd
+
+        mt5 = _load_mt5()
         if mt5 is None:
             raise ImportError("MetaTrader5 package is required to download data.")
 
@@ -56,24 +81,31 @@ class DataLoader:
     def load_from_csv(csv_path):
         """
         Loads tick data from a CSV file.
+        Uses the stdlib csv reader so the backtest path doesn't need pandas.
         """
         if not os.path.exists(csv_path):
             raise FileNotFoundError(f"CSV file not found: {csv_path}")
 
         logging.info(f"Loading data from {csv_path}...")
-        df = pd.read_csv(csv_path)
+        with open(csv_path, newline='') as f:
+            reader = csv.DictReader(f)
+            columns = reader.fieldnames or []
+            ticks = [{k: _parse_value(v) for k, v in row.items()} for row in reader]
 
-        # Calculate spread if missing
-        if 'spread' not in df.columns and 'bid' in df.columns and 'ask' in df.columns:
-            df['spread'] = df['ask'] - df['bid']
+        has_spread = 'spread' in columns
+        has_quotes = 'bid' in columns and 'ask' in columns
+        time_col = 'timestamp' if 'timestamp' in columns else ('time' if 'time' in columns else None)
 
-        # Ensure timestamp is present
-        if 'timestamp' not in df.columns and 'time' in df.columns:
-            df['timestamp'] = pd.to_datetime(df['time'])
-        elif 'timestamp' in df.columns:
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
+        for tick in ticks:
+            # Calculate spread if missing
+            if not has_spread and has_quotes:
+                tick['spread'] = tick['ask'] - tick['bid']
 
-        return df.to_dict('records')
+            # Ensure timestamp is present
+            if time_col is not None and tick[time_col] is not None:
+                tick['timestamp'] = _parse_timestamp(tick[time_col])
+
+        return ticks
 
     @staticmethod
     def convert_df_to_ticks(df):
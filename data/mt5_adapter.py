@@ -1,13 +1,32 @@
-import MetaTrader5 as mt5
 from datetime import datetime
 import logging
+from data.broker import BrokerBackend, epoch_ms
 
+# MetaTrader5 is Windows-only and slow to import; it is loaded when the adapter is created
+mt5 = None
 
-class MT5Adapter:
+# MetaTrader5 IPC error codes (terminal unreachable / pipe broken)
+IPC_ERROR_CODES = {-10001, -10002, -10003, -10004, -10005}
+
+
+def _load_mt5():
+    global mt5
+    if mt5 is None:
+        import MetaTrader5
+        mt5 = MetaTrader5
+    return mt5
+
+
+class MT5Adapter(BrokerBackend):
     def __init__(self, magic=701970):
+        _load_mt5()
         self.connected = False
         self.magic = magic
 
+    @classmethod
+    def from_config(cls, config):
+        return cls(magic=config.get('mt5', {}).get('magic', 701970))
+
     def connect(self, login=None, password=None, server=None, magic=None) -> bool:
         if magic is not None:
             self.magic = magic
@@ -36,10 +55,19 @@ class MT5Adapter:
         logging.info("MT5 connected successfully")
         return True
 
+    def _check_ipc(self) -> None:
+        """Marks the adapter disconnected when the last call failed on the terminal pipe."""
+        err = mt5.last_error()
+        if err and err[0] in IPC_ERROR_CODES:
+            if self.connected:
+                logging.error(f"MT5 IPC failure: {err}")
+            self.connected = False
+
     def get_account_info(self):
         """Returns account information including margin and balance."""
         account_info = mt5.account_info()
         if account_info is None:
+            self._check_ipc()
             logging.error(f"Failed to get account info: {mt5.last_error()}")
             return None
 
@@ -54,6 +82,21 @@ class MT5Adapter:
             "currency": account_info.currency
         }
 
+    def get_symbol_info(self, symbol: str):
+        info = mt5.symbol_info(symbol)
+        if info is None:
+            self._check_ipc()
+            logging.error(f"Failed to get symbol info for {symbol}: {mt5.last_error()}")
+            return None
+
+        return {
+            "digits": info.digits,
+            "point": info.point,
+            "tick_size": info.trade_tick_size,
+            "tick_value": info.trade_tick_value,
+            "stops_level": info.trade_stops_level
+        }
+
     def shutdown(self) -> None:
         mt5.shutdown()
         self.connected = False
@@ -62,6 +105,7 @@ class MT5Adapter:
     def get_tick(self, symbol: str):
         tick = mt5.symbol_info_tick(symbol)
         if tick is None:
+            self._check_ipc()
             return None
 
         return {
@@ -69,12 +113,60 @@ class MT5Adapter:
             "bid": tick.bid,
             "ask": tick.ask,
             "spread": tick.ask - tick.bid,
+            "time_msc": tick.time_msc,
             "timestamp": datetime.fromtimestamp(tick.time)
         }
 
+    def get_ticks(self, symbols):
+        # The terminal has no multi-symbol quote call; stop at the first IPC failure
+        # instead of paying one timeout per symbol during an outage.
+        ticks = {}
+        for symbol in symbols:
+            tick = self.get_tick(symbol)
+            if tick:
+                ticks[symbol] = tick
+            elif not self.connected:
+                break
+        return ticks
+
+    def copy_ticks_from(self, symbol: str, date_from: datetime, count: int = 100000):
+        """
+        Returns up to `count` bid/ask ticks starting at `date_from`,
+        in the same dict format as `get_tick`.
+        """
+        # Epoch seconds: the terminal reads naive datetimes in the host's local zone
+        start = epoch_ms(date_from)
+        ticks = mt5.copy_ticks_from(symbol, start // 1000, count, mt5.COPY_TICKS_INFO)
+        if ticks is None:
+            self._check_ipc()
+            return []
+        return [t for t in self._ticks_to_dicts(symbol, ticks) if t["time_msc"] >= start]
+
+    def copy_ticks_range(self, symbol: str, date_from: datetime, date_to: datetime):
+        ticks = mt5.copy_ticks_range(symbol, date_from, date_to, mt5.COPY_TICKS_INFO)
+        if ticks is None:
+            self._check_ipc()
+            return []
+        return self._ticks_to_dicts(symbol, ticks)
+
+    @staticmethod
+    def _ticks_to_dicts(symbol, ticks):
+        return [
+            {
+                "symbol": symbol,
+                "bid": float(t["bid"]),
+                "ask": float(t["ask"]),
+                "spread": float(t["ask"] - t["bid"]),
+                "time_msc": int(t["time_msc"]),
+                "timestamp": datetime.fromtimestamp(int(t["time"]))
+            }
+            for t in ticks
+        ]
+
     def get_spread(self, symbol: str) -> float:
         tick = mt5.symbol_info_tick(symbol)
         if tick is None:
+            self._check_ipc()
             return float("inf")
         return tick.ask - tick.bid
 
@@ -89,7 +181,13 @@ class MT5Adapter:
     ) -> int:
 
         order_type = mt5.ORDER_TYPE_BUY if direction == "BUY" else mt5.ORDER_TYPE_SELL
-        price = mt5.symbol_info_tick(symbol).ask if direction == "BUY" else mt5.symbol_info_tick(symbol).bid
+        tick = mt5.symbol_info_tick(symbol)
+        if tick is None:
+            self._check_ipc()
+            logging.error(f"Order aborted: no quote for {symbol}")
+            self.last_retcode = "no_quote"
+            return -1
+        price = tick.ask if direction == "BUY" else tick.bid
 
         request = {
             "action": mt5.TRADE_ACTION_DEAL,
@@ -107,10 +205,18 @@ class MT5Adapter:
         }
 
         result = mt5.order_send(request)
+        if result is None:
+            self._check_ipc()
+            logging.error(f"Order failed: no response from terminal ({mt5.last_error()})")
+            self.last_retcode = "no_response"
+            return -1
+        self.last_retcode = result.retcode
         if result.retcode != mt5.TRADE_RETCODE_DONE:
             logging.error(f"Order failed: {result.retcode} - {result.comment}")
             return -1
 
+        # The deal price; the request price if the terminal didn't report one
+        self.last_fill = {"ticket": result.order, "price": result.price or price, "time_msc": tick.time_msc}
         return result.order
 
     def modify_sl(self, ticket: int, new_sl: float) -> bool:
@@ -128,11 +234,52 @@ class MT5Adapter:
         }
 
         result = mt5.order_send(request)
+        if result is None:
+            self._check_ipc()
+            return False
         return result.retcode == mt5.TRADE_RETCODE_DONE
 
     def position_exists(self, ticket: int) -> bool:
         position = mt5.positions_get(ticket=ticket)
-        return position is not None and len(position) > 0
+        if position is None:
+            self._check_ipc()
+            # Unknown while the terminal is unreachable; don't report the trade as closed
+            return not self.connected
+        return len(position) > 0
+
+    def get_positions(self, magic=None):
+        # positions_get has no magic filter; one bulk call, filtered locally
+        positions = mt5.positions_get()
+        if positions is None:
+            self._check_ipc()
+            return None
+
+        return [
+            {
+                "ticket": p.ticket,
+                "symbol": p.symbol,
+                "direction": "BUY" if p.type == mt5.POSITION_TYPE_BUY else "SELL",
+                "volume": p.volume,
+                "price_open": p.price_open,
+                "sl": p.sl,
+                "tp": p.tp
+            }
+            for p in positions
+            if magic is None or p.magic == magic
+        ]
+
+    def get_close_deal(self, ticket: int):
+        deals = mt5.history_deals_get(position=ticket)
+        if deals is None:
+            self._check_ipc()
+            return None
+        exits = [d for d in deals if d.entry in (mt5.DEAL_ENTRY_OUT, mt5.DEAL_ENTRY_OUT_BY)]
+        if not exits:
+            return None
+        # Partial closes are averaged by volume
+        volume = sum(d.volume for d in exits)
+        price = sum(d.price * d.volume for d in exits) / volume if volume else exits[-1].price
+        return {"price": price, "time_msc": exits[-1].time_msc}
 
     def close_position(self, ticket: int) -> bool:
         position = mt5.positions_get(ticket=ticket)
@@ -158,4 +305,7 @@ class MT5Adapter:
         }
 
         result = mt5.order_send(request)
+        if result is None:
+            self._check_ipc()
+            return False
         return result.retcode == mt5.TRADE_RETCODE_DONE
@@ -0,0 +1,193 @@
+from datetime import datetime, timedelta
+
+_EPOCH = datetime(1970, 1, 1)
+_TIME_UNITS = {"s": 1, "m": 60, "h": 3600}
+
+
+def parse_series(spec):
+    """
+    Parses a series spec: `140t` (tick count), `1m` / `30s` / `1h` (time bars)
+    or `500v` (volume). Returns `(kind, size)`.
+    """
+    spec = str(spec).strip().lower()
+    value, unit = spec[:-1], spec[-1:]
+    if not value.isdigit() or int(value) <= 0:
+        raise ValueError(f"Invalid candle series '{spec}'")
+    if unit == "t":
+        return "ticks", int(value)
+    if unit == "v":
+        return "volume", int(value)
+    if unit in _TIME_UNITS:
+        return "time", timedelta(seconds=int(value) * _TIME_UNITS[unit])
+    raise ValueError(f"Invalid candle series '{spec}' (use t, v, s, m or h)")
+
+
+class _Series:
+    __slots__ = ("name", "kind", "size", "open", "high", "low", "close", "tick_count", "volume",
+                 "timestamp_open", "timestamp_close", "index", "boundary")
+
+    def __init__(self, name, kind, size):
+        self.name = name
+        self.kind = kind
+        self.size = size
+        self.index = 0
+        self.boundary = None
+        self.reset()
+
+    def reset(self):
+        self.open = self.high = self.low = self.close = None
+        self.tick_count = 0
+        self.volume = 0
+        self.timestamp_open = self.timestamp_close = None
+
+    def candle(self):
+        candle = {
+            "open": self.open,
+            "high": self.high,
+            "low": self.low,
+            "close": self.close,
+            "volume_ticks": self.tick_count,
+            "volume": self.volume,
+            "index": self.index,
+            "timestamp_open": self.timestamp_open,
+            "timestamp_close": self.timestamp_close,
+            "series": self.name,
+        }
+        self.index += 1
+        self.reset()
+        return candle
+
+
+class MultiCandleEngine:
+    """
+    Builds several candle series (tick-count, time and volume bars) from one
+    pass over the ticks.
+
+    Ticks are aggregated into a single running segment; only when some series
+    reaches a boundary is the segment folded into every series and the due ones
+    closed. Per tick the cost is one segment update and two comparisons, so
+    extra series cost per candle close, not per tick.
+
+    Tick and volume bars close on the tick that completes them, like
+    `TickCandleEngine`. Time bars close when the first tick of the next bar
+    arrives; periods without ticks produce no bar.
+    """
+
+    def __init__(self, specs=()):
+        self.series = []
+        for spec in specs:
+            kind, size = parse_series(spec)
+            self.series.append(_Series(str(spec), kind, size))
+        self.tick_series = [s for s in self.series if s.kind == "ticks"]
+        self.volume_series = [s for s in self.series if s.kind == "volume"]
+        self.time_series = [s for s in self.series if s.kind == "time"]
+        self.ticks = 0
+        self.volume = 0
+        for s in self.tick_series + self.volume_series:
+            s.boundary = s.size
+        self._reset_segment()
+        self._update_boundaries()
+
+    def __len__(self):
+        return len(self.series)
+
+    @property
+    def names(self):
+        return [s.name for s in self.series]
+
+    def _reset_segment(self):
+        self.seg_open = self.seg_high = self.seg_low = self.seg_close = None
+        self.seg_ticks = 0
+        self.seg_volume = 0
+        self.seg_first = self.seg_last = None
+
+    def _update_boundaries(self):
+        self.next_tick = min((s.boundary for s in self.tick_series), default=float("inf"))
+        self.next_volume = min((s.boundary for s in self.volume_series), default=float("inf"))
+        # datetime.min makes the first tick set up the time bars
+        self.next_time = min((s.boundary or datetime.min for s in self.time_series), default=datetime.max)
+
+    def _flush(self):
+        """Folds the running segment into every series."""
+        if not self.seg_ticks:
+            return
+        for s in self.series:
+            if s.tick_count == 0:
+                s.open = self.seg_open
+                s.high = self.seg_high
+                s.low = self.seg_low
+                s.timestamp_open = self.seg_first
+            else:
+                if self.seg_high > s.high:
+                    s.high = self.seg_high
+                if self.seg_low < s.low:
+                    s.low = self.seg_low
+            s.close = self.seg_close
+            s.tick_count += self.seg_ticks
+            s.volume += self.seg_volume
+            s.timestamp_close = self.seg_last
+        self._reset_segment()
+
+    def process_tick(self, tick):
+        """Returns the `(series name, candle)` pairs closed by this tick, in close order."""
+        price = (tick["bid"] + tick["ask"]) / 2
+        timestamp = tick["timestamp"]
+        closed = []
+
+        if timestamp >= self.next_time:
+            self._flush()
+            for s in self.time_series:
+                if s.boundary is None or timestamp >= s.boundary:
+                    if s.tick_count:
+                        closed.append((s.name, s.candle()))
+                    s.boundary = _EPOCH + ((timestamp - _EPOCH) // s.size + 1) * s.size
+            self._update_boundaries()
+
+        if self.seg_ticks == 0:
+            self.seg_open = self.seg_high = self.seg_low = price
+            self.seg_first = timestamp
+        elif price > self.seg_high:
+            self.seg_high = price
+        elif price < self.seg_low:
+            self.seg_low = price
+        self.seg_close = price
+        self.seg_last = timestamp
+        self.seg_ticks += 1
+        volume = tick.get("volume") or 1
+        self.seg_volume += volume
+
+        self.ticks += 1
+        self.volume += volume
+        if self.ticks >= self.next_tick or self.volume >= self.next_volume:
+            self._flush()
+            for s in self.tick_series:
+                if self.ticks >= s.boundary:
+                    closed.append((s.name, s.candle()))
+                    s.boundary = self.ticks + s.size
+            for s in self.volume_series:
+                if self.volume >= s.boundary:
+                    closed.append((s.name, s.candle()))
+                    s.boundary = self.volume + s.size
+            self._update_boundaries()
+
+        return closed
+
+    def get_state(self):
+        self._flush()
+        return {
+            "specs": self.names,
+            "ticks": self.ticks,
+            "volume": self.volume,
+            "series": [{name: getattr(s, name) for name in _Series.__slots__} for s in self.series],
+        }
+
+    def load_state(self, state):
+        if state["specs"] != self.names:
+            raise ValueError(f"Snapshot built {state['specs']} candles, engine uses {self.names}")
+        self.ticks = state["ticks"]
+        self.volume = state["volume"]
+        for s, saved in zip(self.series, state["series"]):
+            for name, value in saved.items():
+                setattr(s, name, value)
+        self._reset_segment()
+        self._update_boundaries()
@@ -47,3 +47,21 @@ class TickCandleEngine:
             return candle
 
         return None
+
+    def get_state(self):
+        return {
+            "ticks_per_candle": self.ticks_per_candle,
+            "tick_count": self.tick_count,
+            "open": self.open,
+            "high": self.high,
+            "low": self.low,
+            "close": self.close,
+            "timestamp_open": self.timestamp_open,
+            "candle_index": self.candle_index,
+        }
+
+    def load_state(self, state):
+        if state["ticks_per_candle"] != self.ticks_per_candle:
+            raise ValueError(f"Snapshot built {state['ticks_per_candle']}-tick candles, engine uses {self.ticks_per_candle}")
+        for key, value in state.items():
+            setattr(self, key, value)
@@ -0,0 +1,127 @@
+import logging
+import time
+import numpy as np
+from utils.symbol_spec import get_spec
+
+
+def ticks_to_arrays(ticks):
+    """Splits tick dicts into bid/ask float arrays plus the list of timestamps."""
+    n = len(ticks)
+    bids = np.fromiter((t["bid"] for t in ticks), dtype=np.float64, count=n)
+    asks = np.fromiter((t["ask"] for t in ticks), dtype=np.float64, count=n)
+    timestamps = [t["timestamp"] for t in ticks]
+    return bids, asks, timestamps
+
+
+def spread_mask(bids, asks, symbol, max_spread_pips):
+    """Ticks the live loop's spread gate would let through."""
+    return (asks - bids) <= get_spec(symbol).pips_to_price(max_spread_pips)
+
+
+def build_candles(bids, asks, timestamps, ticks_per_candle, first_index=0):
+    """
+    Vectorized equivalent of feeding every tick through `TickCandleEngine`.
+    Returns `(candles, remainder)` where `remainder` is the mid-price slice of
+    the trailing, still-open candle.
+    """
+    mids = (bids + asks) / 2
+    n_full = len(mids) // ticks_per_candle
+    body = mids[:n_full * ticks_per_candle].reshape(n_full, ticks_per_candle)
+
+    opens = body[:, 0]
+    closes = body[:, -1]
+    highs = body.max(axis=1)
+    lows = body.min(axis=1)
+
+    candles = []
+    for i in range(n_full):
+        start = i * ticks_per_candle
+        candles.append({
+            "open": float(opens[i]),
+            "high": float(highs[i]),
+            "low": float(lows[i]),
+            "close": float(closes[i]),
+            "volume_ticks": ticks_per_candle,
+            "index": first_index + i,
+            "timestamp_open": timestamps[start],
+            "timestamp_close": timestamps[start + ticks_per_candle - 1]
+        })
+    return candles, mids[n_full * ticks_per_candle:]
+
+
+def ema_series(closes, period):
+    """Same recurrence, in the same floating-point order, as `IndicatorEngine.update`."""
+    alpha = 2 / (period + 1)
+    values = []
+    ema = None
+    for close in closes:
+        ema = close if ema is None else alpha * close + (1 - alpha) * ema
+        values.append(ema)
+    return values
+
+
+def warm_start(ticks, tick_engine, ind_engine, strategy_engine, symbol="EURUSD", max_spread_pips=None, spread_model=None):
+    """
+    Rebuilds candle, indicator and trend state from historical ticks with a batch
+    pass, then hands it to the streaming engines so the next live tick continues
+    exactly where an uninterrupted streaming run would be.
+
+    The strategy state machine itself starts in SEARCHING: setups formed on
+    history are not traded.
+
+    With a `spread_model` the history is gated exactly as the live loop would
+    gate it, and the model ends up holding the history's spread window.
+    `max_spread_pips` alone applies only an absolute cap.
+
+    Returns the indicators of the last completed candle ({} if none).
+    """
+    start = time.perf_counter()
+    if not ticks:
+        return {}
+
+    bids, asks, timestamps = ticks_to_arrays(ticks)
+    if spread_model is not None:
+        spreads = asks - bids
+        keep = spread_model.mask(spreads)
+        spread_model.seed(spreads)
+        bids, asks = bids[keep], asks[keep]
+        timestamps = [ts for ts, k in zip(timestamps, keep.tolist()) if k]
+    elif max_spread_pips is not None:
+        keep = spread_mask(bids, asks, symbol, max_spread_pips)
+        bids, asks = bids[keep], asks[keep]
+        timestamps = [ts for ts, k in zip(timestamps, keep.tolist()) if k]
+
+    tpc = tick_engine.ticks_per_candle
+    candles, remainder = build_candles(bids, asks, timestamps, tpc, first_index=tick_engine.candle_index)
+
+    # Trailing partial candle goes straight into the tick engine
+    tick_engine.candle_index += len(candles)
+    tick_engine.reset()
+    if len(remainder):
+        tail_start = len(candles) * tpc
+        tick_engine.tick_count = len(remainder)
+        tick_engine.open = float(remainder[0])
+        tick_engine.high = float(remainder.max())
+        tick_engine.low = float(remainder.min())
+        tick_engine.close = float(remainder[-1])
+        tick_engine.timestamp_open = timestamps[tail_start]
+
+    if not candles:
+        return {}
+
+    # Seed indicator history up to the penultimate candle, then stream the last
+    # one so the returned indicators come from the same code path as live.
+    history = ind_engine.max_history
+    emas = ema_series([c["close"] for c in candles[:-1]], ind_engine.ema_period) if len(candles) > 1 else []
+    ind_engine.candles = candles[:-1][-(history - 1):] if history > 1 else []
+    ind_engine.ema_values = emas[-(history - 1):] if history > 1 else []
+    indicators = ind_engine.update(candles[-1])
+
+    trend = strategy_engine.trend_analyzer
+    trend.highs = [c["high"] for c in candles[-100:]]
+    trend.lows = [c["low"] for c in candles[-100:]]
+    strategy_engine.reset_state()
+    strategy_engine.candles = candles[-100:]
+
+    logging.info(f"Warm start: {len(ticks)} ticks -> {len(candles)} candles in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return indicators
@@ -1,68 +1,337 @@
 import logging
+import time
+from collections import deque
+from execution.trade_record import TradeRecord, fill_summary
+from execution.trade_history import ClosedTradeHistory
+from utils.price_levels import PriceLevelIndex, DeadlineQueue, ABOVE, BELOW
+from utils.symbol_spec import get_spec
+from utils.metrics import METRICS
+from utils.session_journal import JOURNAL
+
+
+class _SymbolLevels:
+    """Armed TP-touch, break-even and time-stop levels for one symbol."""
+
+    def __init__(self):
+        self.bid = PriceLevelIndex()  # BUY trades are managed against the bid
+        self.ask = PriceLevelIndex()  # SELL trades are managed against the ask
+        self.time_stops = DeadlineQueue()
+        self.candles = 0
+
 
 class ExecutionEngine:
-    def __init__(self, mt5_adapter):
+    def __init__(self, mt5_adapter, time_stop_candles=30, history_size=1000, journal_path=None, ledger=None, metrics=None, session_journal=None, performance=None):
         self.mt5 = mt5_adapter
-        self.active_trades = {}  # ticket -> trade_info
-        self.closed_trades_history = []
+        self.ledger = ledger
+        self.performance = performance  # PerformanceAccumulator fed with every settled trade
+        self.metrics = metrics if metrics is not None else METRICS
+        # Broker responses go to the session journal; `journal_path` is the closed-trade journal
+        self.session_journal = session_journal if session_journal is not None else JOURNAL
+        self.active_trades = {}  # ticket -> TradeRecord
+        self.closed_trades_history = ClosedTradeHistory(maxlen=history_size, journal_path=journal_path)
+        self.recent_fills = deque(maxlen=history_size)  # TradeRecords with fill details, newest last
+        self.time_stop_candles = time_stop_candles
+        self.levels = {}  # symbol -> _SymbolLevels
+        self.last_quotes = {}  # symbol -> last managed tick, prices broker-side closes with no deal history
+        self._risk_engine = None
+        self._pending_be = []  # tickets opened without a risk engine; armed on the next management pass
+
+    def _levels_for(self, symbol):
+        levels = self.levels.get(symbol)
+        if levels is None:
+            levels = self.levels[symbol] = _SymbolLevels()
+        return levels
 
-    def execute_signal(self, signal, symbol, volume=0.1):
+    def execute_signal(self, signal, symbol, volume=0.1, risk_engine=None):
         direction = signal["direction"]
         sl = signal["sl"]
         tp = signal["tp"]
         entry_price = signal["entry_price"]
-        logging.info(f"Executing {direction} signal for {symbol} at {entry_price}")
+        logging.info("Executing %s signal for %s at %s", direction, symbol, entry_price)
+        sent_ns = time.monotonic_ns()
         ticket = self.mt5.place_market_order(symbol, direction, volume, sl, tp, "Volman Scalper")
+        done_ns = time.monotonic_ns()
+        self.metrics.counter("volman_orders_total", "Orders sent", symbol=symbol, direction=direction).inc()
+        if self.session_journal.enabled:
+            self.session_journal.record("order", symbol, {
+                "direction": direction, "volume": volume, "entry_price": entry_price, "sl": sl, "tp": tp,
+                "ticket": ticket, "retcode": self.mt5.last_retcode, "fill": self.mt5.last_fill,
+                "round_trip_ms": (done_ns - sent_ns) / 1e6,
+            })
         if ticket > 0:
-            self.active_trades[ticket] = {"symbol": symbol, "direction": direction, "entry_price": entry_price, "sl": sl, "tp": tp, "be_moved": False, "candles_held": 0, "result_registered": False, "tp_touched": False}
-            logging.info(f"Trade opened successfully. Ticket: {ticket}")
+            levels = self._levels_for(symbol)
+            trade = self.active_trades[ticket] = TradeRecord(ticket, symbol, direction, entry_price, sl, tp, opened_candle=levels.candles)
+            trade.open_time = time.time()
+            self._record_fill(trade, signal, sent_ns, done_ns)
+            self._arm_trade(ticket, risk_engine)
+            self._persist(self.active_trades[ticket])
+            logging.info("Trade opened successfully. Ticket: %s", ticket)
         else:
-            logging.error(f"Failed to open trade for {symbol}")
+            logging.error("Failed to open trade for %s", symbol)
+            retcode = self.mt5.last_retcode
+            self.metrics.counter("volman_orders_rejected_total", "Orders rejected, by broker retcode", symbol=symbol,
+                                 retcode=str(retcode) if retcode is not None else "unknown").inc()
         return ticket
 
-    def update_candles_count(self):
-        for ticket in self.active_trades:
-            self.active_trades[ticket]["candles_held"] += 1
+    def _record_fill(self, trade, signal, sent_ns, done_ns):
+        """Stores latency and slippage of a new trade's entry from the signal's tick stamps and the broker's fill."""
+        trade.tick_msc = signal.get("tick_msc")
+        trade.requested_price = trade.entry_price
+        trade.round_trip_ms = (done_ns - sent_ns) / 1e6
+        recv_ns = signal.get("recv_ns")
+        if recv_ns is not None:
+            trade.signal_latency_ms = (sent_ns - recv_ns) / 1e6
+        spec = get_spec(trade.symbol)
+        fill = self.mt5.last_fill
+        if fill and fill.get("ticket") == trade.ticket and fill.get("price") is not None:
+            trade.fill_price = fill["price"]
+            trade.fill_msc = fill.get("time_msc")
+            sign = 1 if trade.direction == "BUY" else -1
+            trade.slippage_pips = sign * spec.price_to_pips(trade.fill_price - trade.requested_price)
+        self.recent_fills.append(trade)
 
-    def manage_trades(self, symbol, risk_engine):
-        tick = self.mt5.get_tick(symbol)
-        if not tick:
-            return
-        for ticket, trade in list(self.active_trades.items()):
-            if not self.mt5.position_exists(ticket):
-                if not trade["result_registered"]:
-                    win = trade["tp_touched"]
-                    risk_engine.register_trade_result(win=win)
-                    trade["result_registered"] = True
-                trade["exit_reason"] = "MARKET"
-                self.closed_trades_history.append((ticket, trade))
-                del self.active_trades[ticket]
+        logging.info("Fill %s %s: requested %.*f | filled %s | signal %s | round trip %.2f ms",
+                     trade.symbol, trade.direction, spec.digits, trade.requested_price,
+                     "%.*f (%+.2f pips)" % (spec.digits, trade.fill_price, trade.slippage_pips)
+                     if trade.slippage_pips is not None else "n/a",
+                     "%.2f ms" % trade.signal_latency_ms if trade.signal_latency_ms is not None else "n/a",
+                     trade.round_trip_ms)
+
+    def fill_summary(self):
+        """Percentiles of signal latency, order round trip and slippage over the recent fills."""
+        return fill_summary(self.recent_fills)
+
+    def _arm_trade(self, ticket, risk_engine=None):
+        trade = self.active_trades[ticket]
+        levels = self._levels_for(trade.symbol)
+        feed, side = (levels.bid, ABOVE) if trade.direction == "BUY" else (levels.ask, BELOW)
+        feed.arm((ticket, "tp"), trade.tp, side, self._on_tp_touched)
+        risk_engine = risk_engine or self._risk_engine
+        if risk_engine is not None:
+            self._arm_be(ticket, trade, risk_engine)
+        else:
+            self._pending_be.append(ticket)
+        levels.time_stops.arm(ticket, trade.opened_candle + self.time_stop_candles, self._on_time_stop)
+
+    def _arm_be(self, ticket, trade, risk_engine):
+        levels = self._levels_for(trade.symbol)
+        feed, side = (levels.bid, ABOVE) if trade.direction == "BUY" else (levels.ask, BELOW)
+        be_price = risk_engine.be_trigger_price(trade.direction, trade.entry_price, trade.symbol)
+        feed.arm((ticket, "be"), be_price, side, self._on_be_level)
+
+    def _disarm_trade(self, ticket, trade):
+        levels = self._levels_for(trade.symbol)
+        feed = levels.bid if trade.direction == "BUY" else levels.ask
+        feed.disarm((ticket, "tp"))
+        feed.disarm((ticket, "be"))
+        levels.time_stops.disarm(ticket)
+
+    def remove_trade(self, ticket):
+        """Drops a trade closed outside the engine (e.g. broker-side SL/TP) and disarms its levels."""
+        trade = self.active_trades.pop(ticket, None)
+        if trade is not None:
+            self._disarm_trade(ticket, trade)
+            self._persist(trade, status="CLOSED")
+        return trade
+
+    def _persist(self, trade, status="OPEN"):
+        if self.ledger is not None:
+            if trade.ticket in self.active_trades:
+                trade.candles_held = self._levels_for(trade.symbol).candles - trade.opened_candle
+            self.ledger.record_trade(trade, status)
+
+    def reconcile(self, ledger_trades, risk_engine, magic=None):
+        """
+        Rebuilds `active_trades` after a restart from the ledger's open trades and
+        one bulk broker positions query:
+        - ledger trade still open at the broker: restored with its flags and the
+          candles it had already held, so its time stop keeps its deadline
+        - ledger trade gone at the broker: closed while offline, result registered
+        - broker position with our magic but unknown to the ledger: adopted
+        Returns a summary dict, or None if the broker couldn't be queried.
+        """
+        positions = self.mt5.get_positions(magic=magic)
+        if positions is None:
+            return None
+        by_ticket = {p["ticket"]: p for p in positions}
+        summary = {"restored": 0, "closed_offline": 0, "adopted": 0}
+        self._risk_engine = risk_engine
+
+        for trade in ledger_trades:
+            pos = by_ticket.pop(trade.ticket, None)
+            if pos is None:
+                if not trade.result_registered:
+                    risk_engine.register_trade_result(win=trade.tp_touched)
+                    trade.result_registered = True
+                self._settle(trade, "MARKET")
+                self._persist(trade, status="CLOSED")
+                summary["closed_offline"] += 1
                 continue
+            # Broker is authoritative for the stops
+            trade.sl = pos["sl"]
+            trade.tp = pos["tp"]
+            trade.opened_candle = self._levels_for(trade.symbol).candles - (trade.candles_held or 0)
+            self.active_trades[trade.ticket] = trade
+            self._arm_trade(trade.ticket, risk_engine)
+            summary["restored"] += 1
+
+        for ticket, pos in by_ticket.items():
+            logging.warning("Adopting position %s (%s %s) not found in ledger", ticket, pos['direction'], pos['symbol'])
+            trade = TradeRecord(ticket, pos["symbol"], pos["direction"], pos["price_open"], pos["sl"], pos["tp"],
+                                opened_candle=self._levels_for(pos["symbol"]).candles)
+            self.active_trades[ticket] = trade
+            self._arm_trade(ticket, risk_engine)
+            self._persist(trade)
+            summary["adopted"] += 1
+
+        return summary
+
+    def update_candles_count(self, symbol=None):
+        if symbol is not None:
+            self._levels_for(symbol).candles += 1
+        else:
+            for levels in self.levels.values():
+                levels.candles += 1
+        if self.ledger is not None:
+            # Keeps each open trade's candles held current in the ledger
+            for trade in self.active_trades.values():
+                if symbol is None or trade.symbol == symbol:
+                    self._persist(trade)
+
+    def candles_held(self, ticket):
+        trade = self.active_trades[ticket]
+        return self._levels_for(trade.symbol).candles - trade.opened_candle
+
+    def sync_positions(self, risk_engine):
+        """
+        Retires trades the broker no longer holds. Uses one bulk positions query
+        for all symbols when the backend supports it.
+        """
+        if not self.active_trades:
+            return
+        positions = self.mt5.get_positions()
+        open_tickets = None if positions is None else {p["ticket"] for p in positions}
         for ticket, trade in list(self.active_trades.items()):
-            current_price = tick["bid"] if trade["direction"] == "BUY" else tick["ask"]
-            if not trade["tp_touched"]:
-                if trade["direction"] == "BUY":
-                    if current_price >= trade["tp"]: trade["tp_touched"] = True
-                else:
-                    if current_price <= trade["tp"]: trade["tp_touched"] = True
-            if not trade["be_moved"]:
-                if risk_engine.should_move_to_be(trade["direction"], trade["entry_price"], current_price):
-                    if self.mt5.modify_sl(ticket, trade["entry_price"]): trade["be_moved"] = True
-            if trade["candles_held"] >= 30:
-                if self.mt5.close_position(ticket):
-                    if not trade["result_registered"]:
-                        win = trade["tp_touched"]
-                        risk_engine.register_trade_result(win=win)
-                        trade["result_registered"] = True
-                    trade["exit_reason"] = "TIME_STOP"
-                    self.closed_trades_history.append((ticket, trade))
-                    del self.active_trades[ticket]
-                    continue
+            exists = ticket in open_tickets if open_tickets is not None else self.mt5.position_exists(ticket)
+            if not exists:
+                if not trade.result_registered:
+                    risk_engine.register_trade_result(win=trade.tp_touched)
+                    trade.result_registered = True
+                self._settle(trade, "MARKET")
+                self.remove_trade(ticket)
+
+    def manage_trades(self, symbol, risk_engine, tick=None, sync=True):
+        """
+        Checks `symbol`'s armed levels against its current quote. Multi-symbol
+        callers run `sync_positions` once per poll and pass `sync=False`.
+        """
+        # Callers that already hold the current quote pass it in to save a broker round trip
+        if tick is None:
+            tick = self.mt5.get_tick(symbol)
+        if not tick:
+            return
+        self.last_quotes[symbol] = tick
+        if sync:
+            self.sync_positions(risk_engine)
+
+        self._risk_engine = risk_engine
+        if self._pending_be:
+            for ticket in self._pending_be:
+                trade = self.active_trades.get(ticket)
+                if trade is not None:
+                    self._arm_be(ticket, trade, risk_engine)
+            self._pending_be = []
+
+        # Only the nearest armed level on each side is compared per tick
+        levels = self.levels.get(symbol)
+        if levels is None:
+            return
+        levels.bid.check(tick["bid"])
+        levels.ask.check(tick["ask"])
+        levels.time_stops.advance(levels.candles)
+
+    def _settle(self, trade, reason):
+        """
+        Moves a closed trade to the history, priced from its fill to the
+        closing deal in the broker's history. Where the backend has no deal
+        history the exit is estimated from the symbol's last quote: a level the
+        quote had already crossed for broker-side closes, else the closing side
+        of the spread. Trades with neither (closed while offline) are left
+        unpriced.
+        """
+        trade.exit_reason = reason
+        trade.close_time = time.time()
+        buy = trade.direction == "BUY"
+        price = None
+        deal = self.mt5.get_close_deal(trade.ticket)
+        if deal is not None:
+            price = deal["price"]
+        else:
+            tick = self.last_quotes.get(trade.symbol)
+            if tick is not None:
+                price = tick["bid"] if buy else tick["ask"]
+                if reason == "MARKET":
+                    if trade.tp and (price >= trade.tp if buy else price <= trade.tp):
+                        price = trade.tp
+                    elif trade.sl and (price <= trade.sl if buy else price >= trade.sl):
+                        price = trade.sl
+        if price is not None:
+            # Entry slippage counts against the trade
+            entry = trade.fill_price if trade.fill_price is not None else trade.entry_price
+            trade.exit_price = price
+            trade.profit_pips = get_spec(trade.symbol).price_to_pips(price - entry if buy else entry - price)
+            if self.performance is not None:
+                self.performance.add(trade.profit_pips, close_time=trade.close_time, open_time=trade.open_time)
+                if self.ledger is not None:
+                    self.ledger.record_performance(self.performance)
+        self.closed_trades_history.append(trade)
+
+    def _on_tp_touched(self, key, level):
+        trade = self.active_trades.get(key[0])
+        if trade is not None:
+            trade.tp_touched = True
+            self._persist(trade)
+
+    def _on_be_level(self, key, level):
+        ticket = key[0]
+        trade = self.active_trades.get(ticket)
+        if trade is None or trade.be_moved:
+            return
+        ok = self.mt5.modify_sl(ticket, trade.entry_price)
+        self._journal_response("modify_sl", trade, ok, sl=trade.entry_price)
+        if ok:
+            trade.be_moved = True
+            self._persist(trade)
+        else:
+            # Retry on the next tick that is still beyond the level
+            levels = self._levels_for(trade.symbol)
+            feed, side = (levels.bid, ABOVE) if trade.direction == "BUY" else (levels.ask, BELOW)
+            feed.arm(key, level, side, self._on_be_level)
+
+    def _on_time_stop(self, ticket, deadline):
+        trade = self.active_trades.get(ticket)
+        if trade is None:
+            return
+        ok = self.mt5.close_position(ticket)
+        self._journal_response("close", trade, ok, reason="TIME_STOP")
+        if ok:
+            if not trade.result_registered:
+                self._risk_engine.register_trade_result(win=trade.tp_touched)
+                trade.result_registered = True
+            self._settle(trade, "TIME_STOP")
+            self.remove_trade(ticket)
+        else:
+            # Retry on the next management pass
+            self._levels_for(trade.symbol).time_stops.arm(ticket, deadline, self._on_time_stop)
+
+    def _journal_response(self, kind, trade, ok, **data):
+        if self.session_journal.enabled:
+            self.session_journal.record(kind, trade.symbol, dict(data, ticket=trade.ticket, ok=bool(ok),
+                                                                 retcode=self.mt5.last_retcode))
 
     def cleanup_closed_trades(self, risk_engine):
         for ticket, trade in list(self.active_trades.items()):
             if not self.mt5.position_exists(ticket):
-                if not trade["result_registered"]:
-                    win = trade["tp_touched"]
-                    risk_engine.register_trade_result(win=win)
-                del self.active_trades[ticket]
+                if not trade.result_registered:
+                    risk_engine.register_trade_result(win=trade.tp_touched)
+                self.remove_trade(ticket)
@@ -0,0 +1,210 @@
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from execution.trade_record import TradeRecord, fill_summary
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    ticket INTEGER PRIMARY KEY,
+    symbol TEXT NOT NULL,
+    direction TEXT NOT NULL,
+    entry_price REAL,
+    sl REAL,
+    tp REAL,
+    opened_candle INTEGER,
+    be_moved INTEGER,
+    tp_touched INTEGER,
+    result_registered INTEGER,
+    exit_reason TEXT,
+    status TEXT NOT NULL,
+    updated_at REAL,
+    tick_msc INTEGER,
+    fill_msc INTEGER,
+    requested_price REAL,
+    fill_price REAL,
+    slippage_pips REAL,
+    signal_latency_ms REAL,
+    round_trip_ms REAL,
+    open_time REAL,
+    close_time REAL,
+    exit_price REAL,
+    profit_pips REAL,
+    candles_held INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_trades_status ON trades(status);
+CREATE TABLE IF NOT EXISTS risk_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_TRADE_COLUMNS = (
+    "ticket", "symbol", "direction", "entry_price", "sl", "tp", "opened_candle",
+    "be_moved", "tp_touched", "result_registered", "exit_reason", "tick_msc", "fill_msc",
+    "requested_price", "fill_price", "slippage_pips", "signal_latency_ms", "round_trip_ms",
+    "open_time", "close_time", "exit_price", "profit_pips", "candles_held"
+)
+
+# Columns added after the first release; older ledgers are migrated on open
+_ADDED_COLUMNS = (
+    ("tick_msc", "INTEGER"), ("fill_msc", "INTEGER"), ("requested_price", "REAL"), ("fill_price", "REAL"),
+    ("slippage_pips", "REAL"), ("signal_latency_ms", "REAL"), ("round_trip_ms", "REAL"),
+    ("open_time", "REAL"), ("close_time", "REAL"), ("exit_price", "REAL"), ("profit_pips", "REAL"),
+    ("candles_held", "INTEGER"),
+)
+
+_STOP = object()
+
+
+def session_key(now=None):
+    """Risk counters are scoped to the UTC trading day."""
+    now = now or datetime.now(timezone.utc)
+    return now.strftime("%Y-%m-%d")
+
+
+class TradeLedger:
+    """
+    Durable record of open trades and risk counters in SQLite (WAL mode).
+
+    Writes are queued and applied by a background thread so the trading loop
+    never waits on disk. On startup `load()` returns the last known open trades
+    and risk state for reconciliation against the broker.
+    """
+
+    def __init__(self, path="logs/ledger.db"):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(trades)")}
+        for name, kind in _ADDED_COLUMNS:
+            if name not in existing:
+                conn.execute(f"ALTER TABLE trades ADD COLUMN {name} {kind}")
+        conn.commit()
+        conn.close()
+
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._run_writer, name="ledger-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # Hot path: only enqueue a snapshot of the values
+    def record_trade(self, trade, status="OPEN"):
+        row = tuple(getattr(trade, name) for name in _TRADE_COLUMNS) + (status, time.time())
+        self._queue.put(("trade", row))
+
+    def record_risk(self, risk_engine):
+        state = {
+            "trades_this_session": risk_engine.trades_this_session,
+            "consecutive_losses": risk_engine.consecutive_losses,
+            "session_date": session_key(),
+        }
+        self._queue.put(("risk", state))
+
+    def record_performance(self, accumulator):
+        """Persists a `PerformanceAccumulator` so the statistics survive restarts."""
+        self._queue.put(("risk", {"performance": json.dumps(accumulator.get_state())}))
+
+    # Startup
+    def load(self):
+        """Returns `(open_trades, risk_state)` as last persisted; `risk_state["performance"]` is an accumulator state."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT {', '.join(_TRADE_COLUMNS)} FROM trades WHERE status = 'OPEN'"
+            ).fetchall()
+            risk_rows = conn.execute("SELECT key, value FROM risk_state").fetchall()
+        finally:
+            conn.close()
+
+        open_trades = []
+        for row in rows:
+            data = dict(zip(_TRADE_COLUMNS, row))
+            for flag in ("be_moved", "tp_touched", "result_registered"):
+                data[flag] = bool(data[flag])
+            open_trades.append(TradeRecord.from_dict(data))
+
+        risk_state = dict(risk_rows)
+        for key in ("trades_this_session", "consecutive_losses"):
+            if key in risk_state:
+                risk_state[key] = int(risk_state[key])
+        if "performance" in risk_state:
+            risk_state["performance"] = json.loads(risk_state["performance"])
+        return open_trades, risk_state
+
+    def fill_summary(self, symbol=None):
+        """Latency and slippage percentiles over every recorded fill (see `fill_summary`)."""
+        query = f"SELECT {', '.join(_TRADE_COLUMNS)} FROM trades WHERE round_trip_ms IS NOT NULL"
+        params = ()
+        if symbol:
+            query += " AND symbol = ?"
+            params = (symbol,)
+        conn = self._connect()
+        try:
+            rows = conn.execute(query, params).fetchall()
+        finally:
+            conn.close()
+        return fill_summary([TradeRecord.from_dict(dict(zip(_TRADE_COLUMNS, row))) for row in rows])
+
+    def flush(self, timeout=5.0):
+        """Blocks until every queued write has been committed."""
+        done = threading.Event()
+        self._queue.put(("flush", done))
+        return done.wait(timeout)
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join(timeout=5.0)
+
+    def _run_writer(self):
+        conn = self._connect()
+        placeholders = ", ".join("?" * (len(_TRADE_COLUMNS) + 2))
+        insert_trade = f"INSERT OR REPLACE INTO trades ({', '.join(_TRADE_COLUMNS)}, status, updated_at) VALUES ({placeholders})"
+        try:
+            while True:
+                item = self._queue.get()
+                pending_events = []
+                stop = False
+                # Drain whatever is queued into a single transaction
+                while True:
+                    if item is _STOP:
+                        stop = True
+                    else:
+                        kind, payload = item
+                        try:
+                            if kind == "trade":
+                                conn.execute(insert_trade, payload)
+                            elif kind == "risk":
+                                conn.executemany(
+                                    "INSERT OR REPLACE INTO risk_state (key, value) VALUES (?, ?)",
+                                    [(k, str(v)) for k, v in payload.items()]
+                                )
+                            elif kind == "flush":
+                                pending_events.append(payload)
+                        except sqlite3.Error as e:
+                            logging.error(f"Ledger write failed: {e}")
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                conn.commit()
+                for event in pending_events:
+                    event.set()
+                if stop:
+                    return
+        finally:
+            conn.close()
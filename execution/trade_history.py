@@ -0,0 +1,95 @@
+import json
+import logging
+import os
+from collections import deque
+from execution.trade_record import TradeRecord
+
+
+class ClosedTradeHistory:
+    """
+    Bounded in-memory ring of recently closed trades. Trades evicted from the
+    ring are appended to a JSON-lines journal on disk in batches of
+    `spill_every`, so memory stays flat on long runs, the trading loop opens
+    the file once per batch, and the full history remains queryable via
+    `iter_all()`.
+    """
+
+    def __init__(self, maxlen=1000, journal_path=None, spill_every=100):
+        self.maxlen = maxlen
+        self.journal_path = journal_path
+        self.spill_every = spill_every
+        self.ring = deque()
+        self.total = 0
+        self.spilled = 0
+        self._pending = []  # evicted trades not yet written, as dicts
+
+        if journal_path:
+            directory = os.path.dirname(journal_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self.ring)
+
+    def __iter__(self):
+        return iter(self.ring)
+
+    def __bool__(self):
+        return bool(self.ring)
+
+    def append(self, trade):
+        self.total += 1
+        trade.seq = self.total
+        self.ring.append(trade)
+        if len(self.ring) > self.maxlen:
+            self._spill(self.ring.popleft())
+
+    def since(self, seq):
+        """Closed trades with a sequence number greater than `seq`, oldest first."""
+        if self.total <= seq:
+            return []
+        newer = []
+        for trade in reversed(self.ring):
+            if trade.seq <= seq:
+                break
+            newer.append(trade)
+        newer.reverse()
+        return newer
+
+    def recent(self, n=10):
+        return list(self.ring)[-n:]
+
+    def iter_all(self):
+        """Every closed trade: journaled ones first, then those awaiting the next batch, then the in-memory ring."""
+        if self.journal_path and os.path.exists(self.journal_path):
+            with open(self.journal_path) as f:
+                for line in f:
+                    if line.strip():
+                        yield TradeRecord.from_dict(json.loads(line))
+        for data in self._pending:
+            yield TradeRecord.from_dict(data)
+        yield from self.ring
+
+    def flush(self):
+        """Spills the whole ring to the journal (e.g. at shutdown)."""
+        while self.ring:
+            self._spill(self.ring.popleft())
+        self._write_pending()
+
+    def _spill(self, trade):
+        if not self.journal_path:
+            return
+        self._pending.append(trade.to_dict())
+        self.spilled += 1
+        if len(self._pending) >= self.spill_every:
+            self._write_pending()
+
+    def _write_pending(self):
+        if not self._pending:
+            return
+        try:
+            with open(self.journal_path, "a") as f:
+                f.writelines(json.dumps(data) + "\n" for data in self._pending)
+        except OSError as e:
+            logging.error(f"Failed to journal {len(self._pending)} closed trades: {e}")
+        self._pending = []
@@ -0,0 +1,82 @@
+# Per-fill execution quality, summarized by `fill_summary`
+FILL_METRICS = ("signal_latency_ms", "round_trip_ms", "slippage_pips")
+
+
+class TradeRecord:
+    """
+    Compact state of one trade managed by `ExecutionEngine`.
+
+    Fill fields (None when unknown): `tick_msc` is the broker time of the tick
+    that triggered the entry and `fill_msc` that of the quote the fill was priced
+    at. `signal_latency_ms` runs from local receipt of that tick to the order
+    being sent, and `round_trip_ms` covers the order call. `slippage_pips` is the
+    fill against `requested_price`, positive when adverse.
+
+    `open_time`/`close_time` are local unix seconds. `exit_price` is the
+    closing deal's price, or an estimate from the last quote seen where the
+    broker keeps no deal history (see `ExecutionEngine._settle`); `profit_pips`
+    runs from `fill_price` (else `entry_price`) to it.
+    """
+
+    __slots__ = (
+        "ticket", "symbol", "direction", "entry_price", "sl", "tp",
+        "opened_candle", "be_moved", "tp_touched", "result_registered",
+        "exit_reason", "seq", "tick_msc", "fill_msc", "requested_price", "fill_price",
+        "slippage_pips", "signal_latency_ms", "round_trip_ms",
+        "open_time", "close_time", "exit_price", "profit_pips", "candles_held"
+    )
+
+    def __init__(self, ticket, symbol, direction, entry_price, sl, tp, opened_candle=0):
+        self.ticket = ticket
+        self.symbol = symbol
+        self.direction = direction
+        self.entry_price = entry_price
+        self.sl = sl
+        self.tp = tp
+        self.opened_candle = opened_candle
+        self.be_moved = False
+        self.tp_touched = False
+        self.result_registered = False
+        self.exit_reason = None
+        self.seq = 0  # position in the closed-trade history, set when closed
+        self.tick_msc = self.fill_msc = None
+        self.requested_price = self.fill_price = self.slippage_pips = None
+        self.signal_latency_ms = self.round_trip_ms = None
+        self.open_time = self.close_time = self.exit_price = self.profit_pips = None
+        self.candles_held = 0  # as of the last write; restores the time stop after a restart
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        record = cls.__new__(cls)
+        for name in cls.__slots__:
+            setattr(record, name, data.get(name))
+        return record
+
+    def __repr__(self):
+        return f"TradeRecord(ticket={self.ticket}, {self.direction} {self.symbol} @ {self.entry_price}, exit={self.exit_reason})"
+
+
+def _percentile(ordered, p):
+    # Nearest rank
+    return ordered[max(0, -(-len(ordered) * p // 100) - 1)]
+
+
+def fill_summary(trades):
+    """`{metric: {count, mean, p50, p90, p99, max}}` over the trades that recorded each fill metric."""
+    summary = {}
+    for metric in FILL_METRICS:
+        values = sorted(v for v in (getattr(t, metric) for t in trades) if v is not None)
+        if not values:
+            continue
+        summary[metric] = {
+            "count": len(values),
+            "mean": sum(values) / len(values),
+            "p50": _percentile(values, 50),
+            "p90": _percentile(values, 90),
+            "p99": _percentile(values, 99),
+            "max": values[-1],
+        }
+    return summary
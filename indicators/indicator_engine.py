@@ -43,7 +43,7 @@ class IndicatorEngine:
             # Fallback: use shorter lookback during warmup
             lookback = len(self.ema_values)
             ema_slope = ema - self.ema_values[-lookback]
-            logging.debug(f"Using fallback slope: {lookback} candles (need {self.slope_lookback})")
+            logging.debug("Using fallback slope: %s candles (need %s)", lookback, self.slope_lookback)
 
         # Average range (volatility filter)
         avg_range = None
@@ -62,4 +62,17 @@ class IndicatorEngine:
             "ema20": ema,
             "ema20_slope": ema_slope,
             "avg_range": avg_range
-        }
\ No newline at end of file
+        }
+
+    def get_state(self):
+        return {
+            "params": (self.ema_period, self.slope_lookback, self.range_lookback),
+            "candles": list(self.candles),
+            "ema_values": list(self.ema_values),
+        }
+
+    def load_state(self, state):
+        if tuple(state["params"]) != (self.ema_period, self.slope_lookback, self.range_lookback):
+            raise ValueError("Snapshot indicator parameters differ from the current configuration")
+        self.candles = list(state["candles"])
+        self.ema_values = list(state["ema_values"])
\ No newline at end of file
@@ -1,12 +1,36 @@
-from utils.pip_utils import pips_to_price, price_to_pips
+from utils.symbol_spec import get_spec
 
 class RiskEngine:
-    def __init__(self, max_trades_session=5, max_consecutive_losses=3, tp_multiplier=1.5):
+    def __init__(self, max_trades_session=5, max_consecutive_losses=3, tp_multiplier=1.5, be_trigger_pips=7.0):
         self.max_trades_session = max_trades_session
+        self.be_trigger_pips = be_trigger_pips
         self.max_consecutive_losses = max_consecutive_losses
         self.tp_multiplier = tp_multiplier
         self.trades_this_session = 0
         self.consecutive_losses = 0
+        self.ledger = None  # optional TradeLedger; counters are persisted on every change
+        self._levels = {}  # symbol -> SL/BE distances in price units
+
+    @classmethod
+    def from_config(cls, config):
+        trading = config['trading']
+        return cls(
+            max_trades_session=trading.get('max_trades_session', 5),
+            max_consecutive_losses=trading.get('max_consecutive_losses', 3),
+            tp_multiplier=trading.get('take_profit_multiplier', 1.5),
+        )
+
+    def _persist(self):
+        if self.ledger is not None:
+            self.ledger.record_risk(self)
+
+    def restore(self, risk_state, current_session):
+        """Restores counters persisted by the ledger if they belong to the current session."""
+        if risk_state.get("session_date") != current_session:
+            return False
+        self.trades_this_session = risk_state.get("trades_this_session", 0)
+        self.consecutive_losses = risk_state.get("consecutive_losses", 0)
+        return True
 
     def can_trade(self):
         if self.trades_this_session >= self.max_trades_session:
@@ -15,51 +39,73 @@ class RiskEngine:
             return False
         return True
 
-    def calculate_sl_tp(self, direction, entry_price, pb_extreme):
+    def levels_for(self, symbol):
+        """Per-symbol pip distances converted to price units on first use."""
+        levels = self._levels.get(symbol)
+        if levels is None:
+            spec = get_spec(symbol)
+            levels = self._levels[symbol] = {
+                "sl_buffer": spec.pips_to_price(0.5),
+                "min_risk": spec.pips_to_price(4.0),
+                "fallback_sl": spec.pips_to_price(6.5),
+                "be_trigger": spec.pips_to_price(self.be_trigger_pips),
+            }
+        return levels
+
+    def calculate_sl_tp(self, direction, entry_price, pb_extreme, symbol="EURUSD"):
         """
         Calculates SL and TP based on structural extremes with fallbacks.
         TP uses configurable multiplier (default 1.5 RR).
         """
+        levels = self.levels_for(symbol)
         if direction == "BUY":
-            sl = pb_extreme - pips_to_price(0.5)
+            sl = pb_extreme - levels["sl_buffer"]
             # If risk is too small (< 4 pips), use fallback (6.5 pips)
-            if price_to_pips(entry_price - sl) < 4.0:
-                sl = entry_price - pips_to_price(6.5)
+            if entry_price - sl < levels["min_risk"]:
+                sl = entry_price - levels["fallback_sl"]
 
             risk = entry_price - sl
             tp = entry_price + (risk * self.tp_multiplier)
         else:
-            sl = pb_extreme + pips_to_price(0.5)
+            sl = pb_extreme + levels["sl_buffer"]
             # If risk is too small (< 4 pips), use fallback (6.5 pips)
-            if price_to_pips(sl - entry_price) < 4.0:
-                sl = entry_price + pips_to_price(6.5)
+            if sl - entry_price < levels["min_risk"]:
+                sl = entry_price + levels["fallback_sl"]
 
             risk = sl - entry_price
             tp = entry_price - (risk * self.tp_multiplier)
 
         return sl, tp
 
-    def should_move_to_be(self, direction, entry_price, current_price):
+    def should_move_to_be(self, direction, entry_price, current_price, symbol="EURUSD"):
         """
         Moves SL to BE when profit reaches 7.0 pips.
         Increased from 5.0 to allow more 'breathing room' for the 1.5 RR target.
         """
         if direction == "BUY":
-            profit_pips = price_to_pips(current_price - entry_price)
+            profit = current_price - entry_price
         else:
-            profit_pips = price_to_pips(entry_price - current_price)
+            profit = entry_price - current_price
+
+        return profit >= self.levels_for(symbol)["be_trigger"]
 
-        return profit_pips >= 7.0
+    def be_trigger_price(self, direction, entry_price, symbol="EURUSD"):
+        """Price at which `should_move_to_be` turns true, for arming a level trigger."""
+        offset = self.levels_for(symbol)["be_trigger"]
+        return entry_price + offset if direction == "BUY" else entry_price - offset
 
     def register_new_trade(self):
         self.trades_this_session += 1
+        self._persist()
 
     def register_trade_result(self, win: bool):
         if win:
             self.consecutive_losses = 0
         else:
             self.consecutive_losses += 1
+        self._persist()
 
     def reset_session(self):
         self.trades_this_session = 0
         self.consecutive_losses = 0
+        self._persist()
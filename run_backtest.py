@@ -2,15 +2,30 @@ import argparse
 import logging
 import sys
 from backtest.replay_engine import ReplayEngine
+from backtest.monte_carlo import METHODS, simulate, trade_sessions
 from data.data_loader import DataLoader
+from utils.news_filter import CALENDAR
 
 def main():
     parser = argparse.ArgumentParser(description="Volman Bot Backtester")
     parser.add_argument("--days", type=int, default=2, help="Number of days to backtest (default: 2)")
-    parser.add_argument("--source", type=str, choices=["csv", "mt5"], default="csv",
-                        help="Data source: csv or mt5 (mt5 requires Windows)")
+    parser.add_argument("--source", type=str, choices=["csv", "mt5", "synthetic"], default="csv",
+                        help="Data source: csv, mt5 (requires Windows) or synthetic (generated ticks)")
     parser.add_argument("--csv", type=str, default="data/sample_ticks.csv", help="Path to CSV file (if source=csv)")
     parser.add_argument("--symbol", type=str, default="EURUSD", help="Symbol to backtest")
+    parser.add_argument("--ticks", type=int, default=1000000, help="Number of ticks (if source=synthetic)")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed (if source=synthetic)")
+    parser.add_argument("--timeframes", type=str, default="",
+                        help="Extra candle series built in the same pass, comma-separated (e.g. 140t,233t,1m)")
+    parser.add_argument("--profile", action="store_true", help="Report per-stage latency histograms")
+    parser.add_argument("--funnel", type=str, default="",
+                        help="Save every strategy decision with its measured values as columnar arrays (.npz)")
+    parser.add_argument("--equity-curve", type=str, default="", help="Append each trade's equity point to this CSV")
+    parser.add_argument("--monte-carlo", type=int, default=0, metavar="PATHS",
+                        help="Resample the trades into this many paths under the session risk limits (e.g. 100000)")
+    parser.add_argument("--mc-method", type=str, choices=METHODS, default="bootstrap",
+                        help="Resample single trades, shuffle their order or draw whole sessions (default: bootstrap)")
+    parser.add_argument("--calendar", type=str, default="", help="Economic calendar CSV/JSON for the news blackout")
 
     args = parser.parse_args()
 
@@ -30,6 +45,11 @@ def main():
             print(f"Error loading CSV: {e}")
             sys.exit(1)
 
+    elif args.source == "synthetic":
+        # numpy is only needed for generated data
+        from backtest.generate_test_data import generate_ticks, to_ticks
+        ticks = to_ticks(generate_ticks(args.ticks, seed=args.seed, symbol=args.symbol), symbol=args.symbol)
+
     elif args.source == "mt5":
         try:
             df = DataLoader.download_historical_ticks(symbol=args.symbol, days=args.days)
@@ -46,12 +66,26 @@ def main():
         print("No data available for backtest.")
         sys.exit(1)
 
+    if args.calendar:
+        print(f"Loaded {CALENDAR.load_file(args.calendar)} calendar events")
+
     # Run backtest
-    engine = ReplayEngine(symbol=args.symbol)
+    timeframes = [s for s in args.timeframes.split(",") if s]
+    engine = ReplayEngine(symbol=args.symbol, timeframes=timeframes, profile=args.profile, funnel=bool(args.funnel),
+                          equity_curve=args.equity_curve or None)
     report = engine.run(ticks)
+    if args.funnel:
+        print(f"Saved {engine.funnel.save(args.funnel):,} funnel records to {args.funnel}")
 
     # Display results
     report.display()
+    if args.monte_carlo:
+        if not engine.completed_trades:
+            print("No trades to resample for the Monte Carlo analysis.")
+            return
+        profits, sessions = trade_sessions(engine.completed_trades)
+        simulate(profits, sessions, method=args.mc_method, paths=args.monte_carlo,
+                 risk_engine=engine.risk_engine, seed=args.seed).display()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,499 @@
+import time
+import logging
+import yaml
+import os
+import signal
+import sys
+from datetime import datetime, timedelta, timezone
+from data.broker import create_broker
+from data.connection_monitor import ConnectionMonitor
+from risk.risk_engine import RiskEngine
+from execution.execution_engine import ExecutionEngine
+from execution.ledger import TradeLedger, session_key
+from backtest.performance import PerformanceAccumulator
+from runtime.symbol_pipeline import SymbolPipeline
+from utils.time_utils import SESSIONS, load_sessions
+from utils.checkpoint import CheckpointWriter, load_checkpoint
+from utils.symbol_spec import SPECS
+from utils.news_filter import load_calendar
+from utils.latency import LATENCY, load_latency
+from utils.metrics import METRICS, MetricsExporter
+from utils.session_journal import JOURNAL, load_journal
+
+class VolmanTradingBot:
+    def __init__(self, config=None, config_path="config/settings.yaml"):
+        self.config_path = config_path
+        if config:
+            self.config = config
+        else:
+            self.config = self._load_config()
+
+        trading = self.config['trading']
+        self.symbols = list(trading.get('symbols') or [trading['symbol']])
+        self.volume = trading['volume']
+        self.mt5 = create_broker(self.config)
+        self.pipelines = {}  # symbol -> SymbolPipeline
+        self.risk_engine = None
+        self.exec_engine = None
+        self.connection = None
+        self.ledger = None
+        self.performance = None
+        checkpoint_cfg = self.config.get('checkpoint', {})
+        self.checkpoint_path = checkpoint_cfg.get('path', 'logs/checkpoint.bin')
+        self.checkpoint_interval = checkpoint_cfg.get('interval_s', 60)
+        self.checkpoint_max_age = checkpoint_cfg.get('max_age_s', 900)
+        self.checkpoint_writer = CheckpointWriter(self.checkpoint_path) if self.checkpoint_path else None
+        self.last_checkpoint = None
+        self.max_replay_ticks = self.config.get('connection', {}).get('max_replay_ticks', 50000)
+        self.session_start_time = None
+        self.last_stats_log = None
+        self.metrics_exporter = None
+        
+    def ensure_mt5_connected(self):
+        """Non-blocking: advances the reconnection state machine and reports availability."""
+        return self.connection.poll()
+
+    def _on_reconnected(self, outage_seconds):
+        for pipeline in self.pipelines.values():
+            self._replay_missed_ticks(pipeline)
+
+    def _replay_missed_ticks(self, pipeline):
+        """
+        Feeds ticks missed during an outage through the candle/indicator pipeline
+        so candle boundaries and indicator state match an uninterrupted run.
+        Entries are not taken on replayed data.
+        """
+        if pipeline.last_tick_msc is None:
+            return
+        date_from = datetime.fromtimestamp(pipeline.last_tick_msc / 1000.0, tz=timezone.utc)
+        ticks = self.mt5.copy_ticks_from(pipeline.symbol, date_from, self.max_replay_ticks)
+        missed = [t for t in ticks if t["time_msc"] > pipeline.last_tick_msc]
+        if not missed:
+            return
+        logging.info(f"Replaying {len(missed)} {pipeline.symbol} ticks missed during outage")
+        pipeline.m_missed.inc(len(missed))
+        for tick in missed:
+            self._ingest_tick(pipeline, tick, live=False)
+    
+    def check_tick_heartbeat(self):
+        tick_times = [p.last_tick_time for p in self.pipelines.values() if p.last_tick_time is not None]
+        if not tick_times:
+            return True
+        time_since_last_tick = (datetime.now() - max(tick_times)).total_seconds()
+        if time_since_last_tick > 30:
+            return False
+        return True
+    
+    def log_statistics(self):
+        account = self.mt5.get_account_info()
+        now = datetime.now()
+        elapsed = (now - self.last_stats_log).total_seconds() if self.last_stats_log else 0.0
+
+        logging.info("=" * 60)
+        logging.info("BOT DASHBOARD")
+        if account:
+            logging.info(f"Account: {account['login']} | Balance: {account['balance']} {account['currency']}")
+            logging.info(f"Equity: {account['equity']} | Margin: {account['margin']} | Free: {account['margin_free']}")
+            logging.info(f"Margin Level: {account['margin_level']}%")
+
+        logging.info("-" * 30)
+        logging.info(f"Symbols: {', '.join(self.symbols)}")
+        logging.info(f"Active Trades: {len(self.exec_engine.active_trades)}")
+        logging.info(f"Session Trades: {self.risk_engine.trades_this_session}/{self.risk_engine.max_trades_session}")
+        logging.info(f"Consecutive Losses: {self.risk_engine.consecutive_losses}/{self.risk_engine.max_consecutive_losses}")
+
+        if self.connection:
+            conn = self.connection.stats()
+            last_outage = f"{conn['last_outage_s']:.2f}s" if conn['last_outage_s'] is not None else "n/a"
+            max_outage = f"{conn['max_outage_s']:.2f}s" if conn['max_outage_s'] is not None else "n/a"
+            logging.info(f"Connection: {conn['state']} | Outages: {conn['outages']} | Last Recovery: {last_outage} | Worst: {max_outage}")
+
+        logging.info("-" * 30)
+        self._log_runtime_stats(elapsed)
+        self._log_fills()
+        self._log_performance()
+        if LATENCY.stages:
+            logging.info("-" * 30)
+            logging.info("Latency since last dashboard:")
+            LATENCY.log(indent="  ")
+            LATENCY.rollover()
+        logging.info("=" * 60)
+        self.last_stats_log = now
+
+    def _log_fills(self):
+        summary = self.exec_engine.fill_summary() if self.exec_engine else {}
+        if not summary:
+            return
+        parts = []
+        for metric, label, unit in (("signal_latency_ms", "Signal", "ms"), ("round_trip_ms", "Round Trip", "ms"),
+                                    ("slippage_pips", "Slippage", "pips")):
+            s = summary.get(metric)
+            if s:
+                parts.append(f"{label} p50 {s['p50']:.2f} / p99 {s['p99']:.2f} {unit}")
+        count = max(s['count'] for s in summary.values())
+        logging.info(f"Fills ({count} recent): {' | '.join(parts)}")
+
+    def _log_performance(self):
+        if self.performance is None or not self.performance.count:
+            return
+        m = self.performance.snapshot()
+        sharpe = f"{m['session_sharpe']:.2f}" if m['session_sharpe'] is not None else "n/a"
+        exposure = f"{m['exposure'] * 100:.1f}%" if m['exposure'] is not None else "n/a"
+        logging.info(f"Performance ({m['total_trades']} trades): Win {m['win_rate']:.1f}% | PF {m['profit_factor']:.2f} | "
+                     f"Net {m['total_net_profit']:.1f} pips | Max DD {m['max_drawdown']:.1f} | Sharpe/session {sharpe} | "
+                     f"Streak {m['current_streak']:+d} | In Market {exposure}")
+
+    @staticmethod
+    def _log_spread(stats, indent=""):
+        spread = stats['spread']
+        median = f"{spread['median_pips']:.2f}" if spread['median_pips'] is not None else "n/a"
+        logging.info(f"{indent}{stats['symbol']} Spread: median {median} | gate {spread['threshold_pips']:.2f} "
+                     f"(cap {spread['cap_pips']}) pips | window {spread['samples']} ticks | rejects {spread['rejects']}")
+
+    def _log_runtime_stats(self, elapsed):
+        for pipeline in self.pipelines.values():
+            stats = pipeline.stats(elapsed)
+            logging.info(f"{stats['symbol']}: {stats['state']} | {stats['ticks_per_s']:.1f} ticks/s | "
+                         f"{stats['us_per_tick']:.0f} us/tick | Candles: {stats['candles']} | Signals: {stats['signals']} | "
+                         f"Spread Rejects: {stats['spread_rejects']} | Repeated Quotes: {stats['duplicates']}")
+            self._log_spread(stats)
+            indicators = pipeline.last_indicators
+            if indicators:
+                slope = indicators.get('ema20_slope')
+                slope = f"{pipeline.spec.price_to_pips(slope):.2f} pips" if slope is not None else "n/a"
+                logging.info(f"{stats['symbol']} EMA: {indicators['ema20']:.{pipeline.spec.digits}f} | Slope: {slope}")
+            for name, indicators in pipeline.timeframe_indicators.items():
+                slope = indicators.get('ema20_slope')
+                slope = f"{pipeline.spec.price_to_pips(slope):.2f} pips" if slope is not None else "n/a"
+                logging.info(f"{stats['symbol']} {name}: EMA {indicators['ema20']:.{pipeline.spec.digits}f} | Slope {slope}")
+            pipeline.reset_stats()
+    
+    def _load_config(self):
+        with open(self.config_path, 'r') as f:
+            return yaml.safe_load(f)
+
+    def initialize(self):
+        magic = self.config['mt5'].get('magic', 701970)
+        load_latency(self.config)
+        LATENCY.instrument(self.mt5)
+        if not self._connect(magic):
+            return False
+        self._load_symbol_specs()
+        load_calendar(self.config)
+        load_sessions(self.config)
+        self._init_shared_layer(magic)
+        self._init_pipelines()
+        # Recording starts from the restored state, so a replay can start from it too
+        load_journal(self.config, pipelines=self.pipelines.values())
+        self._start_metrics()
+        self.last_checkpoint = time.monotonic()
+        self.session_start_time = datetime.now()
+        self.last_stats_log = datetime.now()
+        return True
+
+    def _connect(self, magic):
+        login = self.config['mt5'].get('login')
+        password = self.config['mt5'].get('password')
+        server = self.config['mt5'].get('server')
+
+        # Handle optional credentials or placeholders
+        if login == 0 or login == 12345678 or not login:
+            logging.info("MT5 login not provided or using default. Attempting to use active terminal session.")
+            login = password = server = None
+
+        if not self.mt5.connect(login=login, password=password, server=server, magic=magic):
+            logging.error("Failed to connect to MT5. Please ensure MT5 terminal is open and logged in.")
+            return False
+
+        conn_cfg = self.config.get('connection', {})
+        self.connection = ConnectionMonitor(
+            self.mt5,
+            connect_kwargs={"login": login, "password": password, "server": server, "magic": magic},
+            base_delay=conn_cfg.get('base_delay_s', 1.0),
+            max_delay=conn_cfg.get('max_delay_s', 30.0),
+            jitter=conn_cfg.get('jitter', 0.25),
+        )
+        self.connection.add_reconnect_listener(self._on_reconnected)
+        return True
+
+    def _load_symbol_specs(self):
+        """Loads contract specs once, before any strategy component converts its pip thresholds."""
+        spec_file = self.config['trading'].get('symbol_specs')
+        if spec_file:
+            count = SPECS.load_file(spec_file)
+            logging.info(f"Loaded {count} symbol specs from {spec_file}")
+            return
+        missing = SPECS.load_from_broker(self.mt5, self.symbols)
+        if missing:
+            logging.warning(f"Broker has no symbol info for {', '.join(missing)}; using naming-convention pip sizes")
+
+    def _init_shared_layer(self, magic):
+        """One risk and execution layer shared by every symbol."""
+        self.risk_engine = RiskEngine.from_config(self.config)
+        exec_cfg = self.config.get('execution', {})
+        self.performance = PerformanceAccumulator.from_config(self.config)
+        self.exec_engine = ExecutionEngine(
+            self.mt5,
+            history_size=exec_cfg.get('closed_history_size', 1000),
+            journal_path=exec_cfg.get('closed_trade_journal', 'logs/closed_trades.jsonl'),
+            performance=self.performance
+        )
+        ledger_path = exec_cfg.get('ledger_path', 'logs/ledger.db')
+        if ledger_path:
+            self._restore_from_ledger(ledger_path, magic)
+
+    def _init_pipelines(self):
+        for symbol in self.symbols:
+            self.pipelines[symbol] = self._build_pipeline(symbol)
+        restored = self._restore_checkpoint() if self.checkpoint_path else set()
+        for symbol, pipeline in self.pipelines.items():
+            if symbol not in restored:
+                self._warm_start(pipeline)
+
+    def _build_pipeline(self, symbol):
+        return SymbolPipeline.from_config(symbol, self.risk_engine, self.config)
+
+    def _warm_start(self, pipeline):
+        """Rebuilds candles and indicators from recent history when no usable checkpoint exists."""
+        start = time.perf_counter()
+        ticks = self._load_history(pipeline.symbol)
+        if not ticks:
+            return
+        pipeline.warm_start(ticks)
+        logging.info(f"{pipeline.symbol} strategy armed from {len(ticks)} ticks of history in {time.perf_counter() - start:.2f}s")
+
+    def _load_history(self, symbol):
+        """Recent ticks for a warm start, from the local archive if configured, else the broker."""
+        ws_cfg = self.config.get('warm_start', {})
+        hours = ws_cfg.get('hours', 4)
+        if not hours:
+            return []
+        date_to = self.mt5.server_time() or datetime.now()
+        date_from = date_to - timedelta(hours=hours)
+
+        archive = ws_cfg.get('archive')
+        if isinstance(archive, dict):
+            archive = archive.get(symbol)
+        if archive and os.path.exists(archive):
+            from data.data_loader import DataLoader
+            ticks = [t for t in DataLoader.load_from_csv(archive) if date_from <= t["timestamp"] <= date_to]
+        else:
+            ticks = self.mt5.copy_ticks_range(symbol, date_from, date_to)
+        if not ticks:
+            logging.info(f"Warm start: no recent {symbol} history available, starting cold")
+        return ticks
+
+    def save_checkpoint(self):
+        """Snapshots candle, indicator, trend and strategy state of every symbol for a warm restart."""
+        state = {"symbols": {symbol: pipeline.get_state() for symbol, pipeline in self.pipelines.items()}}
+        # Serialised and written by the writer thread
+        self.checkpoint_writer.submit(state)
+        self.last_checkpoint = time.monotonic()
+
+    def _restore_checkpoint(self):
+        """Loads each symbol's snapshot; returns the set of symbols that were resumed."""
+        state, info = load_checkpoint(self.checkpoint_path, max_age_seconds=self.checkpoint_max_age)
+        if state is None:
+            logging.info(f"No usable checkpoint: {info}")
+            return set()
+
+        restored = set()
+        for symbol, snapshot in state.get("symbols", {}).items():
+            pipeline = self.pipelines.get(symbol)
+            if pipeline is None:
+                continue
+            try:
+                pipeline.load_state(snapshot)
+            except (KeyError, ValueError) as e:
+                logging.warning(f"Discarding {symbol} checkpoint: {e}")
+                self.pipelines[symbol] = self._build_pipeline(symbol)
+                continue
+            logging.info(f"Resumed {symbol} from {info:.0f}s old checkpoint in state {pipeline.strategy_engine.state} "
+                         f"at candle {pipeline.tick_engine.candle_index}")
+            # Close the gap between the snapshot and now so candle boundaries line up
+            self._replay_missed_ticks(pipeline)
+            restored.add(symbol)
+        return restored
+    
+    def _restore_from_ledger(self, ledger_path, magic):
+        """Replays the durable ledger and reconciles it against the broker's open positions."""
+        start = time.perf_counter()
+        self.ledger = TradeLedger(ledger_path)
+        open_trades, risk_state = self.ledger.load()
+
+        if self.risk_engine.restore(risk_state, session_key()):
+            logging.info(f"Restored risk state: {self.risk_engine.trades_this_session} session trades, "
+                         f"{self.risk_engine.consecutive_losses} consecutive losses")
+        if "performance" in risk_state:
+            self.performance.merge(PerformanceAccumulator.from_state(risk_state["performance"]))
+            logging.info(f"Restored performance: {self.performance.count} trades, "
+                         f"{self.performance.equity:.1f} pips net")
+
+        self.exec_engine.ledger = self.ledger
+        self.risk_engine.ledger = self.ledger
+        summary = self.exec_engine.reconcile(open_trades, self.risk_engine, magic=magic)
+        if summary is None:
+            logging.error("Could not query broker positions; ledger trades not reconciled")
+        else:
+            logging.info(f"Ledger reconciled in {(time.perf_counter() - start) * 1000:.1f} ms: "
+                         f"{summary['restored']} restored, {summary['closed_offline']} closed while offline, "
+                         f"{summary['adopted']} adopted")
+        self.ledger.record_risk(self.risk_engine)
+
+    def run(self):
+        # Register signal handlers for graceful shutdown
+        signal.signal(signal.SIGINT, self._signal_handler)
+        signal.signal(signal.SIGTERM, self._signal_handler)
+
+        if not self.initialize():
+            logging.critical("Failed to initialize bot. Exiting.")
+            return
+
+        logging.info(f"Bot initialized and running for {', '.join(self.symbols)}")
+        self.log_statistics()
+
+        try:
+            iteration = 0
+            while True:
+                iteration += 1
+
+                # Connection monitoring never blocks; the pipelines keep their state during outages
+                if not self.ensure_mt5_connected():
+                    time.sleep(0.1)
+                    continue
+
+                # Tick heartbeat
+                if iteration % 500 == 0 and not self.check_tick_heartbeat():
+                    logging.warning("No ticks received for 30s. Market might be closed or connection stale.")
+                if (datetime.now() - self.last_stats_log).total_seconds() > 300:
+                    self.log_statistics()
+                if self.checkpoint_path and time.monotonic() - self.last_checkpoint >= self.checkpoint_interval:
+                    self.save_checkpoint()
+                server_time = self.mt5.server_time()
+                if not SESSIONS.is_active(server_time):
+                    # Wake up at the next session open rather than up to 30s late
+                    time.sleep(min(30.0, max(SESSIONS.seconds_to_transition(server_time), 0.1)))
+                    continue
+                fresh = self.poll_ticks()
+                self._dispatch(fresh)
+                # Back off only when the fetch failed or no symbol has a quote; an unchanged quote is the normal idle case
+                time.sleep(0.1 if fresh is None else 0.001)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._shutdown()
+
+    def poll_ticks(self):
+        """
+        Fetches the latest quote of every symbol in one batched broker call and
+        returns `(pipeline, tick)` pairs for quotes not seen on the previous poll,
+        or None when the fetch failed or returned no quote at all.
+        """
+        t = LATENCY.start()
+        try:
+            ticks = self.mt5.get_ticks(self.symbols)
+        except Exception as e:
+            logging.error(f"Error fetching ticks: {e}")
+            self.connection.report_failure(str(e))
+            return None
+        if not ticks:
+            return None
+        fresh = []
+        recv_ns = time.monotonic_ns()
+        for symbol, tick in ticks.items():
+            pipeline = self.pipelines.get(symbol)
+            if pipeline is not None and not pipeline.is_duplicate(tick):
+                tick["recv_ns"] = recv_ns
+                fresh.append((pipeline, tick))
+        if t:
+            LATENCY.lap("tick_fetch", t)
+        return fresh
+    
+    def _dispatch(self, fresh):
+        """Processes one poll's fresh ticks."""
+        if not fresh:
+            return
+        # Position closures are checked once per poll for all symbols
+        t = LATENCY.start()
+        self.exec_engine.sync_positions(self.risk_engine)
+        if t:
+            t = LATENCY.lap("sync_positions", t)
+        for pipeline, tick in fresh:
+            if self._ingest_tick(pipeline, tick):
+                if t:
+                    t = LATENCY.start()
+                self.exec_engine.manage_trades(pipeline.symbol, self.risk_engine, tick=tick, sync=False)
+                if t:
+                    t = LATENCY.lap("manage_trades", t)
+
+    def _ingest_tick(self, pipeline, tick, live=True):
+        """
+        Runs one tick through its symbol's pipeline and routes any signal to the
+        shared execution layer. Returns False when the tick was rejected by the spread gate.
+        """
+        accepted, signals, candle = pipeline.on_tick(tick, live=live)
+        for trade_sig in signals:
+            self._handle_signal(trade_sig, pipeline.symbol)
+        if candle:
+            self.exec_engine.update_candles_count(pipeline.symbol)
+        return accepted
+
+    def _handle_signal(self, signal, symbol):
+        if self.risk_engine.can_trade():
+            ticket = self.exec_engine.execute_signal(signal, symbol, self.volume, risk_engine=self.risk_engine)
+            if ticket > 0:
+                self.risk_engine.register_new_trade()
+
+    def _signal_handler(self, sig, frame):
+        logging.info("Shutting down bot gracefully...")
+        self._shutdown()
+        sys.exit(0)
+
+    def _start_metrics(self):
+        """Starts the Prometheus export; gauges that aren't pushed per tick are refreshed on each export."""
+        self.metrics_exporter = MetricsExporter.from_config(self.config)
+        if self.metrics_exporter is None:
+            return
+        METRICS.on_collect(self._collect_metrics)
+        try:
+            self.metrics_exporter.start()
+        except OSError as e:
+            logging.error(f"Metrics endpoint failed to start: {e}")
+
+    def _collect_metrics(self):
+        for pipeline in self.pipelines.values():
+            pipeline.update_metrics()
+        if self.exec_engine:
+            METRICS.gauge("volman_open_trades", "Trades managed by the bot").set(len(self.exec_engine.active_trades))
+        if self.risk_engine:
+            METRICS.gauge("volman_session_trades", "Trades taken this session").set(self.risk_engine.trades_this_session)
+        if self.connection:
+            conn = self.connection.stats()
+            METRICS.counter("volman_reconnects_total", "Broker connection outages").value = conn['outages']
+            METRICS.gauge("volman_connected", "1 while the broker connection is up").set(conn['state'] == "CONNECTED")
+        for stage, hist in LATENCY.totals().items():
+            METRICS.counter("volman_stage_calls_total", "Timed loop stages and broker calls", stage=stage).value = hist.count
+            for quantile, p in (("0.5", 50), ("0.99", 99), ("1", 100)):
+                METRICS.gauge("volman_stage_latency_seconds", "Per-stage latency quantiles over the session",
+                              stage=stage, quantile=quantile).set(hist.percentile(p) / 1e9)
+
+    def _shutdown(self):
+        LATENCY.dump()
+        if self.metrics_exporter:
+            self.metrics_exporter.stop()
+            METRICS.remove_hook(self._collect_metrics)
+        if self.checkpoint_path and self.pipelines:
+            self.save_checkpoint()
+        if self.checkpoint_writer:
+            self.checkpoint_writer.close()
+        if self.exec_engine:
+            self.exec_engine.closed_trades_history.flush()
+        if self.performance is not None:
+            self.performance.flush()
+        if self.ledger:
+            self.ledger.flush()
+            self.ledger.close()
+        JOURNAL.close()
+        if self.mt5:
+            logging.info("Closing MT5 connection...")
+            self.mt5.shutdown()
@@ -0,0 +1,440 @@
+import logging
+import multiprocessing
+import os
+import queue
+import time
+from collections import deque
+from datetime import datetime, timezone
+from risk.risk_engine import RiskEngine
+from runtime.bot import VolmanTradingBot
+from runtime.symbol_pipeline import SymbolPipeline
+from runtime.tick_ring import TickRing, REPLAY
+from utils.checkpoint import CheckpointWriter, load_checkpoint
+from utils.symbol_spec import SPECS, SymbolSpec, get_spec
+from utils.news_filter import load_calendar
+from utils.time_utils import load_sessions
+from utils.latency import LATENCY, load_latency
+from utils.metrics import METRICS
+from utils.session_journal import JOURNAL, load_journal
+from utils.logger import rate_limit_from_config, start_queue_logging
+
+# Workers are spawned, not forked: the supervisor already runs ledger and
+# reconnect threads, and spawn is what Windows (the MT5 platform) uses anyway.
+_ctx = multiprocessing.get_context("spawn")
+
+
+def split_groups(symbols, workers):
+    """Round-robin assignment of symbols to at most `workers` groups."""
+    workers = max(1, min(workers, len(symbols)))
+    return [list(symbols[i::workers]) for i in range(workers)]
+
+
+def worker_checkpoint_path(path, index):
+    if not path:
+        return ""
+    root, ext = os.path.splitext(path)
+    return f"{root}.worker{index}{ext}"
+
+
+def run_worker(index, symbols, ring_name, intents, stop, config, specs=(), history=None):
+    """Entry point of a strategy worker process. `history` maps symbols to warm-start ticks."""
+    log_cfg = config.get('logging', {})
+    level = getattr(logging, log_cfg.get('level', 'INFO').upper(), logging.INFO)
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter(f'%(asctime)s - worker{index} - %(levelname)s - %(message)s'))
+    # The strategy runs here, so its logging goes off-thread as in the single-process bot
+    listener = start_queue_logging(level, [console], rate_limit_from_config(log_cfg))
+    # Specs come from the supervisor, which owns the broker connection
+    for spec in specs:
+        SPECS.register(SymbolSpec.from_dict(spec))
+    load_calendar(config)
+    load_sessions(config)
+    load_latency(config)
+    worker = StrategyWorker(index, symbols, TickRing.attach(ring_name), intents, config, history=history)
+    # One journal per worker process, starting from the state it restored
+    load_journal(config, name=f"worker{index}", pipelines=worker.pipelines)
+    try:
+        worker.run(stop)
+        worker.save_checkpoint()
+    except KeyboardInterrupt:
+        worker.save_checkpoint()
+    finally:
+        if worker.checkpoint_writer:
+            worker.checkpoint_writer.close()
+        JOURNAL.close()
+        worker.ring.close()
+        listener.stop()
+
+
+class StrategyWorker:
+    """
+    Runs the pipelines of one symbol group in a worker process. Ticks come from
+    the group's ring; order intents, candle closes and throughput stats go back
+    to the supervisor over `intents`.
+
+    On (re)start the worker loads its own checkpoint; symbols without one are
+    warm-started from the `history` handed over at spawn. It then replays
+    whatever the ring still holds to rebuild state. Only ticks no previous
+    worker consumed are traded on.
+    """
+
+    def __init__(self, index, symbols, ring, intents, config, history=None):
+        self.index = index
+        self.ring = ring
+        self.intents = intents
+        self.config = config
+        # Only used by the strategy for SL/TP; trade gating stays with the supervisor
+        self.risk_engine = RiskEngine.from_config(config)
+        self.pipelines = [SymbolPipeline.from_config(s, self.risk_engine, config) for s in symbols]
+
+        ckpt_cfg = config.get('checkpoint', {})
+        self.checkpoint_path = worker_checkpoint_path(ckpt_cfg.get('path', 'logs/checkpoint.bin'), index)
+        self.checkpoint_interval = ckpt_cfg.get('interval_s', 60)
+        self.checkpoint_max_age = ckpt_cfg.get('max_age_s', 900)
+        self.checkpoint_writer = CheckpointWriter(self.checkpoint_path) if self.checkpoint_path else None
+        self.stats_interval = config.get('supervisor', {}).get('stats_interval_s', 60)
+        self.last_checkpoint = self.last_stats = time.monotonic()
+        restored = self.restore() if self.checkpoint_path else set()
+        if history and self.warm_start(history, skip=restored):
+            # A restart before the next periodic snapshot resumes from here
+            self.save_checkpoint()
+
+        self.live_from = ring.read_seq
+        self.seq = ring.oldest_seq()
+
+    def restore(self):
+        """Loads each symbol's snapshot; returns the set of symbols that were resumed."""
+        state, info = load_checkpoint(self.checkpoint_path, max_age_seconds=self.checkpoint_max_age)
+        if state is None:
+            logging.info(f"No usable worker checkpoint: {info}")
+            return set()
+        restored = set()
+        for i, pipeline in enumerate(self.pipelines):
+            snapshot = state.get("symbols", {}).get(pipeline.symbol)
+            if snapshot is None:
+                continue
+            try:
+                pipeline.load_state(snapshot)
+                restored.add(pipeline.symbol)
+            except (KeyError, ValueError) as e:
+                logging.warning(f"Discarding {pipeline.symbol} checkpoint: {e}")
+                self.pipelines[i] = SymbolPipeline.from_config(pipeline.symbol, self.risk_engine, self.config)
+        return restored
+
+    def warm_start(self, history, skip=()):
+        """Batch warm start of every pipeline with history and no restored snapshot; returns how many ran."""
+        count = 0
+        for pipeline in self.pipelines:
+            ticks = history.get(pipeline.symbol)
+            if not ticks or pipeline.symbol in skip:
+                continue
+            start = time.perf_counter()
+            pipeline.warm_start(ticks)
+            logging.info(f"{pipeline.symbol} strategy armed from {len(ticks)} ticks of history in "
+                         f"{time.perf_counter() - start:.2f}s")
+            count += 1
+        return count
+
+    def save_checkpoint(self):
+        if self.checkpoint_path:
+            self.checkpoint_writer.submit({"symbols": {p.symbol: p.get_state() for p in self.pipelines}})
+        self.last_checkpoint = time.monotonic()
+
+    def run(self, stop):
+        idle = 0
+        parent = multiprocessing.parent_process()
+        while not stop.is_set():
+            if self.step():
+                idle = 0
+            else:
+                idle += 1
+                # Don't outlive a supervisor that died without stopping us
+                if idle % 2000 == 0 and parent is not None and not parent.is_alive():
+                    return
+                time.sleep(0.0005)
+            now = time.monotonic()
+            if self.checkpoint_path and now - self.last_checkpoint >= self.checkpoint_interval:
+                self.save_checkpoint()
+            if now - self.last_stats >= self.stats_interval:
+                # Stage histograms and metrics go to the supervisor, which exports them with its own
+                for pipeline in self.pipelines:
+                    pipeline.update_metrics()
+                self.intents.put(("stats", self.index, [p.stats(now - self.last_stats) for p in self.pipelines],
+                                  LATENCY.get_state(), METRICS.samples()))
+                LATENCY.stages.clear()
+                for pipeline in self.pipelines:
+                    pipeline.reset_stats()
+                self.last_stats = now
+
+    def step(self, max_count=4096):
+        """Processes one batch from the ring; returns False when there was nothing to read."""
+        first, batch = self.ring.read(self.seq, max_count)
+        lost = first - self.seq
+        if lost:
+            logging.warning(f"Fell {lost} ticks behind the ring; they were overwritten")
+            METRICS.counter("volman_ring_lost_ticks_total", "Ticks overwritten before the worker read them",
+                            worker=str(self.index)).inc(lost)
+        for offset, rec in enumerate(batch):
+            seq = first + offset
+            pipeline = self.pipelines[rec["symbol"]]
+            replaying = seq < self.live_from
+            # Catch-up: ticks already folded into the checkpointed state
+            if replaying and pipeline.last_tick_msc is not None and rec["time_msc"] <= pipeline.last_tick_msc:
+                continue
+            tick = TickRing.to_tick(rec, pipeline.symbol)
+            live = not replaying and not rec["flags"] & REPLAY
+            if not replaying and not live:
+                # Backfilled after an outage
+                pipeline.m_missed.inc()
+            accepted, signals, candle = pipeline.on_tick(tick, live=live)
+            for trade_sig in signals:
+                self.intents.put(("signal", pipeline.symbol, trade_sig, tick["time_msc"]))
+            if candle and not replaying:
+                self.intents.put(("candle", pipeline.symbol))
+        self.seq = first + len(batch)
+        self.ring.commit(max(self.seq, self.live_from), lost=lost)
+        return len(batch) > 0
+
+
+class WorkerHandle:
+    """Supervisor-side view of one worker process and its ring."""
+
+    def __init__(self, index, symbols, ring):
+        self.index = index
+        self.symbols = symbols
+        self.ring = ring
+        self.process = None
+        self.stop = None
+        self.started_at = None
+        self.restarts = 0
+        self.last_stats = []
+
+    def start(self, intents, config, history=None):
+        """Spawns the worker; `history` (symbol -> ticks) is only handed over on the first start."""
+        self.stop = _ctx.Event()
+        self.process = _ctx.Process(
+            target=run_worker,
+            args=(self.index, self.symbols, self.ring.name, intents, self.stop, config,
+                  [get_spec(s).to_dict() for s in self.symbols], history),
+            name=f"volman-worker{self.index}", daemon=True
+        )
+        self.process.start()
+        self.started_at = time.monotonic()
+
+    def shutdown(self, timeout=5.0):
+        if self.process is None:
+            return
+        self.stop.set()
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(1.0)
+        self.process = None
+
+    def stats(self):
+        stats = {"worker": self.index, "symbols": self.symbols, "restarts": self.restarts,
+                 "pid": self.process.pid if self.process else None}
+        stats.update(self.ring.lag())
+        return stats
+
+
+class SupervisedBot(VolmanTradingBot):
+    """
+    Supervisor mode for large symbol universes. This process keeps the only
+    broker connection and does ingestion and execution; strategy pipelines run
+    in worker processes pinned to symbol groups.
+
+    Ticks fan out through one shared-memory `TickRing` per worker. Workers send
+    order intents back over a queue and the shared risk and execution layer
+    here acts on them. Crashed or hung workers are restarted and resume from
+    their ring position.
+    """
+
+    def __init__(self, config=None, config_path="config/settings.yaml", workers=None):
+        super().__init__(config=config, config_path=config_path)
+        sup_cfg = self.config.get('supervisor', {})
+        if workers is None:
+            workers = sup_cfg.get('workers', 0) or max(1, (os.cpu_count() or 2) - 1)
+        self.groups = sup_cfg.get('groups') or split_groups(self.symbols, workers)
+        grouped = sorted(s for group in self.groups for s in group)
+        if grouped != sorted(self.symbols):
+            raise ValueError("supervisor.groups must list every trading symbol exactly once")
+
+        self.ring_capacity = sup_cfg.get('ring_capacity', 131072)
+        self.max_intent_age_ms = sup_cfg.get('max_intent_age_ms', 500)
+        self.hang_timeout = sup_cfg.get('hang_timeout_s', 30)
+        self.restart_delay = sup_cfg.get('restart_delay_s', 1.0)
+        self.max_spread = {}  # symbol -> absolute spread cap in price units; workers apply the adaptive gate
+        self.workers = []
+        self.routes = {}  # symbol -> (WorkerHandle, index in its ring)
+        self.intents = _ctx.Queue()
+        self.latest_msc = {}  # symbol -> time_msc of the newest published tick
+        self.last_tick_time = None
+        self._last_quotes = {}
+        self._recv_times = {}  # symbol -> recent (time_msc, local receive ns), to stamp worker intents
+        self._last_supervise = 0.0
+
+    def _init_pipelines(self):
+        max_spread_pips = self.config['trading'].get('max_spread_pips', 0.8)
+        for symbol in self.symbols:
+            self.max_spread[symbol] = get_spec(symbol).pips_to_price(max_spread_pips)
+        for index, symbols in enumerate(self.groups):
+            worker = WorkerHandle(index, symbols, TickRing.create(self.ring_capacity))
+            history = {}
+            for position, symbol in enumerate(symbols):
+                self.routes[symbol] = (worker, position)
+                ticks = self._load_history(symbol)
+                if ticks:
+                    history[symbol] = ticks
+                    if ticks[-1].get("time_msc") is not None:
+                        self.latest_msc[symbol] = ticks[-1]["time_msc"]
+            # History goes to the worker for a batch warm start; the ring only carries live and backfilled ticks
+            worker.start(self.intents, self.config, history=history)
+            self.workers.append(worker)
+            logging.info(f"Started worker {index} (pid {worker.process.pid}) for {', '.join(symbols)}")
+
+    def _publish(self, symbol, tick, flags=0):
+        worker, position = self.routes[symbol]
+        worker.ring.write(position, tick, flags)
+        if tick.get("time_msc") is not None:
+            self.latest_msc[symbol] = tick["time_msc"]
+
+    def poll_ticks(self):
+        """
+        Returns `(symbol, tick)` pairs for quotes that changed since the previous
+        poll, or None when the fetch failed or returned no quote at all.
+        """
+        t = LATENCY.start()
+        try:
+            ticks = self.mt5.get_ticks(self.symbols)
+        except Exception as e:
+            logging.error(f"Error fetching ticks: {e}")
+            self.connection.report_failure(str(e))
+            return None
+        if not ticks:
+            return None
+        fresh = []
+        recv_ns = time.monotonic_ns()
+        for symbol, tick in ticks.items():
+            quote = (tick.get("time_msc"), tick["bid"], tick["ask"])
+            if symbol in self.routes and self._last_quotes.get(symbol) != quote:
+                self._last_quotes[symbol] = quote
+                recv_times = self._recv_times.get(symbol)
+                if recv_times is None:
+                    recv_times = self._recv_times[symbol] = deque(maxlen=1024)
+                recv_times.append((tick.get("time_msc"), recv_ns))
+                fresh.append((symbol, tick))
+        if t:
+            LATENCY.lap("tick_fetch", t)
+        return fresh
+
+    def _dispatch(self, fresh):
+        if fresh:
+            self.last_tick_time = datetime.now()
+            t = LATENCY.start()
+            self.exec_engine.sync_positions(self.risk_engine)
+            if t:
+                t = LATENCY.lap("sync_positions", t)
+            for symbol, tick in fresh:
+                self._publish(symbol, tick)
+                if t:
+                    t = LATENCY.lap("publish", t)
+                if tick["spread"] <= self.max_spread[symbol]:
+                    self.exec_engine.manage_trades(symbol, self.risk_engine, tick=tick, sync=False)
+                    if t:
+                        t = LATENCY.lap("manage_trades", t)
+        self._drain_intents()
+        # Intents can arrive without new ticks, so they are drained on every poll
+        if time.monotonic() - self._last_supervise >= 0.5:
+            self.supervise_workers()
+
+    def _drain_intents(self):
+        while True:
+            try:
+                kind, *payload = self.intents.get_nowait()
+            except queue.Empty:
+                return
+            if kind == "signal":
+                symbol, trade_sig, time_msc = payload
+                age_ms = self.latest_msc.get(symbol, time_msc) - time_msc
+                if age_ms > self.max_intent_age_ms:
+                    logging.warning(f"Dropping {symbol} {trade_sig['direction']} intent: {age_ms} ms behind the market")
+                    continue
+                # The ring doesn't carry receive times; look the tick up among the recent polls
+                if trade_sig.get("recv_ns") is None:
+                    trade_sig["recv_ns"] = next((ns for msc, ns in reversed(self._recv_times.get(symbol, ()))
+                                                 if msc == time_msc), None)
+                self._handle_signal(trade_sig, symbol)
+            elif kind == "candle":
+                self.exec_engine.update_candles_count(payload[0])
+            elif kind == "stats":
+                index, stats, latency, samples = payload
+                self.workers[index].last_stats = stats
+                LATENCY.merge_state(latency)
+                METRICS.load_samples(samples)
+
+    def supervise_workers(self):
+        """Restarts workers that exited or stopped publishing heartbeats."""
+        now = time.monotonic()
+        self._last_supervise = now
+        for worker in self.workers:
+            if now - worker.started_at < self.restart_delay:
+                continue
+            if worker.process.is_alive():
+                heartbeat_age = worker.ring.lag()["heartbeat_age_s"]
+                if heartbeat_age is None or heartbeat_age <= self.hang_timeout or now - worker.started_at <= self.hang_timeout:
+                    continue
+                logging.error(f"Worker {worker.index} unresponsive for {heartbeat_age:.0f}s; restarting")
+                worker.process.terminate()
+                worker.process.join(1.0)
+            else:
+                logging.error(f"Worker {worker.index} ({', '.join(worker.symbols)}) exited with code "
+                              f"{worker.process.exitcode}; restarting")
+            worker.restarts += 1
+            worker.start(self.intents, self.config)
+
+    def worker_stats(self):
+        return [worker.stats() for worker in self.workers]
+
+    def _log_runtime_stats(self, elapsed):
+        for stats in self.worker_stats():
+            logging.info(f"Worker {stats['worker']} [{', '.join(stats['symbols'])}] pid {stats['pid']} | "
+                         f"Pending: {stats['pending']} | Lag: {stats['lag_ms']:.1f} ms | Lost: {stats['lost']} | "
+                         f"Restarts: {stats['restarts']}")
+        for worker in self.workers:
+            for stats in worker.last_stats:
+                logging.info(f"  {stats['symbol']}: {stats['state']} | {stats['ticks_per_s']:.1f} ticks/s | "
+                             f"{stats['us_per_tick']:.0f} us/tick | Candles: {stats['candles']} | Signals: {stats['signals']}")
+                self._log_spread(stats, indent="  ")
+
+    def check_tick_heartbeat(self):
+        if self.last_tick_time is None:
+            return True
+        return (datetime.now() - self.last_tick_time).total_seconds() <= 30
+
+    def _on_reconnected(self, outage_seconds):
+        """Backfills the outage into the rings; workers rebuild state from it without trading."""
+        for symbol in self.symbols:
+            last = self.latest_msc.get(symbol)
+            if last is None:
+                continue
+            date_from = datetime.fromtimestamp(last / 1000.0, tz=timezone.utc)
+            ticks = self.mt5.copy_ticks_from(symbol, date_from, self.max_replay_ticks)
+            missed = [t for t in ticks if t["time_msc"] > last]
+            if missed:
+                logging.info(f"Backfilling {len(missed)} {symbol} ticks missed during outage")
+            for tick in missed:
+                self._publish(symbol, tick, flags=REPLAY)
+
+    def save_checkpoint(self):
+        # Each worker snapshots its own pipelines
+        self.last_checkpoint = time.monotonic()
+
+    def _shutdown(self):
+        for worker in self.workers:
+            worker.shutdown()
+            worker.ring.close()
+        self.workers = []
+        self.intents.close()
+        self.intents.cancel_join_thread()
+        super()._shutdown()
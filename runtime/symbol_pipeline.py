@@ -0,0 +1,256 @@
+import logging
+import time
+from datetime import datetime
+from data.tick_engine import TickCandleEngine
+from data.multi_candle_engine import MultiCandleEngine
+from indicators.indicator_engine import IndicatorEngine
+from strategy.strategy_engine import StrategyEngine, stamp_signal
+from utils.symbol_spec import get_spec
+from utils.spread_model import SpreadModel
+from utils.latency import LATENCY
+from utils.metrics import METRICS
+from utils.session_journal import JOURNAL
+
+STRATEGY_STATES = ("SEARCHING", "WAITING_PULLBACK", "WAITING_TRIGGER")
+
+
+class SymbolPipeline:
+    """
+    Tick -> candle -> indicator -> strategy chain for one symbol.
+
+    Extra `timeframes` (e.g. `["140t", "233t", "1m"]`) are built alongside the
+    strategy's candles in one pass, each with its own indicator engine; their
+    latest indicators are in `timeframe_indicators`.
+
+    Stage timings go to `latency` (the shared `LATENCY` recorder by default),
+    counters to `metrics` (the shared `METRICS` registry) and ticks and
+    decisions to `journal` (the shared `JOURNAL`) while it is recording.
+
+    The pipeline owns no broker, execution or risk state: signals are handed back
+    to the runtime, which routes every symbol through one shared execution and
+    risk layer. Its cost is proportional to the ticks it actually receives.
+    """
+
+    def __init__(self, symbol, risk_engine, tick_count=70, max_spread_pips=0.8, spec=None, spread_model=None, timeframes=(), latency=None, metrics=None, journal=None):
+        self.symbol = symbol
+        self.spec = spec or get_spec(symbol)
+        self.spread_model = spread_model or SpreadModel(self.spec, max_spread_pips=max_spread_pips)
+        self.tick_engine = TickCandleEngine(tick_count)
+        self.ind_engine = IndicatorEngine()
+        self.timeframes = MultiCandleEngine(timeframes)
+        self.timeframe_ind = {name: IndicatorEngine() for name in self.timeframes.names}
+        self.timeframe_indicators = {}
+        self.latency = latency if latency is not None else LATENCY
+        self.journal = journal if journal is not None else JOURNAL
+        self.strategy_engine = StrategyEngine(risk_engine, symbol=symbol, spec=self.spec, spread_model=self.spread_model)
+        self.last_indicators = {}
+        self.last_tick_time = None
+        self.last_tick_msc = None
+        self._last_quote = None
+        self._bind_metrics(metrics if metrics is not None else METRICS)
+        self.reset_stats()
+
+    def _bind_metrics(self, metrics):
+        symbol = self.symbol
+        self.metrics = metrics
+        self.m_ticks = metrics.counter("volman_ticks_total", "Ticks ingested", symbol=symbol)
+        self.m_duplicates = metrics.counter("volman_duplicate_ticks_total", "Polls that returned an unchanged quote", symbol=symbol)
+        self.m_missed = metrics.counter("volman_missed_ticks_total", "Ticks missed during outages and replayed", symbol=symbol)
+        self.m_spread_rejects = metrics.counter("volman_spread_rejects_total", "Ticks rejected by the spread gate", symbol=symbol)
+        self.m_candles = metrics.counter("volman_candles_total", "Strategy candles formed", symbol=symbol)
+        self.m_signals = metrics.counter("volman_signals_total", "Entry signals produced", symbol=symbol)
+        self.m_spread_median = metrics.gauge("volman_spread_median_pips", "Median spread over the model window", symbol=symbol)
+        self.m_spread_gate = metrics.gauge("volman_spread_gate_pips", "Current adaptive spread gate", symbol=symbol)
+        self.m_state = {state: metrics.gauge("volman_strategy_state", "1 for the strategy's current state", symbol=symbol, state=state)
+                        for state in STRATEGY_STATES}
+        self.m_transitions = {}
+
+    def _count_transition(self, old, new):
+        counter = self.m_transitions.get((old, new))
+        if counter is None:
+            counter = self.m_transitions[(old, new)] = self.metrics.counter(
+                "volman_strategy_transitions_total", "Strategy state transitions", symbol=self.symbol, **{"from": old, "to": new})
+        counter.inc()
+
+    def update_metrics(self):
+        """Refreshes gauges that are read, not pushed per tick; run before each export."""
+        spread = self.spread_model.snapshot()
+        self.m_spread_median.set(spread["median_pips"])
+        self.m_spread_gate.set(spread["threshold_pips"])
+        for state, gauge in self.m_state.items():
+            gauge.set(1 if state == self.strategy_engine.state else 0)
+
+    @classmethod
+    def from_config(cls, symbol, risk_engine, config):
+        spec = get_spec(symbol)
+        trading = config['trading']
+        return cls(symbol, risk_engine, tick_count=trading.get('tick_count', 70), spec=spec,
+                   spread_model=SpreadModel.from_config(spec, config), timeframes=trading.get('timeframes') or ())
+
+    def reset_stats(self):
+        self.ticks = 0
+        self.duplicates = 0
+        self.spread_rejects = 0
+        self.candles = 0
+        self.timeframe_candles = 0
+        self.signals = 0
+        self.busy_s = 0.0
+
+    def is_duplicate(self, tick) -> bool:
+        """True when a poll returned the same quote as the previous one."""
+        quote = (tick.get("time_msc"), tick["bid"], tick["ask"])
+        if quote == self._last_quote:
+            self.duplicates += 1
+            self.m_duplicates.inc()
+            if self.journal.enabled:
+                self.journal.record("duplicate", self.symbol, quote)
+            return True
+        self._last_quote = quote
+        return False
+
+    def on_tick(self, tick, live=True):
+        """
+        Runs one tick through the spread gate, tick-level trigger and candle pipeline.
+        Returns `(accepted, signals, candle)`: `accepted` is False when the spread
+        gate rejected the tick, `signals` lists entry signals in the order they fired
+        and `candle` is the candle the tick closed, if any. Signals are only
+        produced for live ticks.
+        """
+        start = time.perf_counter()
+        t = self.latency.start()
+        journal = self.journal if self.journal.enabled else None
+        if journal:
+            journal.record("tick", self.symbol, (tick, live))
+        self.ticks += 1
+        self.m_ticks.inc()
+        self.last_tick_time = datetime.now()
+        if tick.get("time_msc") is not None:
+            self.last_tick_msc = tick["time_msc"]
+
+        if not self.spread_model.update(tick["spread"]):
+            self.spread_rejects += 1
+            self.m_spread_rejects.inc()
+            if t:
+                self.latency.lap("spread_gate", t)
+            self.busy_s += time.perf_counter() - start
+            return False, [], None
+
+        if t:
+            t = self.latency.lap("spread_gate", t)
+
+        state = self.strategy_engine.state
+        signals = []
+        if live and state == "WAITING_TRIGGER":
+            trade_sig = self.strategy_engine.process_tick(tick, self.last_indicators)
+            if trade_sig:
+                signals.append(trade_sig)
+            if t:
+                t = self.latency.lap("strategy_tick", t)
+
+        candle = self.tick_engine.process_tick(tick)
+        if t:
+            t = self.latency.lap("candle_build", t)
+        if candle:
+            self.candles += 1
+            self.m_candles.inc()
+            self.last_indicators = self.ind_engine.update(candle)
+            if journal:
+                journal.record("candle", self.symbol, candle)
+                journal.record("indicators", self.symbol, self.last_indicators)
+            if t:
+                t = self.latency.lap("indicators", t)
+            trade_sig = self.strategy_engine.process_candle(candle, self.last_indicators, spread=tick["spread"])
+            if t:
+                t = self.latency.lap("strategy_candle", t)
+            if trade_sig:
+                if live:
+                    stamp_signal(trade_sig, tick)
+                    signals.append(trade_sig)
+                else:
+                    logging.info("%s: discarding signal formed on replayed data", self.symbol)
+
+        if self.timeframe_ind:
+            self._update_timeframes(tick)
+            if t:
+                self.latency.lap("timeframes", t)
+
+        if self.strategy_engine.state != state:
+            self._count_transition(state, self.strategy_engine.state)
+            if journal:
+                journal.record("transition", self.symbol, (state, self.strategy_engine.state))
+        if signals:
+            self.signals += len(signals)
+            self.m_signals.inc(len(signals))
+            if journal:
+                for trade_sig in signals:
+                    journal.record("signal", self.symbol, dict(trade_sig))
+        self.busy_s += time.perf_counter() - start
+        return True, signals, candle
+
+    def _update_timeframes(self, tick):
+        for name, candle in self.timeframes.process_tick(tick):
+            self.timeframe_candles += 1
+            self.timeframe_indicators[name] = self.timeframe_ind[name].update(candle)
+
+    def warm_start(self, ticks):
+        """Rebuilds candle and indicator state from historical ticks with a batch pass."""
+        # numpy is only needed for the batch path
+        from data.warm_start import warm_start
+        if self.timeframe_ind:
+            # Gate with the model before warm_start seeds it, as the live loop would have
+            keep = self.spread_model.mask([t["ask"] - t["bid"] for t in ticks])
+            for tick, ok in zip(ticks, keep.tolist()):
+                if ok:
+                    self._update_timeframes(tick)
+        self.last_indicators = warm_start(ticks, self.tick_engine, self.ind_engine, self.strategy_engine,
+                                          symbol=self.symbol, spread_model=self.spread_model)
+        self.last_tick_msc = ticks[-1].get("time_msc", self.last_tick_msc)
+
+    def stats(self, elapsed_s):
+        """Throughput since the last `reset_stats()` over `elapsed_s` seconds of wall time."""
+        return {
+            "symbol": self.symbol,
+            "state": self.strategy_engine.state,
+            "ticks": self.ticks,
+            "ticks_per_s": self.ticks / elapsed_s if elapsed_s > 0 else 0.0,
+            "duplicates": self.duplicates,
+            "spread_rejects": self.spread_rejects,
+            "candles": self.candles,
+            "timeframe_candles": self.timeframe_candles,
+            "signals": self.signals,
+            "us_per_tick": self.busy_s / self.ticks * 1e6 if self.ticks else 0.0,
+            "spread": self.spread_model.snapshot(),
+        }
+
+    def get_state(self):
+        return {
+            "symbol": self.symbol,
+            "last_tick_msc": self.last_tick_msc,
+            "last_indicators": self.last_indicators,
+            "tick_engine": self.tick_engine.get_state(),
+            "indicators": self.ind_engine.get_state(),
+            "strategy": self.strategy_engine.get_state(),
+            "spread": self.spread_model.get_state(),
+            "timeframes": {
+                "candles": self.timeframes.get_state(),
+                "indicators": {name: ind.get_state() for name, ind in self.timeframe_ind.items()},
+                "last_indicators": dict(self.timeframe_indicators),
+            },
+        }
+
+    def load_state(self, state):
+        if state["symbol"] != self.symbol:
+            raise ValueError(f"Snapshot is for {state['symbol']}, pipeline runs {self.symbol}")
+        self.tick_engine.load_state(state["tick_engine"])
+        self.ind_engine.load_state(state["indicators"])
+        self.strategy_engine.load_state(state["strategy"])
+        self.last_indicators = state["last_indicators"]
+        self.last_tick_msc = state["last_tick_msc"]
+        if "spread" in state:
+            self.spread_model.load_state(state["spread"])
+        if "timeframes" in state:
+            timeframes = state["timeframes"]
+            self.timeframes.load_state(timeframes["candles"])
+            for name, ind in self.timeframe_ind.items():
+                ind.load_state(timeframes["indicators"][name])
+            self.timeframe_indicators = timeframes["last_indicators"]
@@ -0,0 +1,152 @@
+import time
+from datetime import datetime, timedelta
+from multiprocessing import shared_memory
+import numpy as np
+
+TICK_DTYPE = np.dtype([
+    ("symbol", "<i4"),      # index into the ring's symbol list
+    ("flags", "<i4"),
+    ("time_msc", "<i8"),
+    ("timestamp_us", "<i8"),  # tick `timestamp` as microseconds since 1970-01-01 (naive)
+    ("bid", "<f8"),
+    ("ask", "<f8"),
+    ("recv_ns", "<i8"),     # time.monotonic_ns() when the ingestion process wrote it
+])
+
+_EPOCH = datetime(1970, 1, 1)
+_ONE_US = timedelta(microseconds=1)
+
+REPLAY = 1  # history or outage backfill: rebuilds state but never trades
+
+# Header slots (int64)
+_CAPACITY, _WRITE_SEQ, _READ_SEQ, _READER_NS, _LOST = range(5)
+_HEADER_BYTES = 64
+
+
+class TickRing:
+    """
+    Single-producer, single-consumer tick ring in shared memory.
+
+    The ingestion process appends records and then publishes the new write
+    sequence; the worker reads everything between its read sequence and the
+    write sequence and publishes its progress back into the header, which is
+    what the supervisor reads to report lag. Sequences only ever grow, so the
+    consumer's position survives a worker crash. A consumer that falls more
+    than `capacity` ticks behind skips ahead and counts the overwritten ticks
+    as lost.
+    """
+
+    def __init__(self, shm, owner=False):
+        self.shm = shm
+        self.owner = owner
+        self.header = np.ndarray((_HEADER_BYTES // 8,), dtype="<i8", buffer=shm.buf)
+        self.capacity = int(self.header[_CAPACITY])
+        self.records = np.ndarray((self.capacity,), dtype=TICK_DTYPE, buffer=shm.buf, offset=_HEADER_BYTES)
+
+    @classmethod
+    def create(cls, capacity=131072):
+        shm = shared_memory.SharedMemory(create=True, size=_HEADER_BYTES + capacity * TICK_DTYPE.itemsize)
+        header = np.ndarray((_HEADER_BYTES // 8,), dtype="<i8", buffer=shm.buf)
+        header[:] = 0
+        header[_CAPACITY] = capacity
+        del header
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        return cls(shared_memory.SharedMemory(name=name))
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    # Producer side
+    def write(self, symbol_index, tick, flags=0):
+        seq = int(self.header[_WRITE_SEQ])
+        rec = self.records[seq % self.capacity]
+        rec["symbol"] = symbol_index
+        rec["flags"] = flags
+        rec["time_msc"] = tick.get("time_msc") or 0
+        rec["timestamp_us"] = (tick["timestamp"] - _EPOCH) // _ONE_US
+        rec["bid"] = tick["bid"]
+        rec["ask"] = tick["ask"]
+        rec["recv_ns"] = time.monotonic_ns()
+        # Publish only after the record is complete
+        self.header[_WRITE_SEQ] = seq + 1
+
+    # Consumer side
+    @property
+    def write_seq(self):
+        return int(self.header[_WRITE_SEQ])
+
+    @property
+    def read_seq(self):
+        return int(self.header[_READ_SEQ])
+
+    def oldest_seq(self):
+        return max(0, self.write_seq - self.capacity)
+
+    def read(self, start_seq, max_count=4096):
+        """
+        Copies out up to `max_count` records starting at `start_seq`.
+        Returns `(first_seq, records)`; `first_seq` is later than `start_seq`
+        when the writer has already overwritten part of the requested range.
+        """
+        end = min(self.write_seq, start_seq + max_count)
+        first = max(start_seq, end - self.capacity, 0)
+        if first >= end:
+            return first, self.records[:0].copy()
+        lo, hi = first % self.capacity, (end - 1) % self.capacity + 1
+        if lo < hi:
+            batch = self.records[lo:hi].copy()
+        else:
+            batch = np.concatenate((self.records[lo:], self.records[:hi]))
+        # Drop anything the writer lapped while we were copying
+        overrun = self.write_seq - self.capacity - first
+        if overrun > 0:
+            batch = batch[overrun:]
+            first += overrun
+        return first, batch
+
+    def commit(self, seq, lost=0):
+        """Publishes consumer progress and liveness for the supervisor."""
+        self.header[_READ_SEQ] = seq
+        self.header[_READER_NS] = time.monotonic_ns()
+        if lost:
+            self.header[_LOST] += lost
+
+    def lag(self):
+        """Consumer backlog: pending ticks, age of the oldest pending tick, lost ticks, heartbeat age."""
+        now = time.monotonic_ns()
+        write_seq, read_seq = self.write_seq, self.read_seq
+        pending = write_seq - read_seq
+        lag_ms = 0.0
+        if pending > 0:
+            oldest = max(read_seq, write_seq - self.capacity)
+            lag_ms = (now - int(self.records[oldest % self.capacity]["recv_ns"])) / 1e6
+        reader_ns = int(self.header[_READER_NS])
+        return {
+            "pending": pending,
+            "lag_ms": lag_ms,
+            "lost": int(self.header[_LOST]),
+            "heartbeat_age_s": (now - reader_ns) / 1e9 if reader_ns else None,
+        }
+
+    @staticmethod
+    def to_tick(rec, symbol):
+        bid, ask = float(rec["bid"]), float(rec["ask"])
+        return {
+            "symbol": symbol,
+            "bid": bid,
+            "ask": ask,
+            "spread": ask - bid,
+            "time_msc": int(rec["time_msc"]),
+            "timestamp": _EPOCH + timedelta(microseconds=int(rec["timestamp_us"])),
+        }
+
+    def close(self):
+        # numpy views must go before the buffer can be released
+        self.header = self.records = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -1,4 +1,3 @@
-import MetaTrader5 as mt5
 import yaml
 import sys
 import os
@@ -6,7 +5,7 @@ import os
 # Add parent directory to path to import local modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from data.mt5_adapter import MT5Adapter
+from data.broker import create_broker
 
 def run_health_check():
     print("🔍 Starting Bot Health Check...")
@@ -22,8 +21,13 @@ def run_health_check():
 
     print("✅ Configuration file loaded.")
 
-    # 2. Check MT5 Connection
-    adapter = MT5Adapter()
+    # 2. Check broker connection (MT5 unless config selects another backend)
+    try:
+        adapter = create_broker(config)
+    except ImportError as e:
+        print(f"❌ Error: broker backend unavailable ({e}). MetaTrader5 requires Windows.")
+        return
+    print(f"✅ Broker backend: {type(adapter).__name__}")
     login = config['mt5'].get('login')
     password = config['mt5'].get('password')
     server = config['mt5'].get('server')
@@ -49,13 +53,15 @@ def run_health_check():
         else:
             print("❌ Error: Could not retrieve account information.")
 
-        # 4. Check Symbol
-        symbol = config['trading']['symbol']
-        tick = adapter.get_tick(symbol)
-        if tick:
-            print(f"✅ Symbol {symbol} is available. Last Bid: {tick['bid']}")
-        else:
-            print(f"❌ Error: Symbol {symbol} not found or no market data.")
+        # 4. Check Symbols
+        symbols = config['trading'].get('symbols') or [config['trading']['symbol']]
+        ticks = adapter.get_ticks(symbols)
+        for symbol in symbols:
+            tick = ticks.get(symbol)
+            if tick:
+                print(f"✅ Symbol {symbol} is available. Last Bid: {tick['bid']}")
+            else:
+                print(f"❌ Error: Symbol {symbol} not found or no market data.")
 
         adapter.shutdown()
     else:
@@ -0,0 +1,42 @@
+import argparse
+import logging
+import os
+import sys
+
+# Add parent directory to path to import local modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtest.journal_replay import replay_journal
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded session journal and diff every strategy decision")
+    parser.add_argument("journals", nargs="+", help="Journal files (logs/journal/*.bin)")
+    parser.add_argument("--show", type=int, default=20, help="Mismatches to print per journal (default: 20)")
+    args = parser.parse_args()
+
+    # The strategy's own logging would drown the diff
+    logging.basicConfig(level=logging.WARNING)
+
+    failed = False
+    for path in args.journals:
+        report = replay_journal(path, max_mismatches=args.show)
+        records = report["records"]
+        print(f"{path}: {report['ticks']} ticks replayed, {records.get('duplicate', 0)} repeated quotes, "
+              f"{sum(records.get(k, 0) for k in ('order', 'modify_sl', 'close'))} broker responses")
+        matched = ", ".join(f"{kind} {n}" for kind, n in sorted(report["matched"].items())) or "none"
+        print(f"  Matched: {matched}")
+        if not report["mismatches"]:
+            print("  Replay is identical to the recording")
+            continue
+        failed = True
+        print(f"  MISMATCHES: {report['mismatches']}")
+        for m in report["first_mismatches"]:
+            print(f"  - tick {m['tick']} ({m['symbol']} time_msc {m['time_msc']}) {m['kind']}:")
+            print(f"      recorded: {m['recorded']}")
+            print(f"      replayed: {m['replayed']}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,24 @@
-from utils.pip_utils import pips_to_price
+from utils.symbol_spec import get_spec
 
 class EntryTrigger:
-    def __init__(self, buffer_pips=0.3):
+    def __init__(self, buffer_pips=0.3, spec=None):
         self.buffer_pips = buffer_pips
+        self.buffer = (spec or get_spec()).pips_to_price(buffer_pips)
+
+    def entry_level(self, setup):
+        """Breakout price including the buffer; the level armed for tick-level triggering."""
+        if setup["direction"] == "BUY":
+            return setup["trigger_price"] + self.buffer
+        return setup["trigger_price"] - self.buffer
 
     def check_trigger(self, setup, candle):
         direction = setup["direction"]
+        trigger_price = self.entry_level(setup)
 
         if direction == "BUY":
-            trigger_price = setup["trigger_price"] + pips_to_price(self.buffer_pips)
             if candle["high"] >= trigger_price:
                 return trigger_price
         else:
-            trigger_price = setup["trigger_price"] - pips_to_price(self.buffer_pips)
             if candle["low"] <= trigger_price:
                 return trigger_price
 
@@ -0,0 +1,115 @@
+from array import array
+from datetime import datetime, timedelta
+
+# Decision points, in the order a setup passes through them
+CHECKS = ("spread", "volatility", "news", "session", "trend", "impulse", "pullback", "structure", "trigger")
+# Why a check failed; 0 means it passed
+REASONS = (
+    "passed",
+    "spread_gate",                                                     # spread
+    "low_range",                                                       # volatility
+    "news_blackout",                                                   # news
+    "off_session",                                                     # session
+    "no_indicators", "ema_side", "ema_slope", "no_swing",              # trend
+    "too_few_candles", "size", "body_dominance", "overlap",            # impulse
+    "directional_closes", "counter_trend",
+    "candle_count", "new_extreme", "body_close", "depth",              # pullback
+    "ema_distance", "body_size",
+    "breach", "ema_close",                                             # structure
+)
+STATES = ("SEARCHING", "WAITING_PULLBACK", "WAITING_TRIGGER")
+# What v0..v3 hold for each check; pips unless noted
+VALUE_NAMES = {
+    "spread": ("spread", "gate", "", ""),
+    "volatility": ("avg_range", "min_avg_range", "", ""),
+    "news": ("", "", "", ""),
+    "session": ("", "", "", ""),
+    "trend": ("close_minus_ema", "ema_slope", "swing_break", ""),
+    "impulse": ("candles", "size", "body_dominance", "overlap"),
+    "pullback": ("candles", "depth", "ema_distance", "body_ratio"),
+    "structure": ("breach", "close_minus_ema", "", ""),
+    "trigger": ("entry_price", "", "", ""),
+}
+
+CHECK_CODES = {name: code for code, name in enumerate(CHECKS)}
+REASON_CODES = {name: code for code, name in enumerate(REASONS)}
+STATE_CODES = {name: code for code, name in enumerate(STATES)}
+DIRECTIONS = {"BUY": 1, "SELL": -1, None: 0}
+
+_EPOCH = datetime(1970, 1, 1)
+_ONE_MS = timedelta(milliseconds=1)
+_NAN = float("nan")
+# Column -> array typecode
+COLUMNS = (("candle", "q"), ("time_msc", "q"), ("state", "B"), ("check", "B"), ("reason", "B"),
+           ("direction", "b"), ("v0", "d"), ("v1", "d"), ("v2", "d"), ("v3", "d"))
+
+
+def _time_msc(timestamp):
+    if isinstance(timestamp, datetime):
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.replace(tzinfo=None) - timestamp.utcoffset()
+        return (timestamp - _EPOCH) // _ONE_MS
+    return -1
+
+
+class FunnelRecorder:
+    """
+    Structured record of every strategy decision point: candle index, time,
+    state, the check evaluated, why it failed (or "passed") and up to four
+    measured values, e.g. pullback depth or impulse overlap.
+
+    Records are appended to typed `array` columns, so a long run costs a few
+    dozen bytes per record and no Python objects. `save()` writes them as
+    columnar numpy arrays (.npz) with the code tables, and `load_funnel()`
+    reads them back for vectorized queries.
+    """
+
+    def __init__(self):
+        self.columns = {name: array(code) for name, code in COLUMNS}
+        self._appenders = tuple(self.columns[name].append for name, _ in COLUMNS)
+        self._last_timestamp = None
+        self._last_msc = -1
+
+    def __len__(self):
+        return len(self.columns["check"])
+
+    def record(self, check, reason, index, timestamp, state, direction=None, v0=_NAN, v1=_NAN, v2=_NAN, v3=_NAN):
+        if timestamp is not self._last_timestamp:
+            self._last_timestamp = timestamp
+            self._last_msc = _time_msc(timestamp)
+        values = (index, self._last_msc, STATE_CODES[state], CHECK_CODES[check], REASON_CODES[reason],
+                  DIRECTIONS[direction], v0, v1, v2, v3)
+        for append, value in zip(self._appenders, values):
+            append(value)
+
+    def to_arrays(self):
+        """`{column: ndarray}` plus the code tables under `checks`, `reasons`, `states` and `value_names`."""
+        # numpy is only needed to export
+        import numpy as np
+        arrays = {name: np.frombuffer(column, dtype=column.typecode).copy() for name, column in self.columns.items()}
+        arrays["checks"] = np.array(CHECKS)
+        arrays["reasons"] = np.array(REASONS)
+        arrays["states"] = np.array(STATES)
+        arrays["value_names"] = np.array([VALUE_NAMES[check] for check in CHECKS])
+        return arrays
+
+    def save(self, path):
+        import numpy as np
+        np.savez_compressed(path, **self.to_arrays())
+        return len(self)
+
+
+def load_funnel(path):
+    """Columns of a saved funnel as a dict of arrays (see `FunnelRecorder.to_arrays`)."""
+    import numpy as np
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+
+def funnel_summary(arrays):
+    """`[(check, reason, count)]` over all records, in check order."""
+    import numpy as np
+    checks, reasons = arrays["checks"].tolist(), arrays["reasons"].tolist()
+    pairs = arrays["check"].astype(np.int64) * len(reasons) + arrays["reason"]
+    counts = np.bincount(pairs, minlength=len(checks) * len(reasons))
+    return [(checks[i // len(reasons)], reasons[i % len(reasons)], int(n)) for i, n in enumerate(counts.tolist()) if n]
@@ -1,15 +1,32 @@
-from utils.pip_utils import price_to_pips
+from utils.symbol_spec import get_spec
 
 class ImpulseDetector:
-    def __init__(self, min_size=8, min_candles=5, min_body_dominance=0.6, max_overlap=0.3):
+    def __init__(self, min_size=8, min_candles=5, min_body_dominance=0.6, max_overlap=0.3, spec=None):
+        self.spec = spec or get_spec()
         self.min_size = min_size
+        self.min_size_price = self.spec.pips_to_price(min_size)
         self.min_candles = min_candles
         self.min_body_dominance = min_body_dominance
         self.max_overlap = max_overlap
+        # Outcome of the last detect(), for the setup funnel: reason and (candles,
+        # size in price units, body dominance, overlap) of the leg that passed or
+        # got furthest through the filters
+        self.reason = None
+        self.values = ()
+        self._stage = 0
+
+    def _reject(self, stage, reason, values):
+        if stage > self._stage:
+            self._stage = stage
+            self.reason = reason
+            self.values = values
 
     def detect(self, candles):
         if len(candles) < self.min_candles:
+            self.reason, self.values = "too_few_candles", (len(candles),)
             return None
+        self._stage = 0
+        self.reason, self.values = "size", ()
 
         # Check the last n candles for impulse
         # We can iterate backwards to find the best impulse leg
@@ -18,9 +35,9 @@ class ImpulseDetector:
 
             open_price = leg[0]["open"]
             close_price = leg[-1]["close"]
-            size_pips = abs(price_to_pips(close_price - open_price))
-
-            if size_pips < self.min_size:
+            size = abs(close_price - open_price)
+            if size < self.min_size_price:
+                self._reject(1, "size", (n, size))
                 continue
 
             high = max(c["high"] for c in leg)
@@ -32,12 +49,14 @@ class ImpulseDetector:
             body_dominance = sum_bodies / total_range
 
             if body_dominance < self.min_body_dominance:
+                self._reject(2, "body_dominance", (n, size, body_dominance))
                 continue
 
             sum_ranges = sum(c["high"] - c["low"] for c in leg)
             overlap = (sum_ranges - total_range) / sum_ranges if sum_ranges > 0 else 1
 
             if overlap > self.max_overlap:
+                self._reject(3, "overlap", (n, size, body_dominance, overlap))
                 continue
 
             direction = "BUY" if close_price > open_price else "SELL"
@@ -46,12 +65,14 @@ class ImpulseDetector:
             up_closes = sum(1 for c in leg if c["close"] > c["open"])
             down_closes = sum(1 for c in leg if c["close"] < c["open"])
 
-            if direction == "BUY" and up_closes < n * 0.6: continue
-            if direction == "SELL" and down_closes < n * 0.6: continue
+            if (direction == "BUY" and up_closes < n * 0.6) or (direction == "SELL" and down_closes < n * 0.6):
+                self._reject(4, "directional_closes", (n, size, body_dominance, overlap))
+                continue
 
+            self.reason, self.values = "passed", (n, size, body_dominance, overlap)
             return {
                 "direction": direction,
-                "size": size_pips,
+                "size": abs(self.spec.price_to_pips(close_price - open_price)),
                 "high": high,
                 "low": low,
                 "count": n,
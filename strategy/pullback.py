@@ -1,8 +1,8 @@
 import logging 
-from utils.pip_utils import price_to_pips, pips_to_price
+from utils.symbol_spec import get_spec
 
 class PullbackQualifier:
-    def __init__(self, min_candles=2, max_candles=8, min_depth=0.20, max_depth=0.65, ema_buffer=2.0):
+    def __init__(self, min_candles=2, max_candles=8, min_depth=0.20, max_depth=0.65, ema_buffer=2.0, spec=None):
         """
         Pullback qualification with tuned settings for better profitability.
         
@@ -17,16 +17,30 @@ class PullbackQualifier:
         self.min_depth = min_depth
         self.max_depth = max_depth
         self.ema_buffer = ema_buffer
+        self.spec = spec or get_spec()
+        # Thresholds in price units, converted once
+        self.wick_tolerance = self.spec.pips_to_price(4.0)
+        self.body_buffer = self.spec.pips_to_price(0.5)
+        self.ema_buffer_price = self.spec.pips_to_price(ema_buffer)
+        # Outcome of the last qualify(), for the setup funnel: reason and
+        # (candles, depth, closest EMA distance in price units, pullback/impulse body ratio)
+        self.reason = None
+        self.values = ()
+
+    def _result(self, reason, n, depth=None, ema_distance=None, body_ratio=None):
+        self.reason = reason
+        self.values = (n, depth, ema_distance, body_ratio)
+        return reason == "passed"
 
     def qualify(self, pb_candles, impulse, indicators):
         n = len(pb_candles)
         if not (self.min_candles <= n <= self.max_candles):
-            logging.debug(f"PB: candle count {n} out of range [{self.min_candles}-{self.max_candles}]")
-            return False
+            logging.debug("PB: candle count %s out of range [%s-%s]", n, self.min_candles, self.max_candles)
+            return self._result("candle_count", n)
 
         impulse_range = impulse["high"] - impulse["low"]
         if impulse_range == 0:
-            return False
+            return self._result("depth", n)
 
         if impulse["direction"] == "BUY":
             current_low = min(c["low"] for c in pb_candles)
@@ -34,18 +48,17 @@ class PullbackQualifier:
 
             # Structure check with 4-pip tolerance
             max_pb_high = max(c["high"] for c in pb_candles)
-            wick_tolerance = pips_to_price(4.0)
             
-            if max_pb_high > impulse["high"] + wick_tolerance:
-                overshoot = price_to_pips(max_pb_high - impulse["high"])
-                logging.info(f"PB Qualification: excessive new high (+{overshoot:.1f} pips)")
-                return False
+            if max_pb_high > impulse["high"] + self.wick_tolerance:
+                overshoot = self.spec.price_to_pips(max_pb_high - impulse["high"])
+                logging.info("PB Qualification: excessive new high (+%.1f pips)", overshoot)
+                return self._result("new_extreme", n, depth)
             
             # But BODY must not exceed impulse high (+0.5 pip buffer)
             max_pb_close = max(c["close"] for c in pb_candles)
-            if max_pb_close > impulse["high"] + pips_to_price(0.5):
-                logging.info(f"PB Qualification: body close above impulse high")
-                return False
+            if max_pb_close > impulse["high"] + self.body_buffer:
+                logging.info("PB Qualification: body close above impulse high")
+                return self._result("body_close", n, depth)
                 
         else:  # SELL
             current_high = max(c["high"] for c in pb_candles)
@@ -53,26 +66,26 @@ class PullbackQualifier:
 
             # 4-pip tolerance for SELL setups
             min_pb_low = min(c["low"] for c in pb_candles)
-            wick_tolerance = pips_to_price(4.0)
             
-            if min_pb_low < impulse["low"] - wick_tolerance:
-                overshoot = price_to_pips(impulse["low"] - min_pb_low)
-                logging.info(f"PB Qualification: excessive new low (-{overshoot:.1f} pips)")
-                return False
+            if min_pb_low < impulse["low"] - self.wick_tolerance:
+                overshoot = self.spec.price_to_pips(impulse["low"] - min_pb_low)
+                logging.info("PB Qualification: excessive new low (-%.1f pips)", overshoot)
+                return self._result("new_extreme", n, depth)
             
             # But BODY must not exceed impulse low (-0.5 pip buffer)
             min_pb_close = min(c["close"] for c in pb_candles)
-            if min_pb_close < impulse["low"] - pips_to_price(0.5):
-                logging.info(f"PB Qualification: body close below impulse low")
-                return False
+            if min_pb_close < impulse["low"] - self.body_buffer:
+                logging.info("PB Qualification: body close below impulse low")
+                return self._result("body_close", n, depth)
 
         # Depth check
         if not (self.min_depth <= depth <= self.max_depth):
-            logging.info(f"PB Qualification: depth {depth:.1%} out of range [{self.min_depth:.0%}-{self.max_depth:.0%}]")
-            return False
+            logging.info("PB Qualification: depth %.1f%% out of range [%.0f%%-%.0f%%]", depth * 100, self.min_depth * 100, self.max_depth * 100)
+            return self._result("depth", n, depth)
 
         # EMA Interaction
         ema = indicators.get("ema20")
+        closest_dist = None
         if ema:
             near_ema = False
             for c in pb_candles:
@@ -82,22 +95,24 @@ class PullbackQualifier:
                     break
                 # Within buffer
                 dist = min(abs(c["low"] - ema), abs(c["high"] - ema))
-                if price_to_pips(dist) <= self.ema_buffer:
+                if dist <= self.ema_buffer_price:
                     near_ema = True
                     break
 
+            closest_dist = min(0.0 if c["low"] <= ema <= c["high"] else min(abs(c["low"] - ema), abs(c["high"] - ema))
+                               for c in pb_candles)
             if not near_ema:
-                closest_dist = min([min(abs(c["low"] - ema), abs(c["high"] - ema)) for c in pb_candles])
-                logging.info(f"PB Qualification: not near EMA (closest: {price_to_pips(closest_dist):.1f} pips)")
-                return False
+                logging.info("PB Qualification: not near EMA (closest: %.1f pips)", self.spec.price_to_pips(closest_dist))
+                return self._result("ema_distance", n, depth, closest_dist)
 
         # Body Behavior - tightened to 0.8
         pb_avg_body = sum(abs(c["close"] - c["open"]) for c in pb_candles) / n
         impulse_avg_body = impulse.get("avg_body", 0)
+        body_ratio = pb_avg_body / impulse_avg_body if impulse_avg_body > 0 else None
         
         if impulse_avg_body > 0 and pb_avg_body >= 0.8 * impulse_avg_body:
-            logging.info(f"PB Qualification: body too large (pb:{pb_avg_body:.5f} vs imp:{impulse_avg_body:.5f})")
-            return False
+            logging.info("PB Qualification: body too large (pb:%.5f vs imp:%.5f)", pb_avg_body, impulse_avg_body)
+            return self._result("body_size", n, depth, closest_dist, body_ratio)
 
-        logging.info(f"✓ Pullback qualified: {n} candles, {depth:.1%} depth")
-        return True
\ No newline at end of file
+        logging.info("✓ Pullback qualified: %s candles, %.1f%% depth", n, depth * 100)
+        return self._result("passed", n, depth, closest_dist, body_ratio)
\ No newline at end of file
@@ -4,40 +4,78 @@ from strategy.impulse import ImpulseDetector
 from strategy.pullback import PullbackQualifier
 from strategy.structure import StructureMonitor
 from strategy.entry import EntryTrigger
-from utils.pip_utils import price_to_pips
+from utils.symbol_spec import get_spec
+from utils.spread_model import SpreadModel
 from utils.news_filter import NewsFilter
 from utils.time_utils import is_session_active
+from utils.price_levels import PriceLevelIndex, ABOVE, BELOW
+
+
+def stamp_signal(signal, tick):
+    """Carries the triggering tick's broker time and local receive time to execution, for latency tracking."""
+    signal["tick_msc"] = tick.get("time_msc")
+    signal["recv_ns"] = tick.get("recv_ns")
+
 
 class StrategyEngine:
-    def __init__(self, risk_engine, symbol="EURUSD"):
+    def __init__(self, risk_engine, symbol="EURUSD", spec=None, spread_model=None):
         self.symbol = symbol
-        self.news_filter = NewsFilter()
-        self.trend_analyzer = TrendAnalyzer()
-        self.impulse_detector = ImpulseDetector()
-        self.pullback_qualifier = PullbackQualifier()
-        self.structure_monitor = StructureMonitor()
-        self.entry_trigger = EntryTrigger()
+        self.spec = spec or get_spec(symbol)
+        self.news_filter = NewsFilter(symbol=symbol)
+        self.trend_analyzer = TrendAnalyzer(spec=self.spec)
+        self.impulse_detector = ImpulseDetector(spec=self.spec)
+        self.pullback_qualifier = PullbackQualifier(spec=self.spec)
+        self.structure_monitor = StructureMonitor(spec=self.spec)
+        self.entry_trigger = EntryTrigger(spec=self.spec)
         self.risk_engine = risk_engine
+        # Fed by the owning pipeline; without one only the absolute cap applies
+        self.spread_model = spread_model or SpreadModel(self.spec)
+        # Filter thresholds in price units, converted once
+        self.min_avg_range = self.spec.pips_to_price(0.6)
 
         self.candles = []
         self.state = "SEARCHING"
         self.current_setup = None
 
-    def process_candle(self, candle, indicators, spread_pips=None):
+        # Armed entry levels: BUY triggers on the ask, SELL triggers on the bid
+        self.ask_levels = PriceLevelIndex()
+        self.bid_levels = PriceLevelIndex()
+        self._tick_signal = None
+        # Optional `FunnelRecorder`: every decision point is recorded to it with its measured values
+        self.funnel = None
+
+    def _pips(self, price):
+        return self.spec.price_to_pips(price) if price is not None else float("nan")
+
+    def _record(self, check, reason, candle, direction=None, *values, state=None):
+        self.funnel.record(check, reason, candle["index"], candle.get("timestamp_close"), state or self.state, direction,
+                           *(float("nan") if v is None else v for v in values))
+
+    def process_candle(self, candle, indicators, spread=None):
         self.candles.append(candle)
         if len(self.candles) > 100:
             self.candles.pop(0)
 
         # Update trend analyzer structure
         self.trend_analyzer.update(candle)
+        funnel = self.funnel
 
         # 0. Spread Filter (README Section 6)
-        if spread_pips is not None and spread_pips > 0.8:
-            return None
+        if spread is not None:
+            allowed = self.spread_model.allows(spread)
+            if funnel is not None:
+                self._record("spread", "passed" if allowed else "spread_gate", candle, None,
+                             self._pips(spread), self._pips(self.spread_model.threshold()))
+            if not allowed:
+                return None
 
         # 1. Volatility Filter
         avg_range = indicators.get("avg_range")
-        if avg_range and price_to_pips(avg_range) < 0.6:
+        if funnel is not None:
+            low_range = bool(avg_range and avg_range < self.min_avg_range)
+            self._record("volatility", "low_range" if low_range else "passed", candle, None,
+                         self._pips(avg_range), self._pips(self.min_avg_range))
+        if avg_range and avg_range < self.min_avg_range:
             if self.state != "SEARCHING":
                 logging.info("Volatility dropped. Resetting state.")
                 self.reset_state()
@@ -57,26 +95,39 @@ class StrategyEngine:
 
     def _handle_searching(self, candle, indicators):
         # 0. News Filter
+        funnel = self.funnel
         timestamp = candle.get("timestamp_open") or candle.get("timestamp")
-        if self.news_filter.is_news_active(timestamp):
+        news = self.news_filter.is_news_active(timestamp)
+        if funnel is not None:
+            self._record("news", "news_blackout" if news else "passed", candle)
+        if news:
             return None
 
         # 0.1 Session Filter (README Section 13)
-        if not is_session_active(timestamp):
+        session = is_session_active(timestamp)
+        if funnel is not None:
+            self._record("session", "passed" if session else "off_session", candle)
+        if not session:
             return None
 
         # Qualify Trend
         uptrend = self.trend_analyzer.qualify_uptrend(candle, indicators)
+        if funnel is not None:
+            self._record_trend(candle, "BUY")
         downtrend = self.trend_analyzer.qualify_downtrend(candle, indicators)
+        if funnel is not None:
+            self._record_trend(candle, "SELL")
 
         if not uptrend and not downtrend:
             return None
 
         # Detect Impulse
         impulse = self.impulse_detector.detect(self.candles)
+        if funnel is not None:
+            self._record_impulse(candle, impulse, uptrend, downtrend)
         if impulse:
             if (uptrend and impulse["direction"] == "BUY") or (downtrend and impulse["direction"] == "SELL"):
-                logging.info(f"Impulse detected: {impulse['direction']} size {impulse['size']:.1f} pips")
+                logging.info("Impulse detected: %s size %.1f pips", impulse['direction'], impulse['size'])
                 self.current_setup = {
                     "impulse": impulse,
                     "direction": impulse["direction"],
@@ -86,20 +137,41 @@ class StrategyEngine:
                 self.state = "WAITING_PULLBACK"
         return None
 
+    def _record_trend(self, candle, direction):
+        close_ema, slope, swing = self.trend_analyzer.values or (None, None, None)
+        self._record("trend", self.trend_analyzer.reason, candle, direction,
+                     self._pips(close_ema), self._pips(slope), self._pips(swing))
+
+    def _record_impulse(self, candle, impulse, uptrend, downtrend):
+        n, size, dominance, overlap = (self.impulse_detector.values + (None,) * 4)[:4]
+        reason = self.impulse_detector.reason
+        direction = impulse["direction"] if impulse else None
+        if impulse and not ((uptrend and direction == "BUY") or (downtrend and direction == "SELL")):
+            reason = "counter_trend"
+        self._record("impulse", reason, candle, direction, n, self._pips(size), dominance, overlap)
+
     def _handle_waiting_pullback(self, candle, indicators):
         setup = self.current_setup
         setup["pb_candles"].append(candle)
+        funnel = self.funnel
 
         # Check if trend still valid
         trend_valid = self.trend_analyzer.qualify_uptrend(candle, indicators) if setup["direction"] == "BUY" else self.trend_analyzer.qualify_downtrend(candle, indicators)
+        if funnel is not None:
+            self._record_trend(candle, setup["direction"])
         if not trend_valid:
             logging.info("Trend invalidated during pullback. Resetting.")
             self.reset_state()
             return None
 
         # Qualify Pullback
-        if self.pullback_qualifier.qualify(setup["pb_candles"], setup["impulse"], indicators):
-            logging.info(f"Pullback qualified for {setup['direction']} setup.")
+        qualified = self.pullback_qualifier.qualify(setup["pb_candles"], setup["impulse"], indicators)
+        if funnel is not None:
+            n, depth, ema_distance, body_ratio = self.pullback_qualifier.values
+            self._record("pullback", self.pullback_qualifier.reason, candle, setup["direction"],
+                         n, depth, self._pips(ema_distance), body_ratio)
+        if qualified:
+            logging.info("Pullback qualified for %s setup.", setup['direction'])
 
             # Prepare trigger info
             if setup["direction"] == "BUY":
@@ -115,9 +187,10 @@ class StrategyEngine:
 
             self.state = "WAITING_TRIGGER"
             setup["trigger_start_index"] = candle["index"]
+            self._arm_entry(setup)
 
         elif len(setup["pb_candles"]) > self.pullback_qualifier.max_candles:
-            logging.info(f"Pullback too long ({len(setup['pb_candles'])} candles). Resetting.")
+            logging.info("Pullback too long (%s candles). Resetting.", len(setup['pb_candles']))
             self.reset_state()
 
         return None
@@ -126,48 +199,102 @@ class StrategyEngine:
         setup = self.current_setup
 
         # Check structure integrity
-        if not self.structure_monitor.is_setup_valid(setup, candle, indicators):
+        valid = self.structure_monitor.is_setup_valid(setup, candle, indicators)
+        if self.funnel is not None:
+            breach, close_ema = self.structure_monitor.values
+            self._record("structure", self.structure_monitor.reason, candle, setup["direction"],
+                         self._pips(breach), self._pips(close_ema))
+        if not valid:
             logging.info("Structure invalidated. Resetting.")
             self.reset_state()
             return None
 
-        return self._check_entry_trigger(candle, setup)
+        signal = self._check_entry_trigger(candle, setup)
+        if signal and self.funnel is not None:
+            self._record("trigger", "passed", candle, signal["direction"], signal["entry_price"], state="WAITING_TRIGGER")
+        return signal
 
     def process_tick(self, tick, indicators):
         if self.state != "WAITING_TRIGGER" or not self.current_setup:
             return None
 
         # 0. Spread Filter (README Section 6)
-        spread_pips = price_to_pips(tick["ask"] - tick["bid"], self.symbol)
-        if spread_pips > 0.8:
+        if not self.spread_model.allows(tick["ask"] - tick["bid"]):
             return None
 
         # 0.1 Session Filter
         if not is_session_active(tick["timestamp"]):
             return None
 
-        setup = self.current_setup
         # Use bid/ask for more accurate execution (README Section 5/6)
         # BUY trigger: ask must break level
         # SELL trigger: bid must break level
+        self._tick_signal = None
+        self.ask_levels.check(tick["ask"])
+        self.bid_levels.check(tick["bid"])
+        signal = self._tick_signal
+        if signal:
+            stamp_signal(signal, tick)
+            if self.funnel is not None:
+                # Fired inside the candle after the last closed one
+                index = self.candles[-1]["index"] + 1 if self.candles else 0
+                self.funnel.record("trigger", "passed", index, tick["timestamp"], "WAITING_TRIGGER",
+                                   signal["direction"], signal["entry_price"])
+        return signal
+
+    def _arm_entry(self, setup):
+        level = self.entry_trigger.entry_level(setup)
+        setup["entry_level"] = level
         if setup["direction"] == "BUY":
-            price = tick["ask"]
+            self.ask_levels.arm("entry", level, ABOVE, self._on_entry_level)
         else:
-            price = tick["bid"]
+            self.bid_levels.arm("entry", level, BELOW, self._on_entry_level)
 
-        tick_candle = {"high": price, "low": price, "close": price}
-        return self._check_entry_trigger(tick_candle, setup)
+    def _on_entry_level(self, key, level):
+        setup = self.current_setup
+        if setup is None:
+            return
+        self._tick_signal = self._build_signal(setup, level)
 
     def _check_entry_trigger(self, candle_or_tick, setup):
         entry_price = self.entry_trigger.check_trigger(setup, candle_or_tick)
         if entry_price:
-            logging.info(f"Entry triggered at {entry_price}")
-            sl, tp = self.risk_engine.calculate_sl_tp(setup["direction"], entry_price, setup["pb_extreme"])
-            signal = {"direction": setup["direction"], "entry_price": entry_price, "sl": sl, "tp": tp}
-            self.reset_state()
-            return signal
+            return self._build_signal(setup, entry_price)
         return None
 
+    def _build_signal(self, setup, entry_price):
+        logging.info("Entry triggered at %s", entry_price)
+        sl, tp = self.risk_engine.calculate_sl_tp(setup["direction"], entry_price, setup["pb_extreme"], symbol=self.symbol)
+        signal = {"direction": setup["direction"], "entry_price": entry_price, "sl": sl, "tp": tp}
+        self.reset_state()
+        return signal
+
+    def get_state(self):
+        setup = self.current_setup
+        if setup is not None:
+            # The live setup grows pb_candles and gains trigger levels in place
+            setup = dict(setup, pb_candles=list(setup["pb_candles"]))
+        return {
+            "symbol": self.symbol,
+            "candles": list(self.candles),
+            "state": self.state,
+            "current_setup": setup,
+            "trend": self.trend_analyzer.get_state(),
+        }
+
+    def load_state(self, state):
+        if state["symbol"] != self.symbol:
+            raise ValueError(f"Snapshot is for {state['symbol']}, engine trades {self.symbol}")
+        self.reset_state()
+        self.candles = list(state["candles"])
+        self.trend_analyzer.load_state(state["trend"])
+        self.state = state["state"]
+        self.current_setup = state["current_setup"]
+        if self.state == "WAITING_TRIGGER" and self.current_setup:
+            self._arm_entry(self.current_setup)
+
     def reset_state(self):
         self.state = "SEARCHING"
         self.current_setup = None
+        self.ask_levels.disarm("entry")
+        self.bid_levels.disarm("entry")
@@ -1,8 +1,8 @@
 import logging
-from utils.pip_utils import pips_to_price, price_to_pips
+from utils.symbol_spec import get_spec
 
 class StructureMonitor:
-    def __init__(self, ema_buffer_pips=1.0, structure_buffer_pips=1.5):
+    def __init__(self, ema_buffer_pips=1.0, structure_buffer_pips=1.5, spec=None):
         """
         Structure monitoring with tuned settings for better profitability.
         
@@ -16,41 +16,53 @@ class StructureMonitor:
         """
         self.ema_buffer_pips = ema_buffer_pips
         self.structure_buffer_pips = structure_buffer_pips
+        self.spec = spec or get_spec()
+        # Buffers in price units, converted once
+        self.ema_buffer = self.spec.pips_to_price(ema_buffer_pips)
+        self.structure_buffer = self.spec.pips_to_price(structure_buffer_pips)
+        # Outcome of the last is_setup_valid(), for the setup funnel: reason and
+        # (breach of the pullback extreme, close - EMA) in price units
+        self.reason = None
+        self.values = ()
 
     def is_setup_valid(self, setup, candle, indicators):
         direction = setup["direction"]
         ema = indicators.get("ema20")
+        close_ema = candle["close"] - ema if ema else None
 
         if direction == "BUY":
             # Add proper tolerance to structure invalidation
             base_invalidation = setup.get("invalidation_price", 0)
-            tolerance = pips_to_price(self.structure_buffer_pips)
-            invalidation = base_invalidation - tolerance
+            invalidation = base_invalidation - self.structure_buffer
             
+            breach = base_invalidation - candle["low"]
             if candle["low"] < invalidation:
-                breach = price_to_pips(base_invalidation - candle["low"])
-                logging.info(f"Structure broken: Low breached by {breach:.1f} pips")
-                return False
+                logging.info("Structure broken: Low breached by %.1f pips", self.spec.price_to_pips(breach))
+                return self._result("breach", breach, close_ema)
 
             # Close below EMA - buffer
-            if ema and candle["close"] < ema - pips_to_price(self.ema_buffer_pips):
-                logging.info(f"Structure broken: Close {candle['close']:.5f} below EMA {ema:.5f}")
-                return False
+            if ema and candle["close"] < ema - self.ema_buffer:
+                logging.info("Structure broken: Close %.5f below EMA %.5f", candle['close'], ema)
+                return self._result("ema_close", breach, close_ema)
                 
         else:  # SELL
             # Add proper tolerance
             base_invalidation = setup.get("invalidation_price", float('inf'))
-            tolerance = pips_to_price(self.structure_buffer_pips)
-            invalidation = base_invalidation + tolerance
+            invalidation = base_invalidation + self.structure_buffer
             
+            breach = candle["high"] - base_invalidation
             if candle["high"] > invalidation:
-                breach = price_to_pips(candle["high"] - base_invalidation)
-                logging.info(f"Structure broken: High breached by {breach:.1f} pips")
-                return False
+                logging.info("Structure broken: High breached by %.1f pips", self.spec.price_to_pips(breach))
+                return self._result("breach", breach, close_ema)
 
             # Close above EMA + buffer
-            if ema and candle["close"] > ema + pips_to_price(self.ema_buffer_pips):
-                logging.info(f"Structure broken: Close {candle['close']:.5f} above EMA {ema:.5f}")
-                return False
+            if ema and candle["close"] > ema + self.ema_buffer:
+                logging.info("Structure broken: Close %.5f above EMA %.5f", candle['close'], ema)
+                return self._result("ema_close", breach, close_ema)
 
-        return True
\ No newline at end of file
+        return self._result("passed", breach, close_ema)
+
+    def _result(self, reason, breach, close_ema):
+        self.reason = reason
+        self.values = (breach, close_ema)
+        return reason == "passed"
\ No newline at end of file
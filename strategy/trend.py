@@ -1,11 +1,19 @@
 import logging
-from utils.pip_utils import price_to_pips, pips_to_price
+from utils.symbol_spec import get_spec
 
 class TrendAnalyzer:
-    def __init__(self, ema_slope_threshold=1.0):
+    def __init__(self, ema_slope_threshold=1.0, spec=None):
+        self.spec = spec or get_spec()
         self.ema_slope_threshold = ema_slope_threshold
+        # Thresholds in price units, converted once
+        self.ema_buffer = self.spec.pips_to_price(1.0)
+        self.min_slope = self.spec.pips_to_price(ema_slope_threshold)
         self.highs = []
         self.lows = []
+        # Outcome of the last qualify_* call, for the setup funnel:
+        # reason and (close - EMA, EMA slope, swing break) in price units
+        self.reason = None
+        self.values = ()
 
     def update_structure(self, candle):
         self.highs.append(candle["high"])
@@ -17,61 +25,75 @@ class TrendAnalyzer:
     def update(self, candle):
         self.update_structure(candle)
 
+    def get_state(self):
+        return {"highs": list(self.highs), "lows": list(self.lows)}
+
+    def load_state(self, state):
+        self.highs = list(state["highs"])
+        self.lows = list(state["lows"])
+
+    def _result(self, reason, close_ema=None, slope=None, swing=None):
+        self.reason = reason
+        self.values = (close_ema, slope, swing)
+        return reason == "passed"
+
     def qualify_uptrend(self, candle, indicators):
         ema = indicators.get("ema20")
         slope = indicators.get("ema20_slope")
 
         if ema is None or slope is None:
-            return False
+            return self._result("no_indicators")
 
         # 1. Price above EMA (with 1.0 pip buffer to allow minor pierces)
-        if candle["close"] < ema - pips_to_price(1.0):
-            logging.debug(f"Trend Analysis: Price {candle['close']} < EMA {ema} - buffer")
-            return False
+        if candle["close"] < ema - self.ema_buffer:
+            logging.debug("Trend Analysis: Price %s < EMA %s - buffer", candle['close'], ema)
+            return self._result("ema_side", candle["close"] - ema, slope)
 
         # 2. EMA sloping upward
-        slope_pips = price_to_pips(slope)
-        if slope_pips < self.ema_slope_threshold:
-            logging.debug(f"Trend Analysis: Slope {slope_pips:.2f} < Threshold {self.ema_slope_threshold}")
-            return False
+        if slope < self.min_slope:
+            logging.debug("Trend Analysis: Slope %.2f < Threshold %s", self.spec.price_to_pips(slope), self.ema_slope_threshold)
+            return self._result("ema_slope", candle["close"] - ema, slope)
 
         # 3. Higher highs present - FIXED LOGIC
         # Compare recent price vs earlier highs (not max vs max)
+        swing = None
         if len(self.highs) >= 15:
             recent_high = self.highs[-1]  # Most recent high
             earlier_max = max(self.highs[-15:-5])  # Max from candles 5-15 ago
+            swing = recent_high - earlier_max
             
             if recent_high <= earlier_max:
-                logging.debug(f"Trend Analysis: No Higher High ({recent_high:.5f} <= {earlier_max:.5f})")
-                return False
+                logging.debug("Trend Analysis: No Higher High (%.5f <= %.5f)", recent_high, earlier_max)
+                return self._result("no_swing", candle["close"] - ema, slope, swing)
 
-        return True
+        return self._result("passed", candle["close"] - ema, slope, swing)
 
     def qualify_downtrend(self, candle, indicators):
         ema = indicators.get("ema20")
         slope = indicators.get("ema20_slope")
 
         if ema is None or slope is None:
-            return False
+            return self._result("no_indicators")
 
         # 1. Price below EMA (with 1.0 pip buffer)
-        if candle["close"] > ema + pips_to_price(1.0):
-            logging.debug(f"Trend Analysis: Price {candle['close']} > EMA {ema} + buffer")
-            return False
+        if candle["close"] > ema + self.ema_buffer:
+            logging.debug("Trend Analysis: Price %s > EMA %s + buffer", candle['close'], ema)
+            return self._result("ema_side", candle["close"] - ema, slope)
 
         # 2. EMA sloping downward
-        slope_pips = price_to_pips(slope)
-        if slope_pips > -self.ema_slope_threshold:
-            logging.debug(f"Trend Analysis: Slope {slope_pips:.2f} > -Threshold {self.ema_slope_threshold}")
-            return False
+        if slope > -self.min_slope:
+            logging.debug("Trend Analysis: Slope %.2f > -Threshold %s", self.spec.price_to_pips(slope), self.ema_slope_threshold)
+            return self._result("ema_slope", candle["close"] - ema, slope)
 
         # 3. Lower lows present - FIXED LOGIC
+        swing = None
         if len(self.lows) >= 15:
             recent_low = self.lows[-1]
             earlier_min = min(self.lows[-15:-5])
+            swing = earlier_min - recent_low
             
             if recent_low >= earlier_min:
-                logging.debug(f"Trend Analysis: No Lower Low ({recent_low:.5f} >= {earlier_min:.5f})")
-                return False
+                logging.debug("Trend Analysis: No Lower Low (%.5f >= %.5f)", recent_low, earlier_min)
+                return self._result("no_swing", candle["close"] - ema, slope, swing)
 
-        return True
\ No newline at end of file
+        return self._result("passed", candle["close"] - ema, slope, swing)
\ No newline at end of file
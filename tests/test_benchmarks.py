@@ -0,0 +1,27 @@
+import os
+import tempfile
+import unittest
+from benchmarks.run_benchmarks import compare, main, run_benchmarks
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_compare_flags_regressions_by_direction(self):
+        baseline = {"replay_ticks_per_s": 100000.0, "peak_memory_mb": 20.0, "startup_ms": 80.0}
+        self.assertEqual(compare({"replay_ticks_per_s": 80000.0, "peak_memory_mb": 24.0, "startup_ms": 60.0}, baseline, 0.25), [])
+        failures = compare({"replay_ticks_per_s": 70000.0, "peak_memory_mb": 26.0, "startup_ms": 80.0}, baseline, 0.25)
+        self.assertEqual([f.split(":")[0] for f in failures], ["replay_ticks_per_s", "peak_memory_mb"])
+
+    def test_small_run_and_gate(self):
+        results = run_benchmarks(n_ticks=3000, repeat=1, startup=False)
+        self.assertTrue(all(value > 0 for value in results.values()))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            baseline = os.path.join(tmp, "baseline.json")
+            args = ["--ticks", "3000", "--repeat", "1", "--no-startup"]
+            self.assertEqual(main(args + ["--save-baseline", baseline]), 0)
+            # A generous threshold passes against this machine's own baseline
+            self.assertEqual(main(args + ["--check", baseline, "--threshold", "10"]), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
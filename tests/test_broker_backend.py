@@ -0,0 +1,43 @@
+import unittest
+from datetime import datetime
+from data.broker import BrokerBackend, create_broker
+from backtest.mock_adapter import MockMT5Adapter
+from backtest.replay_broker import ReplayBroker
+from benchmarks.bench_startup import measure_import_to_first_tick
+
+
+class TestBrokerBackend(unittest.TestCase):
+    def test_factory_selects_backend(self):
+        self.assertIsInstance(create_broker({"broker": {"backend": "mock"}}), MockMT5Adapter)
+        broker = create_broker({"broker": {"backend": "replay", "replay_file": "data/sample_ticks.csv"}})
+        self.assertIsInstance(broker, ReplayBroker)
+        with self.assertRaises(ValueError):
+            create_broker({"broker": {"backend": "nope"}})
+
+    def test_incomplete_backend_fails_on_creation(self):
+        class QuotesOnly(BrokerBackend):
+            def get_tick(self, symbol):
+                return None
+
+        with self.assertRaises(TypeError):
+            QuotesOnly()
+
+    def test_replay_broker_serves_ticks_in_order(self):
+        ticks = [
+            {"bid": 1.1000, "ask": 1.1001, "timestamp": datetime(2026, 1, 1, 13, 0, 0)},
+            {"bid": 1.1002, "ask": 1.1003, "timestamp": datetime(2026, 1, 1, 13, 0, 1)},
+        ]
+        broker = ReplayBroker(ticks=ticks)
+        first = broker.get_tick("EURUSD")
+        self.assertEqual(first["bid"], 1.1000)
+        self.assertEqual(first["time_msc"] + 1000, broker.get_tick("EURUSD")["time_msc"])
+        self.assertIsNone(broker.get_tick("EURUSD"))
+        self.assertEqual(len(broker.copy_ticks_from("EURUSD", datetime(2026, 1, 1, 13, 0, 1))), 1)
+
+    def test_live_entry_point_starts_without_heavy_imports(self):
+        result = measure_import_to_first_tick(backend="replay")
+        self.assertEqual(result["heavy_modules"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import os
+import pickle
+import struct
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from data.tick_engine import TickCandleEngine
+from indicators.indicator_engine import IndicatorEngine
+from risk.risk_engine import RiskEngine
+from runtime.symbol_pipeline import SymbolPipeline
+from strategy.strategy_engine import StrategyEngine
+from utils.checkpoint import CheckpointWriter, save_checkpoint, load_checkpoint
+
+
+def make_ticks(n):
+    start = datetime(2026, 1, 5, 13, 0)
+    ticks = []
+    for i in range(n):
+        mid = 1.1000 + 0.00002 * (i % 50) + 0.000001 * i
+        ticks.append({"bid": mid, "ask": mid + 0.00003, "timestamp": start + timedelta(milliseconds=200 * i)})
+    return ticks
+
+
+class Pipeline:
+    def __init__(self):
+        self.tick_engine = TickCandleEngine(70)
+        self.ind_engine = IndicatorEngine()
+        self.strategy = StrategyEngine(RiskEngine())
+        self.outputs = []
+
+    def run(self, ticks):
+        for tick in ticks:
+            candle = self.tick_engine.process_tick(tick)
+            if candle:
+                indicators = self.ind_engine.update(candle)
+                self.strategy.process_candle(candle, indicators)
+                self.outputs.append((candle["index"], indicators, self.strategy.state))
+
+    def snapshot(self):
+        return {
+            "tick_engine": self.tick_engine.get_state(),
+            "indicators": self.ind_engine.get_state(),
+            "strategy": self.strategy.get_state(),
+        }
+
+    def restore(self, state):
+        self.tick_engine.load_state(state["tick_engine"])
+        self.ind_engine.load_state(state["indicators"])
+        self.strategy.load_state(state["strategy"])
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "checkpoint.bin")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_restored_pipeline_matches_uninterrupted_run(self):
+        ticks = make_ticks(5000)
+        reference = Pipeline()
+        reference.run(ticks)
+
+        first = Pipeline()
+        first.run(ticks[:2345])  # mid-candle
+        save_checkpoint(self.path, first.snapshot())
+
+        state, age = load_checkpoint(self.path, max_age_seconds=60)
+        self.assertIsNotNone(state)
+        resumed = Pipeline()
+        resumed.restore(state)
+        resumed.run(ticks[2345:])
+
+        self.assertEqual(first.outputs + resumed.outputs, reference.outputs)
+        self.assertEqual(resumed.strategy.get_state(), reference.strategy.get_state())
+
+    def test_writer_thread_saves_the_state_as_submitted(self):
+        pipeline = Pipeline()
+        pipeline.run(make_ticks(1500))
+        state = pipeline.snapshot()
+        expected = pickle.loads(pickle.dumps(state))
+
+        writer = CheckpointWriter(self.path)
+        writer.submit(state)
+        # The trading thread moves on while the writer serialises
+        pipeline.run(make_ticks(3000)[1500:])
+        writer.close()
+
+        self.assertGreaterEqual(writer.written, 1)
+        saved, _ = load_checkpoint(self.path)
+        self.assertEqual(saved, expected)
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+        with self.assertRaises(RuntimeError):
+            writer.submit(state)
+
+    def test_snapshots_are_detached_from_live_state(self):
+        strategy = StrategyEngine(RiskEngine())
+        strategy.current_setup = {"direction": "BUY", "impulse": {"direction": "BUY"}, "impulse_end_index": 4,
+                                  "pb_candles": [{"high": 1.1, "low": 1.09}]}
+        strategy.state = "WAITING_PULLBACK"
+        state = strategy.get_state()
+        strategy.current_setup["pb_candles"].append({"high": 1.2, "low": 1.19})
+        strategy.current_setup["trigger_price"] = 1.2
+        self.assertEqual(state["current_setup"]["pb_candles"], [{"high": 1.1, "low": 1.09}])
+        self.assertNotIn("trigger_price", state["current_setup"])
+
+        pipeline = SymbolPipeline("EURUSD", RiskEngine(), tick_count=70, timeframes=["140t"])
+        ticks = [dict(t, spread=0.00003, time_msc=i) for i, t in enumerate(make_ticks(700))]
+        for tick in ticks[:300]:
+            pipeline.on_tick(tick)
+        state = pipeline.get_state()
+        expected = pickle.loads(pickle.dumps(state))
+        for tick in ticks[300:]:
+            pipeline.on_tick(tick)
+        self.assertEqual(state, expected)
+
+    def test_stale_and_foreign_snapshots_are_rejected(self):
+        save_checkpoint(self.path, {"x": 1}, now=1000.0)
+        state, reason = load_checkpoint(self.path, max_age_seconds=60, now=2000.0)
+        self.assertIsNone(state)
+        self.assertIn("stale", reason)
+
+        with open(self.path, "r+b") as f:
+            f.seek(8)
+            f.write(struct.pack("<H", 99))
+        state, reason = load_checkpoint(self.path)
+        self.assertIsNone(state)
+        self.assertIn("version", reason)
+
+    def test_mismatched_configuration_is_rejected(self):
+        with self.assertRaises(ValueError):
+            TickCandleEngine(140).load_state(TickCandleEngine(70).get_state())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import time
+from data.connection_monitor import ConnectionMonitor
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FlakyAdapter:
+    def __init__(self, fail_times=0):
+        self.connected = True
+        self.fail_times = fail_times
+        self.connect_calls = 0
+
+    def connect(self, **kwargs):
+        self.connect_calls += 1
+        if self.connect_calls <= self.fail_times:
+            return False
+        self.connected = True
+        return True
+
+
+def wait_for_probe(monitor):
+    if monitor._probe_thread is not None:
+        monitor._probe_thread.join(timeout=1)
+
+
+class TestConnectionMonitor(unittest.TestCase):
+    def test_detects_disconnect_and_recovers(self):
+        clock = FakeClock()
+        adapter = FlakyAdapter()
+        monitor = ConnectionMonitor(adapter, clock=clock, rng=lambda: 0.5)
+        recovered = []
+        monitor.add_reconnect_listener(recovered.append)
+
+        self.assertTrue(monitor.poll())
+        adapter.connected = False
+        self.assertFalse(monitor.poll())
+        self.assertEqual(monitor.state, ConnectionMonitor.BACKOFF)
+
+        clock.now = 0.5
+        self.assertFalse(monitor.poll())  # starts probe immediately
+        wait_for_probe(monitor)
+        clock.now = 0.75
+        self.assertTrue(monitor.poll())
+        self.assertEqual(monitor.state, ConnectionMonitor.CONNECTED)
+        self.assertEqual(recovered, [0.75])
+        self.assertEqual(monitor.stats()["outages"], 1)
+
+    def test_backoff_grows_and_is_capped(self):
+        clock = FakeClock()
+        adapter = FlakyAdapter(fail_times=10)
+        monitor = ConnectionMonitor(adapter, clock=clock, base_delay=1.0, max_delay=4.0, jitter=0.0)
+        monitor.report_failure("test")
+        self.assertFalse(adapter.connected)
+
+        delays = []
+        for _ in range(5):
+            clock.now = monitor.next_probe_at
+            monitor.poll()
+            wait_for_probe(monitor)
+            monitor.poll()
+            delays.append(monitor.next_probe_at - clock.now)
+        self.assertEqual(delays, [1.0, 2.0, 4.0, 4.0, 4.0])
+
+    def test_poll_does_not_block(self):
+        class SlowAdapter(FlakyAdapter):
+            def connect(self, **kwargs):
+                time.sleep(0.2)
+                return super().connect(**kwargs)
+
+        adapter = SlowAdapter()
+        monitor = ConnectionMonitor(adapter)
+        monitor.report_failure("test")
+        start = time.monotonic()
+        monitor.poll()
+        monitor.poll()
+        self.assertLess(time.monotonic() - start, 0.1)
+        self.assertEqual(monitor.state, ConnectionMonitor.PROBING)
+        wait_for_probe(monitor)
+        self.assertTrue(monitor.poll())
+
+
+if __name__ == "__main__":
+    unittest.main()
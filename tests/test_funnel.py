@@ -0,0 +1,81 @@
+import contextlib
+import io
+import logging
+import os
+import tempfile
+import unittest
+from datetime import datetime
+import numpy as np
+from backtest.generate_test_data import generate_ticks, to_ticks
+from backtest.replay_engine import ReplayEngine
+from strategy.funnel import FunnelRecorder, funnel_summary, load_funnel
+from strategy.impulse import ImpulseDetector
+
+
+def candle(open_, close, high=None, low=None):
+    return {"open": open_, "close": close, "high": high or max(open_, close), "low": low or min(open_, close)}
+
+
+class TestFunnel(unittest.TestCase):
+    def test_impulse_reports_furthest_rejection(self):
+        detector = ImpulseDetector()
+        # Big move, but every candle overlaps the previous one heavily
+        legs = [candle(1.1000 + i * 0.0003, 1.1006 + i * 0.0003, high=1.1012 + i * 0.0003, low=1.0995 + i * 0.0003)
+                for i in range(6)]
+        self.assertIsNone(detector.detect(legs))
+        self.assertEqual(detector.reason, "overlap")
+        n, size, dominance, overlap = detector.values
+        self.assertGreater(overlap, detector.max_overlap)
+
+        self.assertIsNone(detector.detect(legs[:3]))
+        self.assertEqual((detector.reason, detector.values), ("too_few_candles", (3,)))
+
+    def test_recorder_columns(self):
+        funnel = FunnelRecorder()
+        funnel.record("trend", "ema_slope", 7, datetime(2026, 1, 5, 8, 0, 0, 250000), "SEARCHING", "BUY", 0.4, 0.2)
+        funnel.record("pullback", "passed", 9, None, "WAITING_PULLBACK", "SELL", 3, 0.4, 1.5, 0.5)
+        arrays = funnel.to_arrays()
+        self.assertEqual(arrays["candle"].tolist(), [7, 9])
+        self.assertEqual(arrays["time_msc"].tolist(), [1767600000250, -1])
+        self.assertEqual(arrays["direction"].tolist(), [1, -1])
+        self.assertTrue(np.isnan(arrays["v2"][0]))
+        self.assertEqual(funnel_summary(arrays), [("trend", "ema_slope", 1), ("pullback", "passed", 1)])
+
+    def test_replay_records_every_decision(self):
+        engine = ReplayEngine(funnel=True)
+        logging.disable(logging.CRITICAL)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                engine.run(to_ticks(generate_ticks(200000, seed=7)))
+        finally:
+            logging.disable(logging.NOTSET)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "funnel.npz")
+            engine.funnel.save(path)
+            arrays = load_funnel(path)
+
+        checks, reasons = arrays["checks"].tolist(), arrays["reasons"].tolist()
+        check, reason = arrays["check"], arrays["reason"]
+        passed = reason == 0
+
+        def count(name, ok=True):
+            return int(np.sum((check == checks.index(name)) & (passed == ok)))
+
+        self.assertEqual(count("impulse"), engine.stats["impulses_detected"])
+        self.assertEqual(count("pullback"), engine.stats["pullbacks_qualified"])
+        self.assertEqual(count("structure", ok=False), engine.stats["structure_invalidations"])
+        self.assertEqual(count("volatility") + count("volatility", ok=False) + count("spread", ok=False),
+                         engine.stats["candles_formed"])
+
+        # Measured values line up with the thresholds that rejected them
+        overlap = (check == checks.index("impulse")) & (reason == reasons.index("overlap"))
+        self.assertTrue(overlap.any())
+        self.assertTrue(np.all(arrays["v3"][overlap] > 0.3))
+        depth = (check == checks.index("pullback")) & (reason == reasons.index("depth"))
+        self.assertTrue(np.all((arrays["v1"][depth] < 0.2) | (arrays["v1"][depth] > 0.65)))
+        self.assertTrue(np.all(np.diff(arrays["candle"]) >= 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
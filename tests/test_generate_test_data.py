@@ -0,0 +1,56 @@
+import contextlib
+import io
+import logging
+import os
+import tempfile
+import unittest
+import numpy as np
+from backtest.generate_test_data import generate_ticks, to_ticks, write_csv
+from backtest.replay_engine import ReplayEngine
+from data.data_loader import DataLoader
+
+
+class TestGenerateTestData(unittest.TestCase):
+    def test_seeded_output_is_reproducible(self):
+        a = generate_ticks(20000, seed=3)
+        b = generate_ticks(20000, seed=3)
+        for key in a:
+            np.testing.assert_array_equal(a[key], b[key])
+        self.assertFalse(np.array_equal(a["bid"], generate_ticks(20000, seed=4)["bid"]))
+
+    def test_quotes_and_timing(self):
+        arrays = generate_ticks(300000, seed=1)
+        self.assertTrue(np.all(np.diff(arrays["time_msc"]) >= 0))
+        self.assertTrue(np.all(arrays["ask"] > arrays["bid"]))
+
+        days = arrays["time_msc"] // 86_400_000
+        self.assertTrue(np.all((days + 3) % 7 < 5), "ticks generated on a weekend")
+
+        # London hours are much busier than Asia
+        hours = (arrays["time_msc"] // 3_600_000) % 24
+        self.assertGreater(np.sum(hours == 9), 3 * np.sum(hours == 2))
+
+    def test_csv_round_trip(self):
+        arrays = generate_ticks(500, seed=2)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "ticks.csv")
+            write_csv(arrays, path)
+            ticks = DataLoader.load_from_csv(path)
+        self.assertEqual(len(ticks), 500)
+        self.assertAlmostEqual(ticks[10]["bid"], arrays["bid"][10])
+        self.assertEqual(ticks[10]["timestamp"], to_ticks(arrays)[10]["timestamp"])
+
+    def test_replay_finds_impulses(self):
+        engine = ReplayEngine()
+        logging.disable(logging.CRITICAL)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                engine.run(to_ticks(generate_ticks(200000, seed=7)))
+        finally:
+            logging.disable(logging.NOTSET)
+        self.assertGreater(engine.stats["impulses_detected"], 20)
+        self.assertGreater(engine.stats["pullbacks_qualified"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
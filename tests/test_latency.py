@@ -0,0 +1,118 @@
+import json
+import os
+import random
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+from backtest.mock_adapter import MockMT5Adapter
+from risk.risk_engine import RiskEngine
+from runtime.symbol_pipeline import SymbolPipeline
+from utils.latency import N_BUCKETS, LatencyHistogram, LatencyRecorder, _bucket, _bucket_high
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_buckets_are_contiguous(self):
+        previous = -1
+        for index in range(N_BUCKETS - 1):
+            high = _bucket_high(index)
+            self.assertEqual(_bucket(previous + 1), index)
+            self.assertEqual(_bucket(high), index)
+            previous = high
+
+    def test_percentiles_within_bucket_error(self):
+        rng = random.Random(5)
+        values = [int(rng.lognormvariate(9, 1.2)) for _ in range(20000)]
+        hist = LatencyHistogram()
+        for v in values:
+            hist.record(v)
+        values.sort()
+        for p in (50, 90, 99):
+            exact = values[int(len(values) * p / 100) - 1]
+            self.assertLessEqual(abs(hist.percentile(p) - exact), exact * 0.07)
+        self.assertEqual(hist.percentile(100), values[-1])
+        self.assertEqual(hist.snapshot()["count"], 20000)
+
+    def test_state_round_trip_and_merge(self):
+        a, b = LatencyHistogram(), LatencyHistogram()
+        for v in range(1, 1000):
+            a.record(v)
+            b.record(v * 1000)
+        merged = LatencyHistogram.from_state(json.loads(json.dumps(a.get_state())))
+        merged.merge(b)
+        self.assertEqual(merged.count, 1998)
+        self.assertEqual(merged.max, 999000)
+        # The median is a's largest value, reported to bucket precision
+        self.assertTrue(a.max <= merged.percentile(50) <= a.max * 1.07)
+
+
+class TestLatencyRecorder(unittest.TestCase):
+    def test_disabled_recorder_records_nothing(self):
+        recorder = LatencyRecorder()
+        broker = MockMT5Adapter()
+        recorder.instrument(broker)
+        self.assertEqual(recorder.start(), 0)
+        pipeline = SymbolPipeline("EURUSD", RiskEngine(), latency=recorder)
+        pipeline.on_tick({"bid": 1.1, "ask": 1.10002, "spread": 0.00002, "time_msc": 1, "timestamp": datetime(2026, 1, 5, 9)})
+        broker.get_positions()
+        self.assertEqual(recorder.stages, {})
+
+    def test_pipeline_stages_and_broker_calls(self):
+        recorder = LatencyRecorder(enabled=True)
+        broker = MockMT5Adapter()
+        recorder.instrument(broker)
+        pipeline = SymbolPipeline("EURUSD", RiskEngine(), tick_count=10, latency=recorder)
+        for i in range(25):
+            pipeline.on_tick({"bid": 1.1 + i * 1e-5, "ask": 1.10002 + i * 1e-5, "spread": 0.00002, "time_msc": i,
+                              "timestamp": datetime(2026, 1, 5, 9, 0, i)})
+        broker.get_positions()
+
+        snapshot = recorder.snapshot()
+        self.assertEqual(snapshot["spread_gate"]["count"], 25)
+        self.assertEqual(snapshot["candle_build"]["count"], 25)
+        self.assertEqual(snapshot["indicators"]["count"], 2)
+        self.assertEqual(snapshot["broker.get_positions"]["count"], 1)
+        self.assertLessEqual(snapshot["candle_build"]["p50_us"], snapshot["candle_build"]["max_us"])
+
+    def test_worker_merge_rollover_and_dump(self):
+        worker, supervisor = LatencyRecorder(enabled=True), LatencyRecorder(enabled=True)
+        for ns in (1000, 2000, 3000):
+            worker.record("candle_build", ns)
+        supervisor.merge_state(worker.get_state())
+        supervisor.rollover()
+        supervisor.merge_state(worker.get_state())
+        self.assertEqual(supervisor.snapshot()["candle_build"]["count"], 3)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            supervisor.dump_path = os.path.join(tmp, "latency.json")
+            supervisor.dump()
+            with open(supervisor.dump_path) as f:
+                dumped = json.load(f)
+        self.assertEqual(dumped["candle_build"]["count"], 6)
+        self.assertEqual(dumped["candle_build"]["max_us"], 3.0)
+        self.assertEqual(supervisor.stages, {})
+
+    def test_export_during_rollover_counts_the_interval_once(self):
+        recorder = LatencyRecorder(enabled=True)
+        seen, exporters = [], []
+
+        class ExportMidMerge(LatencyHistogram):
+            def merge(self, other):
+                super().merge(other)
+                # An export on another thread lands while the interval is still attached
+                exporter = threading.Thread(target=lambda: seen.append(recorder.totals()["tick"].count))
+                exporter.start()
+                exporter.join(timeout=0.2)
+                exporters.append(exporter)
+
+        recorder.session["tick"] = ExportMidMerge()
+        for _ in range(5):
+            recorder.record("tick", 1000)
+        recorder.rollover()
+        for exporter in exporters:
+            exporter.join()
+        self.assertEqual(seen, [5])
+
+
+if __name__ == "__main__":
+    unittest.main()
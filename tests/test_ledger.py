@@ -0,0 +1,133 @@
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from backtest.mock_adapter import MockMT5Adapter
+from execution.execution_engine import ExecutionEngine
+from execution.ledger import TradeLedger, session_key
+from risk.risk_engine import RiskEngine
+
+
+class TestTradeLedger(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "ledger.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _open_session(self, broker):
+        ledger = TradeLedger(self.path)
+        risk = RiskEngine()
+        risk.ledger = ledger
+        engine = ExecutionEngine(broker, ledger=ledger)
+        return ledger, risk, engine
+
+    def test_restart_restores_trades_and_risk_state(self):
+        broker = MockMT5Adapter()
+        broker.set_tick({"bid": 1.1000, "ask": 1.1001})
+        ledger, risk, engine = self._open_session(broker)
+
+        keep = engine.execute_signal({"direction": "BUY", "entry_price": 1.1001, "sl": 1.0990, "tp": 1.1015}, "EURUSD", risk_engine=risk)
+        risk.register_new_trade()
+        gone = engine.execute_signal({"direction": "SELL", "entry_price": 1.1000, "sl": 1.1010, "tp": 1.0985}, "EURUSD", risk_engine=risk)
+        risk.register_new_trade()
+        engine.manage_trades("EURUSD", risk, tick={"bid": 1.1016, "ask": 1.1017})  # TP touch on the BUY
+        ledger.flush()
+        ledger.close()
+
+        # While the bot is down: one position closes, one foreign position of ours appears
+        broker.close_position(gone)
+        adopted = broker.place_market_order("EURUSD", "BUY", 0.1, 1.0980, 1.1030)
+
+        ledger, risk, engine = self._open_session(broker)
+        trades, risk_state = ledger.load()
+        self.assertTrue(risk.restore(risk_state, session_key()))
+        self.assertEqual(risk.trades_this_session, 2)
+
+        summary = engine.reconcile(trades, risk)
+        self.assertEqual(summary, {"restored": 1, "closed_offline": 1, "adopted": 1})
+        self.assertTrue(engine.active_trades[keep].tp_touched)
+        self.assertIn(adopted, engine.active_trades)
+        self.assertEqual(risk.consecutive_losses, 1)
+        ledger.flush()
+
+        trades, risk_state = ledger.load()
+        self.assertEqual(sorted(t.ticket for t in trades), sorted([keep, adopted]))
+        self.assertEqual(risk_state["consecutive_losses"], 1)
+        ledger.close()
+
+    def test_restart_keeps_the_time_stop_deadline(self):
+        broker = MockMT5Adapter()
+        broker.set_tick({"bid": 1.1000, "ask": 1.1001})
+        ledger, risk, engine = self._open_session(broker)
+        ticket = engine.execute_signal({"direction": "BUY", "entry_price": 1.1001, "sl": 1.0990, "tp": 1.1015}, "EURUSD", risk_engine=risk)
+        for _ in range(20):
+            engine.update_candles_count("EURUSD")
+        ledger.flush()
+        ledger.close()
+
+        # A fresh process has its own candle counter
+        ledger, risk, engine = self._open_session(broker)
+        engine.update_candles_count("EURUSD")
+        trades, _ = ledger.load()
+        engine.reconcile(trades, risk)
+        self.assertEqual(engine.candles_held(ticket), 20)
+        for _ in range(10):
+            engine.update_candles_count("EURUSD")
+        engine.manage_trades("EURUSD", risk, tick={"bid": 1.1002, "ask": 1.1003})
+        self.assertNotIn(ticket, engine.active_trades)
+        self.assertFalse(broker.position_exists(ticket))
+        ledger.close()
+
+    def test_fill_latency_and_slippage_are_recorded(self):
+        broker = MockMT5Adapter()
+        ledger, risk, engine = self._open_session(broker)
+        received = time.monotonic_ns()
+        # The market moved half a pip past each trigger before the order went out
+        broker.set_tick({"bid": 1.10005, "ask": 1.10015, "time_msc": 1000})
+        buy = engine.execute_signal({"direction": "BUY", "entry_price": 1.1001, "sl": 1.0990, "tp": 1.1015,
+                                     "tick_msc": 990, "recv_ns": received}, "EURUSD", risk_engine=risk)
+        sell = engine.execute_signal({"direction": "SELL", "entry_price": 1.1001, "sl": 1.1010, "tp": 1.0985},
+                                     "EURUSD", risk_engine=risk)
+
+        trade = engine.active_trades[buy]
+        self.assertEqual((trade.tick_msc, trade.fill_msc, trade.fill_price), (990, 1000, 1.10015))
+        self.assertAlmostEqual(trade.slippage_pips, 0.5)
+        self.assertGreaterEqual(trade.signal_latency_ms, 0.0)
+        self.assertAlmostEqual(engine.active_trades[sell].slippage_pips, 0.5)
+        self.assertIsNone(engine.active_trades[sell].signal_latency_ms)
+
+        ledger.flush()
+        summary = ledger.fill_summary()
+        self.assertEqual(summary["slippage_pips"]["count"], 2)
+        self.assertAlmostEqual(summary["slippage_pips"]["p99"], 0.5)
+        self.assertEqual(summary["signal_latency_ms"]["count"], 1)
+        self.assertEqual(summary["round_trip_ms"]["count"], 2)
+        self.assertEqual(engine.fill_summary().keys(), summary.keys())
+        ledger.close()
+
+    def test_old_ledger_is_migrated(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("CREATE TABLE trades (ticket INTEGER PRIMARY KEY, symbol TEXT NOT NULL, direction TEXT NOT NULL, "
+                     "entry_price REAL, sl REAL, tp REAL, opened_candle INTEGER, be_moved INTEGER, tp_touched INTEGER, "
+                     "result_registered INTEGER, exit_reason TEXT, status TEXT NOT NULL, updated_at REAL)")
+        conn.execute("INSERT INTO trades VALUES (7, 'EURUSD', 'BUY', 1.1, 1.09, 1.12, 0, 0, 0, 0, NULL, 'OPEN', 0)")
+        conn.commit()
+        conn.close()
+
+        ledger = TradeLedger(self.path)
+        trades, _ = ledger.load()
+        self.assertEqual([(t.ticket, t.fill_price) for t in trades], [(7, None)])
+        self.assertEqual(ledger.fill_summary(), {})
+        ledger.close()
+
+    def test_risk_state_from_other_session_is_ignored(self):
+        risk = RiskEngine()
+        self.assertFalse(risk.restore({"session_date": "2000-01-01", "trades_this_session": 4}, session_key()))
+        self.assertEqual(risk.trades_this_session, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
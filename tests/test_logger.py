@@ -0,0 +1,98 @@
+import io
+import json
+import logging
+import threading
+import unittest
+from utils.logger import JsonFormatter, LazyQueueHandler, RateLimitFilter, start_queue_logging
+
+
+def make_record(level=logging.INFO, lineno=10, msg="Spread %.1f pips", args=(1.25,), module="trend", **extra):
+    record = logging.LogRecord("root", level, f"/bot/strategy/{module}.py", lineno, msg, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLogger(unittest.TestCase):
+    def setUp(self):
+        root = logging.getLogger()
+        self.saved = (list(root.handlers), root.level)
+
+    def tearDown(self):
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        for handler in self.saved[0]:
+            root.addHandler(handler)
+        root.setLevel(self.saved[1])
+
+    def test_json_formatter(self):
+        event = json.loads(JsonFormatter().format(make_record(symbol="EURUSD", suppressed=3)))
+        self.assertEqual(event["level"], "INFO")
+        self.assertEqual(event["site"], "trend:10")
+        self.assertEqual(event["msg"], "Spread 1.2 pips")
+        self.assertEqual(event["args"], [1.25])
+        self.assertEqual(event["symbol"], "EURUSD")
+        self.assertEqual(event["suppressed"], 3)
+
+    def test_rate_limit_per_site(self):
+        clock = FakeClock()
+        limit = RateLimitFilter(rate=2, burst=3, clock=clock)
+        passed = [limit.filter(make_record()) for _ in range(10)]
+        self.assertEqual(passed.count(True), 3)
+        # Other call sites and warnings are not affected
+        self.assertTrue(limit.filter(make_record(lineno=11)))
+        self.assertTrue(limit.filter(make_record(level=logging.WARNING)))
+
+        clock.now = 1.0  # two tokens back
+        record = make_record()
+        self.assertTrue(limit.filter(record))
+        self.assertEqual(record.suppressed, 7)
+        self.assertTrue(limit.filter(make_record()))
+        self.assertFalse(limit.filter(make_record()))
+
+    def test_sampling_per_module(self):
+        draws = iter([0.05, 0.5, 0.05, 0.5])
+        limit = RateLimitFilter(rate=100, burst=100, sample={"trend": 0.1}, rng=lambda: next(draws))
+        passed = [limit.filter(make_record()) for _ in range(4)]
+        self.assertEqual(passed, [True, False, True, False])
+        self.assertTrue(limit.filter(make_record(module="pullback")))
+
+    def test_queue_logging_formats_on_listener_thread(self):
+        stream = io.StringIO()
+        threads = []
+
+        class Capture(logging.StreamHandler):
+            def emit(self, record):
+                threads.append(threading.current_thread())
+                super().emit(record)
+
+        handler = Capture(stream)
+        handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+        listener = start_queue_logging(logging.INFO, [handler], RateLimitFilter(rate=0, burst=2))
+        queued = next(h for h in logging.getLogger().handlers if isinstance(h, LazyQueueHandler))
+        record = make_record()
+        self.assertIs(queued.prepare(record), record)
+        self.assertIsNone(getattr(record, "message", None))
+
+        for i in range(5):
+            logging.info("Tick %d", i)
+        logging.debug("hidden")
+        logging.error("Order rejected %s", 10019)
+        listener.stop()
+
+        self.assertEqual(stream.getvalue().splitlines(), ["INFO Tick 0", "INFO Tick 1", "ERROR Order rejected 10019"])
+        self.assertTrue(threads)
+        self.assertNotIn(threading.current_thread(), threads)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+import urllib.request
+from datetime import datetime, timedelta
+from backtest.mock_adapter import MockMT5Adapter
+from execution.execution_engine import ExecutionEngine
+from risk.risk_engine import RiskEngine
+from runtime.symbol_pipeline import SymbolPipeline
+from utils.metrics import MetricsExporter, MetricsRegistry
+
+
+class RejectingBroker(MockMT5Adapter):
+    def place_market_order(self, symbol, direction, volume, sl, tp, comment=""):
+        self.last_retcode = 10019  # no money
+        return -1
+
+
+class TestMetrics(unittest.TestCase):
+    def test_render_text_format(self):
+        registry = MetricsRegistry()
+        registry.counter("volman_ticks_total", "Ticks ingested", symbol="EURUSD").inc(3)
+        registry.gauge("volman_spread_gate_pips", "Gate", symbol='odd"name').set(None)
+        registry.gauge("volman_open_trades").set(2)
+        self.assertIs(registry.counter("volman_ticks_total", symbol="EURUSD").value, 3)
+        with self.assertRaises(ValueError):
+            registry.gauge("volman_ticks_total")
+
+        text = registry.render()
+        self.assertIn("# HELP volman_ticks_total Ticks ingested\n# TYPE volman_ticks_total counter\n"
+                      'volman_ticks_total{symbol="EURUSD"} 3\n', text)
+        self.assertIn('volman_spread_gate_pips{symbol="odd\\"name"} NaN\n', text)
+        self.assertIn("volman_open_trades 2\n", text)
+
+        copy = MetricsRegistry()
+        copy.load_samples(registry.samples())
+        self.assertEqual(copy.render(), text)
+
+    def test_pipeline_and_execution_metrics(self):
+        registry = MetricsRegistry()
+        pipeline = SymbolPipeline("EURUSD", RiskEngine(), tick_count=10, metrics=registry)
+        start = datetime(2026, 1, 5, 9)
+        for i in range(30):
+            tick = {"bid": 1.1 + i * 1e-5, "ask": 1.10002 + i * 1e-5, "spread": 0.00002, "time_msc": i,
+                    "timestamp": start + timedelta(seconds=i)}
+            pipeline.is_duplicate(tick)
+            pipeline.is_duplicate(tick)
+            pipeline.on_tick(tick)
+        pipeline.strategy_engine.state = "WAITING_PULLBACK"
+        registry.on_collect(pipeline.update_metrics)
+
+        engine = ExecutionEngine(RejectingBroker(), metrics=registry)
+        engine.execute_signal({"direction": "BUY", "entry_price": 1.1, "sl": 1.09, "tp": 1.12}, "EURUSD")
+
+        text = registry.render()
+        self.assertIn('volman_ticks_total{symbol="EURUSD"} 30\n', text)
+        self.assertIn('volman_duplicate_ticks_total{symbol="EURUSD"} 30\n', text)
+        self.assertIn('volman_candles_total{symbol="EURUSD"} 3\n', text)
+        self.assertIn('volman_strategy_state{state="WAITING_PULLBACK",symbol="EURUSD"} 1\n', text)
+        self.assertIn('volman_strategy_state{state="SEARCHING",symbol="EURUSD"} 0\n', text)
+        self.assertIn('volman_orders_total{direction="BUY",symbol="EURUSD"} 1\n', text)
+        self.assertIn('volman_orders_rejected_total{retcode="10019",symbol="EURUSD"} 1\n', text)
+
+    def test_textfile_and_http_export(self):
+        registry = MetricsRegistry()
+        registry.counter("volman_signals_total", symbol="EURUSD").inc()
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "metrics.prom")
+            writers = []
+            registry.on_collect(lambda: writers.append(threading.current_thread().name))
+            exporter = MetricsExporter(registry, textfile=path, interval_s=60, http_port=port).start()
+            try:
+                # The first write happens on the exporter's thread right away
+                deadline = time.monotonic() + 5
+                while not os.path.exists(path) and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                self.assertEqual(writers, ["metrics-textfile"])
+                registry.counter("volman_signals_total", symbol="EURUSD").inc()  # within the interval: not rewritten
+                with open(path) as f:
+                    self.assertIn('volman_signals_total{symbol="EURUSD"} 1\n', f.read())
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+                    self.assertIn('volman_signals_total{symbol="EURUSD"} 2\n', response.read().decode())
+            finally:
+                exporter.stop()
+            with open(path) as f:
+                self.assertIn('volman_signals_total{symbol="EURUSD"} 2\n', f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
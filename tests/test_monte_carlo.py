@@ -0,0 +1,80 @@
+import unittest
+import numpy as np
+from backtest.monte_carlo import apply_risk_limits, simulate
+from risk.risk_engine import RiskEngine
+
+
+def reference_session(candidates, risk_engine):
+    """The same session played trade by trade through a real RiskEngine."""
+    risk_engine.reset_session()
+    taken = []
+    for x in candidates:
+        if np.isnan(x) or not risk_engine.can_trade():
+            taken.append(0.0)
+            continue
+        risk_engine.register_new_trade()
+        risk_engine.register_trade_result(win=x > 0)
+        taken.append(x)
+    return taken
+
+
+class TestMonteCarlo(unittest.TestCase):
+    def test_risk_limits_match_risk_engine(self):
+        rng = np.random.default_rng(2)
+        candidates = rng.choice([9.0, -6.5, 0.0, np.nan], size=(200, 3, 8), p=[0.4, 0.4, 0.1, 0.1])
+        taken, count, halted = apply_risk_limits(candidates, 5, 3)
+        risk_engine = RiskEngine(max_trades_session=5, max_consecutive_losses=3)
+        for path in range(200):
+            for session in range(3):
+                expected = reference_session(candidates[path, session], risk_engine)
+                np.testing.assert_array_equal(taken[path, session], expected)
+                self.assertEqual(count[path, session], risk_engine.trades_this_session)
+                self.assertEqual(halted[path, session], risk_engine.consecutive_losses >= 3)
+
+    def test_shuffle_keeps_every_result(self):
+        profits = np.random.default_rng(5).normal(0.5, 6.0, 97).round(1)
+        loose = RiskEngine(max_trades_session=10, max_consecutive_losses=100)
+        report = simulate(profits, method="shuffle", paths=2000, session_size=10, risk_engine=loose, seed=1)
+        np.testing.assert_allclose(report.net, profits.sum())
+        self.assertTrue(np.all(report.trades == 97))
+        self.assertGreater(np.ptp(report.max_drawdown), 0)
+
+        # Under the default limits the cap and losing streaks cut sessions, so paths differ in outcome
+        capped = simulate(profits, method="shuffle", paths=2000, session_size=10, seed=1)
+        self.assertTrue(np.all(capped.trades <= 97))
+        self.assertLess(capped.trades.mean(), 97)
+        self.assertGreater(np.ptp(capped.net), 0)
+
+    def test_session_size_follows_the_source_and_the_cap_binds(self):
+        profits = [2.0] * 12
+        sessions = ["d1"] * 7 + ["d2"] * 5
+        for method in ("bootstrap", "shuffle"):
+            report = simulate(profits, sessions, method=method, paths=500, seed=4)
+            # Six setups per session on average, of which the 5-trade cap takes five
+            self.assertEqual(report.sessions, 2)
+            self.assertTrue(np.all(report.trades == 10))
+            np.testing.assert_allclose(report.net, 20.0)
+        with self.assertRaises(ValueError):
+            simulate(profits, method="bootstrap")
+
+    def test_sessions_and_ruin(self):
+        profits = [-10.0, -10.0, -10.0, 8.0, 4.0, 3.0]
+        sessions = ["d1", "d1", "d1", "d1", "d2", "d2"]
+        report = simulate(profits, sessions, method="sessions", paths=5000, n_sessions=1, seed=3)
+        # A "d1" session halts after three losses and never reaches the win
+        self.assertEqual(set(report.net.tolist()), {-30.0, 7.0})
+        share = report.ruin_probability(30)
+        self.assertAlmostEqual(share, 0.5, delta=0.05)
+        self.assertAlmostEqual(report.halted_sessions, share)
+        summary = report.summary()
+        self.assertEqual(summary["max_drawdown"][99], 30.0)
+        self.assertEqual(summary["profit_factor"][99], float("inf"))
+
+        with self.assertRaises(ValueError):
+            simulate(profits, method="sessions")
+        with self.assertRaises(ValueError):
+            simulate(profits, method="permute")
+
+
+if __name__ == '__main__':
+    unittest.main()
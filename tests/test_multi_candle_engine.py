@@ -0,0 +1,81 @@
+import random
+import unittest
+from datetime import datetime, timedelta
+from itertools import groupby
+from data.multi_candle_engine import MultiCandleEngine, parse_series
+from data.tick_engine import TickCandleEngine
+from risk.risk_engine import RiskEngine
+from runtime.symbol_pipeline import SymbolPipeline
+
+
+def make_ticks(n, seed=1):
+    rng = random.Random(seed)
+    price = 1.1
+    t = datetime(2026, 1, 5, 8, 0)
+    ticks = []
+    for i in range(n):
+        price += rng.gauss(0, 0.00005)
+        # Occasional gaps leave whole minutes without ticks
+        t += timedelta(seconds=150) if rng.random() < 0.002 else timedelta(milliseconds=rng.randint(50, 900))
+        ticks.append({"bid": price, "ask": price + 0.00002, "spread": 0.00002, "volume": rng.randint(1, 5),
+                      "time_msc": i, "timestamp": t})
+    return ticks
+
+
+def run(engine, ticks):
+    closed = {}
+    for tick in ticks:
+        for name, candle in engine.process_tick(tick):
+            closed.setdefault(name, []).append(candle)
+    return closed
+
+
+class TestMultiCandleEngine(unittest.TestCase):
+    def test_parse_series(self):
+        self.assertEqual(parse_series("233t"), ("ticks", 233))
+        self.assertEqual(parse_series("500V"), ("volume", 500))
+        self.assertEqual(parse_series("5m"), ("time", timedelta(minutes=5)))
+        with self.assertRaises(ValueError):
+            parse_series("70x")
+
+    def test_series_match_reference_aggregation(self):
+        ticks = make_ticks(30000)
+        closed = run(MultiCandleEngine(["70t", "233t", "1m", "300v"]), ticks)
+
+        single = TickCandleEngine(70)
+        reference = [c for c in (single.process_tick(t) for t in ticks) if c]
+        self.assertEqual([{k: v for k, v in c.items() if k not in ("volume", "series")} for c in closed["70t"]], reference)
+        self.assertEqual(len(closed["233t"]), 30000 // 233)
+
+        minutes = []
+        for _, group in groupby(ticks, key=lambda t: t["timestamp"].replace(second=0, microsecond=0)):
+            mids = [(t["bid"] + t["ask"]) / 2 for t in group]
+            minutes.append((mids[0], max(mids), min(mids), mids[-1], len(mids)))
+        # The last minute is still open
+        self.assertEqual([(c["open"], c["high"], c["low"], c["close"], c["volume_ticks"]) for c in closed["1m"]], minutes[:-1])
+
+        # A volume bar closes on the tick that takes it to 300; ticks carry at most 5
+        self.assertTrue(all(300 <= c["volume"] < 305 for c in closed["300v"]))
+
+    def test_state_round_trip(self):
+        ticks = make_ticks(5000)
+        specs = ["70t", "140t", "1m", "300v"]
+        full = run(MultiCandleEngine(specs), ticks)
+
+        first = MultiCandleEngine(specs)
+        head = run(first, ticks[:2345])
+        resumed = MultiCandleEngine(specs)
+        resumed.load_state(first.get_state())
+        tail = run(resumed, ticks[2345:])
+        self.assertEqual({name: head.get(name, []) + tail.get(name, []) for name in specs}, full)
+
+    def test_pipeline_updates_timeframe_indicators(self):
+        pipeline = SymbolPipeline("EURUSD", RiskEngine(), tick_count=70, timeframes=["140t", "1m"])
+        for tick in make_ticks(3000):
+            pipeline.on_tick(tick, live=False)
+        self.assertEqual(set(pipeline.timeframe_indicators), {"140t", "1m"})
+        self.assertEqual(pipeline.timeframe_ind["140t"].candles[-1]["index"], 3000 // 140 - 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
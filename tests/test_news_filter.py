@@ -0,0 +1,56 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from utils.news_filter import BlackoutIndex, EconomicCalendar, NewsFilter
+
+
+class TestNewsFilter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.calendar = EconomicCalendar()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_overlapping_windows_are_merged(self):
+        t = datetime(2026, 3, 6, 13, 30)
+        index = BlackoutIndex([(t, t + timedelta(minutes=30)), (t + timedelta(minutes=10), t + timedelta(minutes=50)),
+                               (t + timedelta(hours=2), t + timedelta(hours=3))])
+        self.assertEqual(len(index), 2)
+        self.assertTrue(index.is_active(t + timedelta(minutes=45)))
+        self.assertFalse(index.is_active(t + timedelta(minutes=51)))
+        self.assertFalse(index.is_active(t - timedelta(seconds=1)))
+
+    def test_csv_import_filters_by_currency_and_impact(self):
+        path = os.path.join(self.tmp.name, "calendar.csv")
+        with open(path, "w") as f:
+            f.write("time,currency,impact,title\n"
+                    "2026-03-06T13:30:00Z,USD,High,Non-Farm Payrolls\n"
+                    "2026-03-06T10:00:00+01:00,EUR,medium,German Factory Orders\n"
+                    "2026-03-05T00:30:00,AUD,high,Trade Balance\n")
+        self.assertEqual(self.calendar.load_file(path), 3)
+
+        eurusd = NewsFilter(symbol="EURUSD", calendar=self.calendar)
+        self.assertTrue(eurusd.is_news_active(datetime(2026, 3, 6, 13, 40)))
+        self.assertFalse(eurusd.is_news_active(datetime(2026, 3, 6, 9, 0)))  # medium impact
+        self.assertFalse(eurusd.is_news_active(datetime(2026, 3, 5, 0, 30)))  # AUD event
+        self.assertTrue(NewsFilter(symbol="AUDUSD", calendar=self.calendar).is_news_active(datetime(2026, 3, 5, 0, 40)))
+
+    def test_mask_matches_lookups(self):
+        path = os.path.join(self.tmp.name, "calendar.json")
+        with open(path, "w") as f:
+            json.dump([{"time": "2026-03-06T13:30:00", "currency": "USD", "impact": "high"}], f)
+        self.calendar.load_file(path)
+        news = NewsFilter(symbol="EURUSD", calendar=self.calendar)
+        # Untagged events added through the legacy API apply to every symbol
+        news.add_event(datetime(2026, 3, 6, 15, 0))
+
+        times = [datetime(2026, 3, 6, 12, 0) + timedelta(minutes=5 * i) for i in range(48)]
+        self.assertEqual(list(news.mask(times)), [news.is_news_active(t) for t in times])
+        self.assertEqual(int(news.mask(times).sum()), 14)
+
+
+if __name__ == "__main__":
+    unittest.main()
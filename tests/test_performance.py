@@ -0,0 +1,152 @@
+import itertools
+import os
+import random
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+import numpy as np
+from backtest.mock_adapter import MockMT5Adapter
+from backtest.performance import PerformanceAccumulator, PerformanceReport
+from execution.execution_engine import ExecutionEngine
+from execution.ledger import TradeLedger
+from risk.risk_engine import RiskEngine
+
+
+def sample_trades(n, seed=3):
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 5, 7, 0)
+    trades = []
+    for i in range(n):
+        open_time = start + timedelta(minutes=37 * i)
+        trades.append({"profit": round(rng.gauss(0.4, 6.0), 1), "open_time": open_time,
+                       "close_time": open_time + timedelta(minutes=rng.randint(1, 30))})
+    return trades
+
+
+def accumulate(trades, **kwargs):
+    acc = PerformanceAccumulator(**kwargs)
+    for t in trades:
+        acc.add(t["profit"], close_time=t["close_time"], open_time=t["open_time"])
+    return acc
+
+
+class TestPerformanceAccumulator(unittest.TestCase):
+    def test_matches_batch_statistics(self):
+        trades = sample_trades(500)
+        profits = np.array([t["profit"] for t in trades])
+        m = accumulate(trades).snapshot()
+
+        equity = np.cumsum(profits)
+        peak = np.maximum(np.maximum.accumulate(equity), 0)
+        self.assertAlmostEqual(m["max_drawdown"], np.max(peak - equity))
+        self.assertAlmostEqual(m["total_net_profit"], profits.sum())
+        self.assertAlmostEqual(m["avg_loss"], profits[profits <= 0].mean())
+        self.assertAlmostEqual(m["std"], profits.std(ddof=1))
+        self.assertAlmostEqual(m["sharpe"], profits.mean() / profits.std(ddof=1))
+
+        signs = (profits > 0).tolist()
+        runs = [(s, len(list(g))) for s, g in itertools.groupby(signs)]
+        self.assertEqual(m["max_win_streak"], max(n for s, n in runs if s))
+        self.assertEqual(m["max_loss_streak"], max(n for s, n in runs if not s))
+
+        days = {}
+        for t in trades:
+            days[t["close_time"].date()] = days.get(t["close_time"].date(), 0) + t["profit"]
+        daily = np.array(list(days.values()))
+        self.assertEqual(m["sessions"], len(days))
+        self.assertAlmostEqual(m["session_sharpe"], daily.mean() / daily.std(ddof=1))
+        # Trades never overlap here, so time in market is the sum of holds
+        self.assertAlmostEqual(m["time_in_market_s"], m["avg_hold_s"] * 500)
+        overlapping = PerformanceAccumulator()
+        overlapping.add(1.0, close_time=1000.0, open_time=0.0)
+        overlapping.add(-1.0, close_time=1500.0, open_time=600.0)
+        self.assertEqual(overlapping.snapshot()["time_in_market_s"], 1500.0)
+        self.assertEqual(PerformanceReport(trades).calculate_metrics(), m)
+
+    def test_merged_shards_equal_a_single_pass(self):
+        trades = sample_trades(400, seed=11)
+        whole = accumulate(trades).snapshot()
+        for cuts in ((0, 1, 400), (0, 137, 138, 290, 400), (0, 200, 400, 400)):
+            merged = PerformanceAccumulator()
+            for lo, hi in zip(cuts, cuts[1:]):
+                shard = accumulate(trades[lo:hi])
+                merged.merge(PerformanceAccumulator.from_state(shard.get_state()))
+            for key, value in merged.snapshot().items():
+                self.assertAlmostEqual(value, whole[key], msg=key)
+
+    def test_equity_curve_spills_to_disk(self):
+        trades = sample_trades(25)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "curve", "equity.csv")
+            acc = accumulate(trades, equity_path=path, spill_every=10)
+            self.assertEqual(len(acc._curve), 5)
+            acc.flush()
+            with open(path) as f:
+                rows = f.read().splitlines()
+        self.assertEqual(rows[0], "close_time,profit,equity,drawdown")
+        self.assertEqual(len(rows), 26)
+        self.assertAlmostEqual(float(rows[-1].split(",")[2]), acc.equity)
+
+
+class TestLivePerformance(unittest.TestCase):
+    def test_broker_side_close_is_settled_and_persisted(self):
+        mt5 = MockMT5Adapter()
+        acc = PerformanceAccumulator()
+        engine = ExecutionEngine(mt5, performance=acc)
+        risk = RiskEngine()
+        mt5.set_tick({"bid": 1.10000, "ask": 1.10010})
+        ticket = engine.execute_signal({"direction": "BUY", "entry_price": 1.10010, "sl": 1.09910, "tp": 1.10160}, "EURUSD")
+        engine.manage_trades("EURUSD", risk)
+
+        # TP filled at the broker; the next quote is already beyond it
+        del mt5.positions[ticket]
+        mt5.set_tick({"bid": 1.10170, "ask": 1.10180})
+        engine.manage_trades("EURUSD", risk)
+        trade, = engine.closed_trades_history.recent(1)
+        self.assertEqual((trade.exit_reason, trade.exit_price), ("MARKET", 1.10160))
+        self.assertAlmostEqual(trade.profit_pips, 15.0)
+        self.assertEqual(acc.count, 1)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            ledger = TradeLedger(os.path.join(tmp, "ledger.db"))
+            ledger.record_trade(trade, status="CLOSED")
+            ledger.record_performance(acc)
+            ledger.flush()
+            _, risk_state = ledger.load()
+            ledger.close()
+        restored = PerformanceAccumulator.from_state(risk_state["performance"])
+        self.assertEqual(restored.snapshot(), acc.snapshot())
+
+    def test_priced_from_fill_and_closing_deal(self):
+        mt5 = MockMT5Adapter()
+        acc = PerformanceAccumulator()
+        engine = ExecutionEngine(mt5, performance=acc)
+        risk = RiskEngine()
+        # Signal at 1.10010, filled 0.5 pips worse
+        mt5.set_tick({"bid": 1.10005, "ask": 1.10015})
+        ticket = engine.execute_signal({"direction": "BUY", "entry_price": 1.10010, "sl": 1.09910, "tp": 1.10160}, "EURUSD")
+        engine.manage_trades("EURUSD", risk)
+
+        # The broker's SL deal, not the later quote, prices the exit
+        mt5.set_tick({"bid": 1.09900, "ask": 1.09910})
+        mt5.check_sl_tp()
+        mt5.set_tick({"bid": 1.09950, "ask": 1.09960})
+        engine.manage_trades("EURUSD", risk)
+        trade, = engine.closed_trades_history.recent(1)
+        self.assertEqual(trade.exit_price, 1.09910)
+        self.assertAlmostEqual(trade.profit_pips, -10.5)
+        self.assertAlmostEqual(acc.snapshot()["total_net_profit"], -10.5)
+
+    def test_deal_history_is_bounded(self):
+        mt5 = MockMT5Adapter(deal_history=2)
+        mt5.set_tick({"bid": 1.10000, "ask": 1.10010})
+        tickets = [mt5.place_market_order("EURUSD", "BUY", 0.1, 1.09900, 1.10100) for _ in range(3)]
+        for ticket in tickets:
+            mt5.close_position(ticket)
+        self.assertEqual(list(mt5.close_deals), tickets[1:])
+        self.assertIsNone(mt5.get_close_deal(tickets[0]))
+        self.assertEqual(mt5.get_close_deal(tickets[2])["price"], 1.10000)
+
+
+if __name__ == '__main__':
+    unittest.main()
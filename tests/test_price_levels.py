@@ -0,0 +1,82 @@
+import unittest
+from utils.price_levels import PriceLevelIndex, DeadlineQueue, ABOVE, BELOW
+from execution.execution_engine import ExecutionEngine
+from backtest.mock_adapter import MockMT5Adapter
+from risk.risk_engine import RiskEngine
+
+
+class TestPriceLevelIndex(unittest.TestCase):
+    def test_fires_nearest_levels_once(self):
+        index = PriceLevelIndex()
+        fired = []
+        for i, price in enumerate([1.1010, 1.1005, 1.1020]):
+            index.arm(("up", i), price, ABOVE, lambda k, p: fired.append(k))
+        index.arm("down", 1.0990, BELOW, lambda k, p: fired.append(k))
+
+        self.assertEqual(index.nearest(ABOVE), 1.1005)
+        self.assertEqual(index.check(1.1000), 0)
+        self.assertEqual(index.check(1.1012), 2)
+        self.assertEqual(fired, [("up", 1), ("up", 0)])
+        self.assertEqual(index.check(1.1012), 0)
+        self.assertEqual(index.check(1.0990), 1)
+        self.assertEqual(len(index), 1)
+
+    def test_disarm_and_rearm_from_callback(self):
+        index = PriceLevelIndex()
+        calls = []
+
+        def retry(key, price):
+            calls.append(price)
+            index.arm(key, price, ABOVE, retry)
+
+        index.arm("a", 1.2, ABOVE, retry)
+        index.arm("b", 1.3, ABOVE, lambda k, p: calls.append(k))
+        self.assertTrue(index.disarm("b"))
+        self.assertFalse(index.disarm("b"))
+        index.check(1.25)
+        index.check(1.25)
+        self.assertEqual(calls, [1.2, 1.2])
+
+    def test_deadline_queue(self):
+        queue = DeadlineQueue()
+        fired = []
+        queue.arm("x", 30, lambda k, d: fired.append(k))
+        queue.arm("y", 10, lambda k, d: fired.append(k))
+        queue.disarm("y")
+        self.assertEqual(queue.advance(29), 0)
+        self.assertEqual(queue.advance(30), 1)
+        self.assertEqual(fired, ["x"])
+
+
+class TestExecutionLevels(unittest.TestCase):
+    def setUp(self):
+        self.mock = MockMT5Adapter()
+        self.mock.set_tick({"bid": 1.1000, "ask": 1.1001})
+        self.risk = RiskEngine()
+        self.engine = ExecutionEngine(self.mock, time_stop_candles=3)
+        signal = {"direction": "BUY", "entry_price": 1.1001, "sl": 1.0990, "tp": 1.1015}
+        self.ticket = self.engine.execute_signal(signal, "EURUSD", 0.1, risk_engine=self.risk)
+
+    def test_break_even_and_tp_touch(self):
+        self.engine.manage_trades("EURUSD", self.risk, tick={"bid": 1.1009, "ask": 1.1010})
+        trade = self.engine.active_trades[self.ticket]
+        self.assertTrue(trade.be_moved)
+        self.assertEqual(self.mock.positions[self.ticket]["sl"], 1.1001)
+        self.assertFalse(trade.tp_touched)
+        self.engine.manage_trades("EURUSD", self.risk, tick={"bid": 1.1015, "ask": 1.1016})
+        self.assertTrue(trade.tp_touched)
+
+    def test_time_stop(self):
+        for _ in range(2):
+            self.engine.update_candles_count()
+        self.engine.manage_trades("EURUSD", self.risk, tick={"bid": 1.1000, "ask": 1.1001})
+        self.assertIn(self.ticket, self.engine.active_trades)
+        self.engine.update_candles_count()
+        self.engine.manage_trades("EURUSD", self.risk, tick={"bid": 1.1000, "ask": 1.1001})
+        self.assertNotIn(self.ticket, self.engine.active_trades)
+        self.assertEqual(self.engine.closed_trades_history.recent(1)[0].exit_reason, "TIME_STOP")
+        self.assertEqual(self.risk.consecutive_losses, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
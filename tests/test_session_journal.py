@@ -0,0 +1,90 @@
+import logging
+import os
+import pickle
+import tempfile
+import unittest
+from backtest.generate_test_data import generate_ticks, to_ticks
+from backtest.journal_replay import replay_journal
+from risk.risk_engine import RiskEngine
+from runtime.symbol_pipeline import SymbolPipeline
+from utils.session_journal import SessionJournal, read_journal
+
+CONFIG = {"mt5": {"login": 123, "password": "secret"}, "trading": {"tick_count": 70}}
+
+
+class TestSessionJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "journal", "main.bin")
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+        self.tmp.cleanup()
+
+    def record_session(self, ticks, extra=()):
+        journal = SessionJournal()
+        pipeline = SymbolPipeline("EURUSD", RiskEngine(), journal=journal)
+        journal.open(self.path, CONFIG, [pipeline], flush_interval_s=0.01)
+        for i, tick in enumerate(ticks):
+            pipeline.on_tick(tick, live=i % 1000 != 0)
+        for kind, data in extra:
+            journal.record(kind, "EURUSD", data)
+        journal.close()
+        return pipeline
+
+    def test_round_trip_and_truncated_tail(self):
+        ticks = to_ticks(generate_ticks(5000, seed=5))
+        pipeline = self.record_session(ticks)
+        records = list(read_journal(self.path))
+        self.assertEqual([r[1] for r in records[:3]], ["session", "state", "tick"])
+        self.assertNotIn("mt5", records[0][3]["config"])
+        self.assertEqual(records[0][3]["specs"][0]["symbol"], "EURUSD")
+        recorded = [data for _, kind, _, data in records if kind == "tick"]
+        self.assertEqual(len(recorded), 5000)
+        self.assertEqual(recorded[1], (ticks[1], True))
+        self.assertEqual(sum(kind == "candle" for _, kind, _, _ in records), pipeline.candles)
+
+        # A crash mid-write leaves a partial frame, which is skipped
+        with open(self.path, "ab") as f:
+            f.write(b"\x40\x00\x00\x00partial")
+        self.assertEqual(len(list(read_journal(self.path))), len(records))
+
+    def test_starting_state_is_frozen_at_snapshot(self):
+        ticks = iter(to_ticks(generate_ticks(200000, seed=7)))
+        pipeline = SymbolPipeline("EURUSD", RiskEngine())
+        while pipeline.strategy_engine.state != "WAITING_PULLBACK":
+            pipeline.on_tick(next(ticks))
+        expected = pickle.dumps(pipeline.get_state())
+        journal = SessionJournal()
+        captured = journal.capture()
+        journal.snapshot([pipeline])
+        # The next candle is appended to the live setup's pullback list in place
+        candles = pipeline.candles
+        while pipeline.candles == candles:
+            pipeline.on_tick(next(ticks))
+        self.assertNotEqual(pickle.dumps(pipeline.get_state()), expected)
+        self.assertEqual(pickle.dumps(captured[0][3]), expected)
+        self.assertEqual(captured[0][3]["strategy"]["current_setup"]["pb_candles"], [])
+
+    def test_replay_reproduces_every_decision(self):
+        self.record_session(to_ticks(generate_ticks(60000, seed=7)))
+        report = replay_journal(self.path)
+        self.assertEqual(report["mismatches"], 0, report["first_mismatches"])
+        self.assertEqual(report["ticks"], 60000)
+        self.assertGreater(report["matched"]["candle"], 500)
+        self.assertEqual(report["matched"]["indicators"], report["matched"]["candle"])
+        self.assertGreater(report["matched"].get("transition", 0), 0)
+
+    def test_replay_reports_divergence(self):
+        ticks = to_ticks(generate_ticks(3000, seed=5))
+        self.record_session(ticks, extra=[("signal", {"direction": "BUY", "entry_price": 1.1})])
+        report = replay_journal(self.path)
+        self.assertEqual(report["mismatches"], 1)
+        mismatch = report["first_mismatches"][0]
+        self.assertEqual((mismatch["kind"], mismatch["replayed"]), ("signal", None))
+        self.assertEqual(mismatch["time_msc"], ticks[-1]["time_msc"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+from datetime import datetime, timedelta
+from backtest.sim_broker import SimBrokerState, SimBrokerServer, SimBrokerAdapter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_ticks(prices, start=datetime(2026, 1, 1, 13, 0)):
+    return [
+        {"bid": p, "ask": p + 0.00005, "timestamp": start + timedelta(seconds=i)}
+        for i, p in enumerate(prices)
+    ]
+
+
+class TestSimBroker(unittest.TestCase):
+    def test_clock_releases_ticks_at_speed(self):
+        clock = FakeClock()
+        state = SimBrokerState(make_ticks([1.1000, 1.1001, 1.1002, 1.1003]), speed=10, clock=clock)
+        self.assertEqual(state.get_tick("EURUSD")["bid"], 1.1000)
+        clock.now += 0.2  # 2 simulated seconds
+        self.assertEqual(state.get_tick("EURUSD")["bid"], 1.1002)
+        self.assertFalse(state.finished())
+
+    def test_sl_tp_checked_on_every_released_tick(self):
+        clock = FakeClock()
+        prices = [1.1000, 1.1000, 1.1020, 1.1000]
+        state = SimBrokerState(make_ticks(prices), speed=1, clock=clock)
+        state.get_tick("EURUSD")
+        ticket = state.place_market_order("EURUSD", "BUY", 0.1, sl=1.0990, tp=1.1010)
+        clock.now += 3  # the TP tick is never polled directly
+        state.get_tick("EURUSD")
+        self.assertFalse(state.position_exists(ticket))
+        self.assertEqual(state.closed_trades[0]["reason"], "TP")
+
+    def test_adapter_round_trip(self):
+        state = SimBrokerState(make_ticks([1.1000, 1.1001]), speed=1000)
+        server = SimBrokerServer(state, address=("127.0.0.1", 0))
+        server.start()
+        try:
+            adapter = SimBrokerAdapter(address=server.address)
+            self.assertTrue(adapter.connect())
+            tick = adapter.get_tick("EURUSD")
+            self.assertEqual(tick["symbol"], "EURUSD")
+            ticket = adapter.place_market_order("EURUSD", "SELL", 0.1, sl=1.2, tp=1.0)
+            self.assertGreater(ticket, 0)
+            self.assertTrue(adapter.close_position(ticket))
+            self.assertFalse(adapter.position_exists(ticket))
+            adapter.shutdown()
+            self.assertTrue(adapter.position_exists(ticket))  # unknown while disconnected
+        finally:
+            server.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
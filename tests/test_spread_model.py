@@ -0,0 +1,74 @@
+import contextlib
+import io
+import random
+import unittest
+from datetime import datetime, timedelta
+from backtest.replay_engine import ReplayEngine
+from risk.risk_engine import RiskEngine
+from runtime.symbol_pipeline import SymbolPipeline
+from utils.spread_model import SpreadModel
+
+
+def make_spreads(n, seed=3):
+    rng = random.Random(seed)
+    return [rng.choice([2, 3, 3, 4, 5, 7, 11]) * 0.00001 + (0.0001 if rng.random() < 0.01 else 0.0) for _ in range(n)]
+
+
+class TestSpreadModel(unittest.TestCase):
+    def test_percentile_gate_and_cap(self):
+        model = SpreadModel(percentile=95, window=100, min_samples=50)
+        # Only the cap applies until the window has min_samples ticks
+        self.assertTrue(model.update(0.00006))
+        self.assertFalse(model.update(0.00009))
+        for _ in range(60):
+            self.assertTrue(model.update(0.00002))
+        self.assertFalse(model.update(0.00006))  # wide compared to recent spreads, still under the cap
+        self.assertTrue(model.allows(0.00002))
+        self.assertAlmostEqual(model.threshold(), 0.00002)
+        self.assertEqual(model.snapshot()["rejects"], 2)
+
+    def test_mask_and_seed_match_streaming(self):
+        spreads = make_spreads(5000)
+        stream = SpreadModel(percentile=90, window=300, min_samples=50)
+        accepted = [stream.update(s) for s in spreads]
+
+        batch = SpreadModel(percentile=90, window=300, min_samples=50)
+        self.assertEqual(batch.mask(spreads).tolist(), accepted)
+        batch.seed(spreads)
+        self.assertEqual((batch.tree, batch.recent, batch.count, batch.k), (stream.tree, stream.recent, stream.count, stream.k))
+
+        restored = SpreadModel(percentile=90, window=300, min_samples=50)
+        restored.load_state(stream.get_state())
+        self.assertEqual([restored.update(s) for s in spreads[:500]], [stream.update(s) for s in spreads[:500]])
+
+    def test_pipeline_rejects_spread_spike(self):
+        pipeline = SymbolPipeline("EURUSD", RiskEngine(), tick_count=5)
+        t = datetime(2026, 1, 5, 13, 0)
+        for i in range(300):
+            tick = {"bid": 1.1, "ask": 1.10002, "spread": 0.00002, "time_msc": i, "timestamp": t + timedelta(seconds=i)}
+            self.assertTrue(pipeline.on_tick(tick)[0])
+        spike = {"bid": 1.1, "ask": 1.10006, "spread": 0.00006, "time_msc": 300, "timestamp": t + timedelta(seconds=300)}
+        self.assertFalse(pipeline.on_tick(spike)[0])
+        self.assertEqual(pipeline.stats(1.0)["spread_rejects"], 1)
+
+    def test_replay_drops_gated_ticks_like_the_pipeline(self):
+        t = datetime(2026, 1, 5, 13, 0)
+        ticks = []
+        for i in range(400):
+            spread = 0.0002 if i % 7 == 3 else 0.00002
+            mid = 1.1 + 0.00001 * (i % 40)
+            ticks.append({"bid": mid, "ask": mid + spread, "spread": spread, "time_msc": i * 100,
+                          "timestamp": t + timedelta(milliseconds=100 * i)})
+        pipeline = SymbolPipeline("EURUSD", RiskEngine(), tick_count=10)
+        for tick in ticks:
+            pipeline.on_tick(dict(tick))
+        engine = ReplayEngine(tick_count=10)
+        with contextlib.redirect_stdout(io.StringIO()):
+            engine.run([dict(tick) for tick in ticks])
+        self.assertEqual(engine.stats["spread_rejects"], pipeline.spread_rejects)
+        self.assertEqual(engine.stats["candles_formed"], pipeline.candles)
+        self.assertEqual(engine.tick_engine.get_state(), pipeline.tick_engine.get_state())
+
+
+if __name__ == "__main__":
+    unittest.main()
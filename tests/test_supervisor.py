@@ -0,0 +1,142 @@
+import os
+import queue
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta
+from backtest.mock_adapter import MockMT5Adapter
+from risk.risk_engine import RiskEngine
+from runtime.supervisor import StrategyWorker, SupervisedBot, split_groups
+from runtime.symbol_pipeline import SymbolPipeline
+from runtime.tick_ring import TickRing
+
+
+def make_tick(i, base, symbol):
+    mid = base + 0.00001 * (i % 50)
+    return {"symbol": symbol, "bid": mid, "ask": mid + 0.00002, "spread": 0.00002, "time_msc": 1000 * i,
+            "timestamp": datetime(2026, 1, 5, 13, 0) + timedelta(seconds=i, microseconds=7)}
+
+
+def wait_for(condition, timeout=20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class TestTickRing(unittest.TestCase):
+    def setUp(self):
+        self.ring = TickRing.create(capacity=8)
+
+    def tearDown(self):
+        self.ring.close()
+
+    def test_round_trip_and_wraparound(self):
+        reader = TickRing.attach(self.ring.name)
+        try:
+            for i in range(5):
+                self.ring.write(0, make_tick(i, 1.1, "EURUSD"))
+            first, batch = reader.read(0)
+            self.assertEqual((first, len(batch)), (0, 5))
+            self.assertEqual(TickRing.to_tick(batch[3], "EURUSD"), dict(make_tick(3, 1.1, "EURUSD"), spread=batch[3]["ask"] - batch[3]["bid"]))
+
+            for i in range(5, 15):
+                self.ring.write(1, make_tick(i, 1.27, "GBPUSD"))
+            # Ticks 5 and 6 were overwritten before the reader got to them
+            first, batch = reader.read(5)
+            self.assertEqual(first, 7)
+            self.assertEqual(list(batch["time_msc"]), [1000 * i for i in range(7, 15)])
+        finally:
+            reader.close()
+
+    def test_lag_reports_pending_ticks(self):
+        for i in range(3):
+            self.ring.write(0, make_tick(i, 1.1, "EURUSD"))
+        self.assertEqual(self.ring.lag()["pending"], 3)
+        self.ring.commit(3)
+        lag = self.ring.lag()
+        self.assertEqual((lag["pending"], lag["lag_ms"]), (0, 0.0))
+
+
+class TestStrategyWorker(unittest.TestCase):
+    def test_history_warm_starts_inside_the_worker(self):
+        config = {"trading": {"tick_count": 10}, "checkpoint": {"path": ""}}
+        history = [make_tick(i, 1.1, "EURUSD") for i in range(300)]
+        ring = TickRing.create(capacity=8)
+        try:
+            worker = StrategyWorker(0, ["EURUSD", "GBPUSD"], ring, queue.Queue(), config, history={"EURUSD": history})
+            reference = SymbolPipeline.from_config("EURUSD", RiskEngine.from_config(config), config)
+            reference.warm_start(history)
+            eur, gbp = worker.pipelines
+            self.assertEqual(eur.tick_engine.get_state(), reference.tick_engine.get_state())
+            self.assertEqual(eur.last_indicators, reference.last_indicators)
+            self.assertIsNone(gbp.last_tick_msc)
+            # History never goes through the ring, so it can't overflow it
+            self.assertEqual(ring.write_seq, 0)
+
+            ring.write(0, make_tick(300, 1.1, "EURUSD"))
+            self.assertTrue(worker.step())
+            self.assertEqual(eur.last_tick_msc, 300000)
+        finally:
+            ring.close()
+
+
+class TestSupervisedBot(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        config = {
+            "mt5": {"login": 0, "magic": 701970},
+            "broker": {"backend": "mock"},
+            "trading": {"symbols": ["EURUSD", "GBPUSD", "USDJPY"], "tick_count": 10, "volume": 0.1},
+            "execution": {"ledger_path": "", "closed_trade_journal": os.path.join(self.tmp.name, "closed.jsonl")},
+            "checkpoint": {"path": ""},
+            "warm_start": {"hours": 0},
+            "supervisor": {"restart_delay_s": 0.0},
+            "logging": {"level": "WARNING"},
+        }
+        self.bot = SupervisedBot(config=config, workers=2)
+        self.bot.mt5 = MockMT5Adapter()
+        self.assertTrue(self.bot.initialize())
+
+    def tearDown(self):
+        self.bot._shutdown()
+        self.tmp.cleanup()
+
+    def feed(self, start, stop):
+        for i in range(start, stop):
+            self.bot._dispatch([("EURUSD", make_tick(i, 1.1, "EURUSD")), ("GBPUSD", make_tick(i, 1.27, "GBPUSD"))])
+
+    def candles(self, symbol):
+        levels = self.bot.exec_engine.levels.get(symbol)
+        return levels.candles if levels else 0
+
+    def drained(self, expected):
+        self.bot._drain_intents()
+        return self.candles("EURUSD") == expected and self.candles("GBPUSD") == expected
+
+    def test_groups_cover_symbols(self):
+        self.assertEqual(split_groups(["A", "B", "C"], 2), [["A", "C"], ["B"]])
+        self.assertEqual([w.symbols for w in self.bot.workers], [["EURUSD", "USDJPY"], ["GBPUSD"]])
+
+    def test_crashed_worker_is_restarted_and_resumes(self):
+        self.feed(0, 40)
+        self.assertTrue(wait_for(lambda: self.drained(4)))
+        self.assertTrue(wait_for(lambda: all(s["pending"] == 0 for s in self.bot.worker_stats())))
+
+        crashed = self.bot.workers[1]
+        crashed.process.kill()
+        crashed.process.join()
+        self.feed(40, 60)
+        self.bot.supervise_workers()
+        self.assertEqual(crashed.restarts, 1)
+        self.assertTrue(crashed.process.is_alive())
+
+        # The restarted worker picks up the ticks published while it was down
+        self.assertTrue(wait_for(lambda: self.drained(6)))
+        self.assertTrue(wait_for(lambda: all(s["pending"] == 0 for s in self.bot.worker_stats())))
+
+
+if __name__ == "__main__":
+    unittest.main()
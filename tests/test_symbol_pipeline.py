@@ -0,0 +1,168 @@
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta
+from backtest.mock_adapter import MockMT5Adapter
+from backtest.replay_broker import ReplayBroker
+from data.tick_engine import TickCandleEngine
+from main import VolmanTradingBot
+from risk.risk_engine import RiskEngine
+from runtime.symbol_pipeline import SymbolPipeline
+from utils.symbol_spec import get_spec
+
+
+class MultiSymbolBroker(MockMT5Adapter):
+    """Mock broker holding one quote per symbol and counting terminal calls."""
+
+    def __init__(self):
+        super().__init__()
+        self.quotes = {}
+        self.calls = {"get_ticks": 0, "get_positions": 0, "position_exists": 0}
+
+    def get_ticks(self, symbols):
+        self.calls["get_ticks"] += 1
+        return {s: self.quotes[s] for s in symbols if s in self.quotes}
+
+    def get_positions(self, magic=None):
+        self.calls["get_positions"] += 1
+        return super().get_positions(magic)
+
+    def position_exists(self, ticket):
+        self.calls["position_exists"] += 1
+        return super().position_exists(ticket)
+
+
+def make_tick(i, base, symbol):
+    mid = base + 0.00001 * (i % 50)
+    return {"symbol": symbol, "bid": mid, "ask": mid + 0.00002, "spread": 0.00002, "time_msc": 1000 * i,
+            "timestamp": datetime(2026, 1, 5, 13, 0) + timedelta(seconds=i)}
+
+
+class TestSymbolPipeline(unittest.TestCase):
+    def test_repeated_quote_is_skipped(self):
+        pipeline = SymbolPipeline("EURUSD", RiskEngine())
+        tick = make_tick(1, 1.1, "EURUSD")
+        self.assertFalse(pipeline.is_duplicate(tick))
+        self.assertTrue(pipeline.is_duplicate(dict(tick)))
+        self.assertFalse(pipeline.is_duplicate(make_tick(2, 1.1, "EURUSD")))
+        self.assertEqual(pipeline.duplicates, 1)
+
+    def test_spread_gate_and_stats(self):
+        pipeline = SymbolPipeline("EURUSD", RiskEngine(), tick_count=5)
+        wide = dict(make_tick(0, 1.1, "EURUSD"), spread=0.0002)
+        self.assertFalse(pipeline.on_tick(wide)[0])
+        for i in range(1, 11):
+            pipeline.on_tick(make_tick(i, 1.1, "EURUSD"))
+        stats = pipeline.stats(elapsed_s=2.0)
+        self.assertEqual(stats["ticks"], 11)
+        self.assertEqual(stats["spread_rejects"], 1)
+        self.assertEqual(stats["candles"], 2)
+        self.assertAlmostEqual(stats["ticks_per_s"], 5.5)
+
+
+class TestMultiSymbolRuntime(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        config = {
+            "mt5": {"login": 0, "magic": 701970},
+            "broker": {"backend": "mock"},
+            "trading": {"symbols": ["EURUSD", "GBPUSD"], "tick_count": 10, "volume": 0.1},
+            "execution": {"ledger_path": "", "closed_trade_journal": os.path.join(self.tmp.name, "closed.jsonl")},
+            "checkpoint": {"path": ""},
+            "warm_start": {"hours": 0},
+        }
+        self.bot = VolmanTradingBot(config=config)
+        self.broker = MultiSymbolBroker()
+        self.bot.mt5 = self.broker
+        self.assertTrue(self.bot.initialize())
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_one_batched_poll_feeds_independent_pipelines(self):
+        eur_ref, gbp_ref = TickCandleEngine(10), TickCandleEngine(10)
+        for i in range(35):
+            eur, gbp = make_tick(i, 1.1, "EURUSD"), make_tick(i, 1.27, "GBPUSD")
+            self.broker.quotes = {"EURUSD": eur}
+            if i % 2 == 0:  # GBPUSD ticks half as often
+                self.broker.quotes["GBPUSD"] = gbp
+                gbp_ref.process_tick(gbp)
+            eur_ref.process_tick(eur)
+            for pipeline, tick in self.bot.poll_ticks():
+                self.bot._ingest_tick(pipeline, tick)
+
+        self.assertEqual(self.broker.calls["get_ticks"], 35)
+        eur_p, gbp_p = self.bot.pipelines["EURUSD"], self.bot.pipelines["GBPUSD"]
+        self.assertEqual(eur_p.ticks, 35)
+        self.assertEqual(gbp_p.ticks, 18)
+        self.assertEqual(eur_p.tick_engine.get_state(), eur_ref.get_state())
+        self.assertEqual(gbp_p.tick_engine.get_state(), gbp_ref.get_state())
+        self.assertEqual(self.bot.exec_engine.levels["EURUSD"].candles, 3)
+        self.assertEqual(self.bot.exec_engine.levels["GBPUSD"].candles, 1)
+
+    def test_unchanged_quote_is_not_a_failed_poll(self):
+        self.assertIsNone(self.bot.poll_ticks())
+        self.broker.quotes = {"EURUSD": make_tick(1, 1.1, "EURUSD")}
+        self.assertEqual(len(self.bot.poll_ticks()), 1)
+        # The idle case between ticks: keep polling fast
+        self.assertEqual(self.bot.poll_ticks(), [])
+
+    def test_dashboard_shows_strategy_ema(self):
+        for i in range(40):
+            self.broker.quotes = {"EURUSD": make_tick(i, 1.1, "EURUSD")}
+            for pipeline, tick in self.bot.poll_ticks():
+                self.bot._ingest_tick(pipeline, tick)
+        ema = self.bot.pipelines["EURUSD"].last_indicators["ema20"]
+        with self.assertLogs(level="INFO") as logs:
+            self.bot._log_runtime_stats(1.0)
+        self.assertIn(f"EURUSD EMA: {ema:.5f} | Slope: ", "\n".join(logs.output))
+
+    def test_dashboard_uses_symbol_precision_for_timeframes(self):
+        pipeline = self.bot.pipelines["GBPUSD"]
+        pipeline.spec = get_spec("USDJPY")
+        pipeline.timeframe_indicators = {"M1": {"ema20": 150.123456, "ema20_slope": 0.0042}}
+        with self.assertLogs(level="INFO") as logs:
+            self.bot._log_runtime_stats(1.0)
+        self.assertIn("GBPUSD M1: EMA 150.123 | Slope 0.42 pips", "\n".join(logs.output))
+
+    def test_outage_backfill_on_a_non_utc_host(self):
+        ticks = [make_tick(i, 1.1, "EURUSD") for i in range(1, 41)]
+        broker = self.bot.mt5 = ReplayBroker(ticks=[{k: t[k] for k in ("bid", "ask", "timestamp")} for t in ticks])
+        pipeline = self.bot.pipelines["EURUSD"]
+        old_tz = os.environ.get("TZ")
+        os.environ["TZ"] = "Asia/Kolkata"
+        time.tzset()
+        try:
+            for _ in range(10):
+                self.bot._ingest_tick(pipeline, broker.get_tick("EURUSD"))
+            # Ticks the broker served while the terminal was unreachable
+            for _ in range(30):
+                broker.get_tick("EURUSD")
+            self.bot._on_reconnected(30.0)
+        finally:
+            if old_tz is None:
+                del os.environ["TZ"]
+            else:
+                os.environ["TZ"] = old_tz
+            time.tzset()
+        self.assertEqual(pipeline.ticks, 40)
+        self.assertEqual(pipeline.last_tick_msc, broker.current_tick["time_msc"])
+
+    def test_shared_execution_syncs_positions_in_one_call(self):
+        self.broker.set_tick(make_tick(1, 1.1, "EURUSD"))
+        signal = {"direction": "BUY", "entry_price": 1.1001, "sl": 1.0990, "tp": 1.1015}
+        self.bot._handle_signal(signal, "EURUSD")
+        self.bot._handle_signal(dict(signal, entry_price=1.2701, sl=1.2690, tp=1.2715), "GBPUSD")
+        self.assertEqual(len(self.bot.exec_engine.active_trades), 2)
+        self.assertEqual(self.bot.risk_engine.trades_this_session, 2)
+
+        self.broker.close_position(next(iter(self.broker.positions)))
+        self.bot.exec_engine.sync_positions(self.bot.risk_engine)
+        self.assertEqual(self.broker.calls["get_positions"], 1)
+        self.assertEqual(self.broker.calls["position_exists"], 0)
+        self.assertEqual(len(self.bot.exec_engine.active_trades), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+from risk.risk_engine import RiskEngine
+from strategy.strategy_engine import StrategyEngine
+from utils.symbol_spec import SymbolSpec, SymbolSpecRegistry
+
+
+class FakeBroker:
+    def __init__(self, infos):
+        self.infos = infos
+
+    def get_symbol_info(self, symbol):
+        return self.infos.get(symbol)
+
+
+class TestSymbolSpec(unittest.TestCase):
+    def test_pip_derived_from_digits(self):
+        self.assertAlmostEqual(SymbolSpec("EURUSD", 5, 0.00001).pip, 0.0001)
+        self.assertAlmostEqual(SymbolSpec("USDJPY", 3, 0.001).pip, 0.01)
+        self.assertAlmostEqual(SymbolSpec("USDJPY", 2, 0.01).pip, 0.01)
+        self.assertAlmostEqual(SymbolSpec("XAUUSD", 2, 0.01).pip, 0.1)
+        self.assertAlmostEqual(SymbolSpec("EURUSD", 5, 0.00001, pip=0.0002).pip, 0.0002)
+
+    def test_registry_loads_file_and_broker(self):
+        registry = SymbolSpecRegistry()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "symbols.yaml")
+            with open(path, "w") as f:
+                f.write("GBPJPY:\n  digits: 3\n  point: 0.001\n  stops_level: 10\n")
+            self.assertEqual(registry.load_file(path), 1)
+        self.assertEqual(registry.get("GBPJPY").stops_level, 10)
+
+        broker = FakeBroker({"XAUUSD": {"digits": 2, "point": 0.01, "tick_size": 0.01, "tick_value": 1.0, "stops_level": 0}})
+        self.assertEqual(registry.load_from_broker(broker, ["XAUUSD", "NZDCAD"]), ["NZDCAD"])
+        self.assertAlmostEqual(registry.get("XAUUSD").pips_to_price(5), 0.5)
+        # Unknown symbols fall back to the naming convention
+        self.assertAlmostEqual(registry.get("NZDCAD").pip, 0.0001)
+
+    def test_thresholds_precomputed_per_symbol(self):
+        jpy = SymbolSpec("USDJPY", 3, 0.001)
+        engine = StrategyEngine(RiskEngine(), symbol="USDJPY", spec=jpy)
+        self.assertAlmostEqual(engine.spread_model.cap, 0.008)
+        self.assertAlmostEqual(engine.entry_trigger.buffer, 0.003)
+        self.assertAlmostEqual(engine.impulse_detector.min_size_price, 0.08)
+
+        risk = RiskEngine()
+        # 6.5-pip fallback stop in each symbol's own pip size
+        self.assertAlmostEqual(risk.calculate_sl_tp("BUY", 150.0, 149.99, symbol="USDJPY")[0], 149.935)
+        self.assertAlmostEqual(risk.calculate_sl_tp("BUY", 1.1, 1.0999)[0], 1.09935)
+
+
+if __name__ == "__main__":
+    unittest.main()
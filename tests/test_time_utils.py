@@ -0,0 +1,40 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from utils.time_utils import SessionCalendar, get_ist_time
+
+
+class TestSessionCalendar(unittest.TestCase):
+    def setUp(self):
+        self.sessions = SessionCalendar()
+
+    def test_winter_matches_ist_windows(self):
+        day = datetime(2026, 1, 6)
+        for minute in range(0, 24 * 60, 5):
+            dt = day + timedelta(minutes=minute)
+            ist = get_ist_time(dt).time()
+            expected = "12:30" <= ist.strftime("%H:%M") <= "16:30" or "18:30" <= ist.strftime("%H:%M") <= "21:30"
+            self.assertEqual(self.sessions.is_active(dt), expected, dt)
+
+    def test_sessions_follow_dst(self):
+        # BST: London opens 06:00 UTC; EDT: New York opens 12:00 UTC
+        self.assertTrue(self.sessions.is_active(datetime(2026, 7, 1, 6, 30)))
+        self.assertFalse(self.sessions.is_active(datetime(2026, 7, 1, 10, 30)))
+        self.assertTrue(self.sessions.is_active(datetime(2026, 7, 1, 12, 15)))
+        self.assertFalse(self.sessions.is_active(datetime(2026, 1, 6, 6, 30)))
+        # Aware datetimes are converted to UTC
+        self.assertTrue(self.sessions.is_active(datetime(2026, 7, 1, 8, 0, tzinfo=timezone(timedelta(hours=2)))))
+
+    def test_next_transition(self):
+        self.assertEqual(self.sessions.next_transition(datetime(2026, 1, 6, 2, 0)), datetime(2026, 1, 6, 7, 0))
+        self.assertEqual(self.sessions.next_transition(datetime(2026, 1, 6, 7, 30)), datetime(2026, 1, 6, 11, 0, 0, 1))
+        self.assertEqual(self.sessions.seconds_to_transition(datetime(2026, 1, 6, 12, 0)), 3600.0)
+
+    def test_mask_matches_lookups_across_dst_change(self):
+        times = [datetime(2026, 3, 5) + timedelta(minutes=17 * i) for i in range(2500)]
+        mask = self.sessions.mask(times)
+        self.assertEqual(list(mask), [self.sessions.is_active(t) for t in times])
+        self.assertTrue(mask.any() and not mask.all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+from execution.trade_record import TradeRecord
+from execution.trade_history import ClosedTradeHistory
+
+
+def make_trade(ticket):
+    trade = TradeRecord(ticket, "EURUSD", "BUY", 1.1000, 1.0990, 1.1015)
+    trade.exit_reason = "MARKET"
+    return trade
+
+
+class TestClosedTradeHistory(unittest.TestCase):
+    def test_records_are_slotted(self):
+        trade = make_trade(1)
+        with self.assertRaises(AttributeError):
+            trade.unexpected = True
+        self.assertEqual(TradeRecord.from_dict(trade.to_dict()).to_dict(), trade.to_dict())
+
+    def test_ring_is_bounded_and_spills_to_journal(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "closed.jsonl")
+            history = ClosedTradeHistory(maxlen=3, journal_path=path)
+            for ticket in range(1, 11):
+                history.append(make_trade(ticket))
+
+            self.assertEqual(len(history), 3)
+            self.assertEqual(history.spilled, 7)
+            self.assertEqual([t.ticket for t in history.iter_all()], list(range(1, 11)))
+
+            history.flush()
+            self.assertEqual(len(history), 0)
+            self.assertEqual([t.ticket for t in history.iter_all()], list(range(1, 11)))
+
+    def test_evictions_are_written_in_batches(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "closed.jsonl")
+            history = ClosedTradeHistory(maxlen=2, journal_path=path, spill_every=4)
+            for ticket in range(1, 6):
+                history.append(make_trade(ticket))
+            # Three evicted, below the batch size: nothing written yet, but still queryable
+            self.assertFalse(os.path.exists(path))
+            self.assertEqual([t.ticket for t in history.iter_all()], [1, 2, 3, 4, 5])
+
+            history.append(make_trade(6))
+            with open(path) as f:
+                self.assertEqual(len(f.readlines()), 4)
+            self.assertEqual([t.ticket for t in history.iter_all()], [1, 2, 3, 4, 5, 6])
+
+    def test_since_returns_only_new_trades(self):
+        history = ClosedTradeHistory(maxlen=5)
+        for ticket in range(1, 4):
+            history.append(make_trade(ticket))
+        self.assertEqual([t.ticket for t in history.since(1)], [2, 3])
+        self.assertEqual(history.since(history.total), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+from datetime import datetime, timedelta
+from data.tick_engine import TickCandleEngine
+from data.warm_start import warm_start
+from indicators.indicator_engine import IndicatorEngine
+from risk.risk_engine import RiskEngine
+from strategy.strategy_engine import StrategyEngine
+from utils.pip_utils import price_to_pips
+
+
+def make_ticks(n):
+    start = datetime(2026, 1, 5, 13, 0)
+    ticks = []
+    for i in range(n):
+        mid = 1.1000 + 0.00003 * ((i * 7919) % 97) / 97 + 0.0000013 * i
+        spread = 0.00012 if i % 37 == 0 else 0.00003  # some ticks fail the 0.8 pip gate
+        ticks.append({"bid": round(mid, 5), "ask": round(mid + spread, 5), "timestamp": start + timedelta(milliseconds=150 * i)})
+    return ticks
+
+
+def engines():
+    return TickCandleEngine(70), IndicatorEngine(), StrategyEngine(RiskEngine())
+
+
+class TestWarmStart(unittest.TestCase):
+    def test_handoff_matches_streaming_bit_for_bit(self):
+        ticks = make_ticks(12345)
+        history, live = ticks[:10000], ticks[10000:]
+
+        # Streaming reference, gated like the live loop
+        s_tick, s_ind, s_strat = engines()
+        s_last = {}
+        s_outputs = []
+        for i, tick in enumerate(ticks):
+            spread_pips = price_to_pips(tick["ask"] - tick["bid"])
+            if spread_pips > 0.8:
+                continue
+            candle = s_tick.process_tick(tick)
+            if candle:
+                s_last = s_ind.update(candle)
+                s_strat.process_candle(candle, s_last, spread=tick["ask"] - tick["bid"])
+                if i >= 10000:
+                    s_outputs.append((candle, s_last))
+            if i == 9999:
+                self.assertNotEqual(s_tick.tick_count, 0)
+                ref_state = (s_tick.get_state(), s_ind.get_state(), s_strat.trend_analyzer.get_state(), list(s_strat.candles), s_last)
+
+        w_tick, w_ind, w_strat = engines()
+        w_last = warm_start(history, w_tick, w_ind, w_strat, max_spread_pips=0.8)
+        self.assertEqual(
+            (w_tick.get_state(), w_ind.get_state(), w_strat.trend_analyzer.get_state(), list(w_strat.candles), w_last),
+            ref_state
+        )
+
+        # The next live ticks continue seamlessly
+        w_outputs = []
+        for tick in live:
+            spread_pips = price_to_pips(tick["ask"] - tick["bid"])
+            if spread_pips > 0.8:
+                continue
+            candle = w_tick.process_tick(tick)
+            if candle:
+                w_last = w_ind.update(candle)
+                w_outputs.append((candle, w_last))
+        self.assertEqual(w_outputs, s_outputs)
+
+    def test_short_history_keeps_partial_candle(self):
+        tick_engine, ind, strat = engines()
+        self.assertEqual(warm_start(make_ticks(50)[1:], tick_engine, ind, strat), {})
+        self.assertEqual(tick_engine.tick_count, 49)
+        self.assertEqual(tick_engine.candle_index, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
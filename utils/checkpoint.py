@@ -0,0 +1,129 @@
+import logging
+import os
+import pickle
+import struct
+import threading
+import time
+
+# File layout: magic | format version (uint16) | created_at (float64, unix time) | pickle payload
+CHECKPOINT_MAGIC = b"VOLCKPT\x00"
+CHECKPOINT_VERSION = 1
+_HEADER = struct.Struct("<8sHd")
+
+
+def save_checkpoint(path, state, now=None):
+    """Atomically writes `state` as a versioned binary snapshot."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    created_at = time.time() if now is None else now
+    payload = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION, created_at))
+        f.write(payload)
+        # The bytes must be on disk before the rename, or a power loss can leave an empty snapshot in place
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_directory(directory or ".")
+    return len(payload)
+
+
+def _fsync_directory(directory):
+    """Makes a rename in `directory` durable; a no-op where directories cannot be opened (Windows)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class CheckpointWriter:
+    """
+    Writes checkpoints on a background thread, so pickling and the fsyncs stay
+    off the trading thread. `submit` hands the state over as is: `get_state()`
+    trees are detached from the live engines, which never mutate them
+    afterwards. Only the latest submitted state is kept, so a slow disk skips
+    snapshots rather than queueing them.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.written = 0
+        self._pending = None
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def submit(self, state, now=None):
+        snapshot = (state, time.time() if now is None else now)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Checkpoint writer is closed")
+            self._pending = snapshot
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def close(self, timeout=10.0):
+        """Writes the last submitted state, if still pending, and stops the thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                snapshot, self._pending = self._pending, None
+                if snapshot is None:
+                    return
+            state, created_at = snapshot
+            try:
+                save_checkpoint(self.path, state, now=created_at)
+                self.written += 1
+            except (OSError, pickle.PicklingError) as e:
+                logging.error(f"Checkpoint write to {self.path} failed: {e}")
+
+
+def load_checkpoint(path, max_age_seconds=None, now=None):
+    """
+    Returns `(state, age_seconds)`, or `(None, reason)` if the snapshot is
+    missing, from another format version, corrupt or older than `max_age_seconds`.
+    """
+    if not os.path.exists(path):
+        return None, "no checkpoint"
+
+    try:
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return None, "truncated header"
+            magic, version, created_at = _HEADER.unpack(header)
+            if magic != CHECKPOINT_MAGIC:
+                return None, "not a checkpoint file"
+            if version != CHECKPOINT_VERSION:
+                return None, f"format version {version} != {CHECKPOINT_VERSION}"
+
+            age = (time.time() if now is None else now) - created_at
+            if max_age_seconds is not None and age > max_age_seconds:
+                return None, f"stale ({age:.0f}s old)"
+
+            state = pickle.loads(f.read())
+    except (OSError, pickle.UnpicklingError, EOFError, struct.error) as e:
+        logging.error(f"Failed to read checkpoint {path}: {e}")
+        return None, "unreadable"
+
+    return state, age
@@ -0,0 +1,235 @@
+import json
+import logging
+import os
+import threading
+from time import perf_counter_ns
+
+# Log-linear buckets: values below SUB_BUCKETS ns are exact, above that every
+# power of two is split into SUB_BUCKETS linear buckets (<= 6.25% error)
+SUB_BUCKETS = 16
+_MAX_SHIFT = 40  # ~18 minutes; longer values land in the last bucket
+N_BUCKETS = (_MAX_SHIFT + 2) * SUB_BUCKETS
+
+# Broker calls timed by `LatencyRecorder.instrument`, as `broker.<name>` stages
+BROKER_CALLS = (
+    "get_tick", "get_ticks", "get_positions", "position_exists", "place_market_order",
+    "modify_sl", "close_position", "get_account_info", "server_time", "copy_ticks_from",
+    "get_close_deal",
+)
+
+
+def _bucket(ns):
+    if ns < SUB_BUCKETS:
+        return ns if ns > 0 else 0
+    shift = ns.bit_length() - 5
+    if shift > _MAX_SHIFT:
+        return N_BUCKETS - 1
+    return (shift + 1) * SUB_BUCKETS + (ns >> shift) - SUB_BUCKETS
+
+
+def _bucket_high(index):
+    """Largest value that falls into bucket `index`."""
+    if index < SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    sub = index % SUB_BUCKETS + SUB_BUCKETS
+    return ((sub + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """Fixed-bucket log-linear histogram of durations in nanoseconds."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * N_BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, ns):
+        self.counts[_bucket(ns)] += 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the `p`th percentile, capped at the maximum seen."""
+        if not self.count:
+            return 0
+        target = max(1, -(-self.count * p // 100))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return min(_bucket_high(index), self.max)
+        return self.max
+
+    def merge(self, other):
+        for index, n in enumerate(other.counts):
+            if n:
+                self.counts[index] += n
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "mean_us": self.total / self.count / 1000 if self.count else 0.0,
+            "p50_us": self.percentile(50) / 1000,
+            "p99_us": self.percentile(99) / 1000,
+            "max_us": self.max / 1000,
+        }
+
+    def get_state(self):
+        return {
+            "counts": {index: n for index, n in enumerate(self.counts) if n},
+            "count": self.count,
+            "total": self.total,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        hist = cls()
+        for index, n in state["counts"].items():
+            hist.counts[int(index)] = n
+        hist.count = state["count"]
+        hist.total = state["total"]
+        hist.max = state["max"]
+        return hist
+
+
+class LatencyRecorder:
+    """
+    Per-stage latency histograms for the live loop and replays.
+
+    Call sites take a timestamp with `start()` and close each stage with
+    `lap()`, which returns the timestamp the next stage starts from:
+
+        t = LATENCY.start()
+        ...
+        if t:
+            t = LATENCY.lap("candle", t)
+
+    When disabled `start()` returns 0, so instrumentation costs one call and a
+    branch per tick. `rollover()` folds the current interval into the session
+    totals, which the dashboard and the shutdown dump report.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.stages = {}
+        self.session = {}
+        self.dump_path = None
+        # Held while an interval moves into the session, so `totals()` never counts it twice or not at all
+        self._rollover_lock = threading.Lock()
+
+    def configure(self, enabled=True, dump_path=None):
+        self.enabled = enabled
+        self.dump_path = dump_path
+        self.stages.clear()
+        self.session.clear()
+
+    def start(self):
+        return perf_counter_ns() if self.enabled else 0
+
+    def lap(self, stage, start):
+        now = perf_counter_ns()
+        self.record(stage, now - start)
+        return now
+
+    def record(self, stage, ns):
+        hist = self.stages.get(stage)
+        if hist is None:
+            hist = self.stages[stage] = LatencyHistogram()
+        hist.record(ns)
+
+    def instrument(self, obj, names=BROKER_CALLS, prefix="broker."):
+        """Wraps the named methods of `obj` (an instance) so each call is timed. No-op when disabled."""
+        if not self.enabled:
+            return
+        for name in names:
+            method = getattr(obj, name, None)
+            if callable(method):
+                setattr(obj, name, self._timed(prefix + name, method))
+
+    def _timed(self, stage, method):
+        def timed(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.record(stage, perf_counter_ns() - start)
+        timed.__wrapped__ = method
+        return timed
+
+    def snapshot(self, session=False):
+        """`{stage: {count, mean_us, p50_us, p99_us, max_us}}` for the interval (or the whole session)."""
+        stages = self.session if session else self.stages
+        return {stage: hist.snapshot() for stage, hist in sorted(stages.items())}
+
+    def totals(self):
+        """`{stage: LatencyHistogram}` over the session including the current interval."""
+        totals = {}
+        # May run on an exporter thread while the loop records
+        with self._rollover_lock:
+            for stages in (self.session, self.stages):
+                for stage, hist in list(stages.items()):
+                    total = totals.get(stage)
+                    if total is None:
+                        total = totals[stage] = LatencyHistogram()
+                    total.merge(hist)
+        return totals
+
+    def rollover(self):
+        with self._rollover_lock:
+            for stage, hist in self.stages.items():
+                total = self.session.get(stage)
+                if total is None:
+                    total = self.session[stage] = LatencyHistogram()
+                total.merge(hist)
+            self.stages = {}
+
+    def get_state(self):
+        return {stage: hist.get_state() for stage, hist in self.stages.items()}
+
+    def merge_state(self, state):
+        """Adds histograms recorded elsewhere (e.g. in a worker process) to the current interval."""
+        for stage, saved in state.items():
+            hist = self.stages.get(stage)
+            if hist is None:
+                hist = self.stages[stage] = LatencyHistogram()
+            hist.merge(LatencyHistogram.from_state(saved))
+
+    def log(self, session=False, indent=""):
+        for stage, s in self.snapshot(session).items():
+            logging.info(f"{indent}{stage:<26} n {s['count']:>8} | p50 {s['p50_us']:9.1f} us | "
+                         f"p99 {s['p99_us']:9.1f} us | max {s['max_us']:9.1f} us")
+
+    def dump(self):
+        """Folds in the current interval, logs the session totals and writes them to `dump_path`."""
+        self.rollover()
+        if not self.session:
+            return
+        logging.info("Latency over the session:")
+        self.log(session=True, indent="  ")
+        if self.dump_path:
+            try:
+                os.makedirs(os.path.dirname(self.dump_path) or ".", exist_ok=True)
+                with open(self.dump_path, "w") as f:
+                    json.dump(self.snapshot(session=True), f, indent=2)
+            except OSError as e:
+                logging.error(f"Latency dump to {self.dump_path} failed: {e}")
+
+
+LATENCY = LatencyRecorder()
+
+
+def load_latency(config):
+    """Configures the shared recorder from the `latency:` config section."""
+    latency_cfg = config.get('latency', {})
+    LATENCY.configure(enabled=latency_cfg.get('enabled', True), dump_path=latency_cfg.get('dump_path'))
+    return LATENCY
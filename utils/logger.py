@@ -1 +1,154 @@
 # Logging configuration
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else came in through `extra=` and is
+# written as a structured field
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "suppressed"}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: time, level, logger, call site, the formatted
+    message and its raw arguments, plus any `extra=` fields and the number of
+    earlier records from the same call site that were rate limited.
+    """
+
+    def format(self, record):
+        event = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "site": f"{record.module}:{record.lineno}",
+            "msg": record.getMessage(),
+        }
+        if record.args:
+            event["args"] = record.args if isinstance(record.args, dict) else list(record.args)
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                event[key] = value
+        if getattr(record, "suppressed", 0):
+            event["suppressed"] = record.suppressed
+        if record.exc_info:
+            event["exc"] = self.formatException(record.exc_info)
+        return json.dumps(event, default=str, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Per-call-site token bucket plus per-module sampling for records below
+    WARNING; warnings and errors always pass. A passed record carries the
+    number of records its call site dropped since the last one in `suppressed`.
+    """
+
+    def __init__(self, rate=10.0, burst=20, sample=None, clock=time.monotonic, rng=random.random):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.sample = dict(sample or {})
+        self.clock = clock
+        self.rng = rng
+        self.sites = {}  # (pathname, lineno) -> [tokens, last refill, suppressed]
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        key = (record.pathname, record.lineno)
+        site = self.sites.get(key)
+        now = self.clock()
+        if site is None:
+            site = self.sites[key] = [float(self.burst), now, 0]
+        else:
+            site[0] = min(self.burst, site[0] + (now - site[1]) * self.rate)
+            site[1] = now
+        sample = self.sample.get(record.module)
+        if site[0] < 1.0 or (sample is not None and self.rng() >= sample):
+            site[2] += 1
+            return False
+        site[0] -= 1.0
+        if site[2]:
+            record.suppressed = site[2]
+            site[2] = 0
+        return True
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    Enqueues records as they are: the message is formatted by the listener
+    thread, not the caller. Arguments are read when the record is written, so
+    pass values, not objects that are mutated afterwards.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class _Listener(QueueListener):
+    def stop(self):
+        # Stopped explicitly and again at exit
+        if self._thread is not None:
+            super().stop()
+
+
+def start_queue_logging(level, handlers, rate_limit=None):
+    """
+    Routes the root logger through a queue to `handlers`, which run on a
+    background listener thread. Returns the started `QueueListener`.
+    """
+    log_queue = queue.SimpleQueue()
+    handler = LazyQueueHandler(log_queue)
+    if rate_limit is not None:
+        handler.addFilter(rate_limit)
+
+    logger = logging.getLogger()
+    for old in list(logger.handlers):
+        logger.removeHandler(old)
+    logger.setLevel(level)
+    logger.addHandler(handler)
+
+    listener = _Listener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+def rate_limit_from_config(log_cfg):
+    limit_cfg = log_cfg.get('rate_limit', {})
+    if not limit_cfg.get('enabled', True):
+        return None
+    return RateLimitFilter(rate=limit_cfg.get('per_site_per_s', 10.0), burst=limit_cfg.get('burst', 20),
+                           sample=limit_cfg.get('sample'))
+
+
+def setup_logging(config):
+    """
+    File (JSON lines by default, rotated at midnight) and console output,
+    written from a background thread with per-call-site rate limiting.
+    """
+    log_cfg = config['logging']
+    log_level = getattr(logging, log_cfg['level'].upper(), logging.INFO)
+    log_file = log_cfg['log_file_path']
+
+    # Create logs directory if it doesn't exist
+    os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+
+    text = logging.Formatter(TEXT_FORMAT)
+    handlers = []
+    if log_cfg.get('log_to_file', True):
+        file_handler = TimedRotatingFileHandler(log_file, when="midnight", interval=1, backupCount=log_cfg['backup_count'])
+        file_handler.setFormatter(JsonFormatter() if log_cfg.get('format', 'json') == 'json' else text)
+        handlers.append(file_handler)
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(text)
+    handlers.append(console_handler)
+
+    return start_queue_logging(log_level, handlers, rate_limit_from_config(log_cfg))
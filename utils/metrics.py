@@ -0,0 +1,222 @@
+import logging
+import os
+import threading
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Counter:
+    """Monotonic value. `inc` is a plain attribute add: no lock, no allocation."""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class Gauge(Counter):
+    __slots__ = ()
+
+    def set(self, value):
+        self.value = value
+
+    def dec(self, amount=1):
+        self.value -= amount
+
+
+_KINDS = {"counter": Counter, "gauge": Gauge}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value):
+    if value is None:
+        return "NaN"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Family:
+    __slots__ = ("name", "kind", "help", "children")
+
+    def __init__(self, name, kind, help_text):
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.children = {}  # sorted label items -> metric
+
+
+class MetricsRegistry:
+    """
+    Counters and gauges rendered in the Prometheus text format.
+
+    Hot-path code binds its metric objects once (`counter(...)` / `gauge(...)`
+    with fixed labels) and then only updates their `value`. Registration and
+    rendering take a lock; updates never do. Values that are cheap to read but
+    wasteful to push per tick are refreshed by `on_collect` hooks, which run just
+    before each render.
+    """
+
+    def __init__(self):
+        self._families = {}
+        self._hooks = []
+        self._lock = threading.Lock()
+
+    def _metric(self, kind, name, help_text, labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = self._families[name] = _Family(name, kind, help_text)
+            elif family.kind != kind:
+                raise ValueError(f"Metric {name} is already registered as a {family.kind}")
+            metric = family.children.get(key)
+            if metric is None:
+                metric = family.children[key] = _KINDS[kind]()
+            return metric
+
+    def counter(self, name, help_text="", **labels):
+        return self._metric("counter", name, help_text, labels)
+
+    def gauge(self, name, help_text="", **labels):
+        return self._metric("gauge", name, help_text, labels)
+
+    def on_collect(self, hook):
+        """Registers `hook()` to run before every render, e.g. to refresh gauges."""
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook):
+        if hook in self._hooks:
+            self._hooks.remove(hook)
+
+    def collect(self):
+        for hook in list(self._hooks):
+            try:
+                hook()
+            except Exception as e:
+                logging.error(f"Metrics hook {getattr(hook, '__name__', hook)} failed: {e}")
+
+    def samples(self):
+        """`[(name, kind, help, labels, value)]` for every metric, e.g. to ship to another process."""
+        with self._lock:
+            return [(f.name, f.kind, f.help, dict(key), m.value)
+                    for f in self._families.values() for key, m in f.children.items()]
+
+    def load_samples(self, samples):
+        """Sets metrics to values collected elsewhere (see `samples`), registering them as needed."""
+        for name, kind, help_text, labels, value in samples:
+            self._metric(kind, name, help_text, labels).value = value
+
+    def render(self):
+        self.collect()
+        lines = []
+        with self._lock:
+            for family in sorted(self._families.values(), key=lambda f: f.name):
+                if family.help:
+                    lines.append(f"# HELP {family.name} {_escape(family.help)}")
+                lines.append(f"# TYPE {family.name} {family.kind}")
+                for key, metric in sorted(family.children.items()):
+                    labels = ",".join(f'{k}="{_escape(v)}"' for k, v in key)
+                    name = f"{family.name}{{{labels}}}" if labels else family.name
+                    lines.append(f"{name} {_format_value(metric.value)}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+
+def _handler_for(registry):
+    # http.server is only imported when the endpoint is enabled
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetricsHandler
+
+
+class MetricsExporter:
+    """
+    Publishes a registry as a Prometheus text file (for node_exporter's textfile
+    collector) and/or on a local HTTP endpoint. The file is rewritten every
+    `interval_s` by a writer thread and HTTP scrapes render on a server thread,
+    so exporting never runs on the trading thread.
+    """
+
+    def __init__(self, registry=METRICS, textfile=None, interval_s=15.0, http_port=0, http_host="127.0.0.1"):
+        self.registry = registry
+        self.textfile = textfile
+        self.interval_s = interval_s
+        self.http_port = http_port
+        self.http_host = http_host
+        self.server = None
+        self._writer = None
+        self._stop = threading.Event()
+
+    @classmethod
+    def from_config(cls, config, registry=METRICS):
+        metrics_cfg = config.get('metrics', {})
+        if not metrics_cfg.get('enabled', True):
+            return None
+        return cls(registry, textfile=metrics_cfg.get('textfile') or None, interval_s=metrics_cfg.get('interval_s', 15),
+                   http_port=metrics_cfg.get('http_port', 0), http_host=metrics_cfg.get('http_host', "127.0.0.1"))
+
+    def start(self):
+        if self.http_port:
+            from http.server import ThreadingHTTPServer
+            self.server = ThreadingHTTPServer((self.http_host, self.http_port), _handler_for(self.registry))
+            self.server.daemon_threads = True
+            threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True).start()
+            logging.info(f"Serving metrics on http://{self.http_host}:{self.server.server_address[1]}/metrics")
+        if self.textfile:
+            self._stop.clear()
+            self._writer = threading.Thread(target=self._run_writer, name="metrics-textfile", daemon=True)
+            self._writer.start()
+        return self
+
+    def _run_writer(self):
+        while True:
+            self.write()
+            if self._stop.wait(self.interval_s):
+                return
+
+    def write(self):
+        """Atomic rewrite, so a collector never reads a half-written file."""
+        tmp = f"{self.textfile}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.textfile) or ".", exist_ok=True)
+            with open(tmp, "w") as f:
+                f.write(self.registry.render())
+            os.replace(tmp, self.textfile)
+        except OSError as e:
+            logging.error(f"Metrics write to {self.textfile} failed: {e}")
+
+    def stop(self):
+        if self._writer is not None:
+            self._stop.set()
+            self._writer.join(timeout=5.0)
+            self._writer = None
+        if self.textfile:
+            self.write()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
@@ -1,20 +1,170 @@
-from datetime import datetime, timedelta
+import csv
+import json
 import logging
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+
+IMPACT_LEVELS = {"holiday": 0, "low": 1, "medium": 2, "high": 3}
+
+
+def _parse_time(value):
+    """Calendar times are UTC; naive datetimes are taken as UTC, as in `time_utils`."""
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        dt = datetime.fromisoformat(str(value).strip())
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def _parse_impact(value):
+    if isinstance(value, int):
+        return value
+    value = str(value).strip().lower()
+    return int(value) if value.isdigit() else IMPACT_LEVELS.get(value, 0)
+
+
+def symbol_currencies(symbol):
+    """Currencies a symbol is exposed to, e.g. EURUSD -> {"EUR", "USD"}."""
+    return {symbol[:3].upper(), symbol[3:6].upper()} if symbol and len(symbol) >= 6 else set()
+
+
+class BlackoutIndex:
+    """
+    Merged, sorted blackout intervals. Lookups bisect the start times, so they
+    stay O(log n) however much calendar history is loaded.
+    """
+
+    def __init__(self, windows=()):
+        self.starts = []
+        self.ends = []
+        for start, end in sorted(windows):
+            if self.ends and start <= self.ends[-1]:
+                if end > self.ends[-1]:
+                    self.ends[-1] = end
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def is_active(self, dt):
+        i = bisect_right(self.starts, dt) - 1
+        return i >= 0 and dt <= self.ends[i]
+
+    def mask(self, timestamps):
+        """Boolean array, True where a timestamp falls inside a blackout window."""
+        # Per-tick checks use `is_active`; numpy is imported only when a whole series is masked
+        import numpy as np
+        ts = np.asarray([_parse_time(t) for t in timestamps], dtype="datetime64[us]")
+        if not self.starts:
+            return np.zeros(len(ts), dtype=bool)
+        starts = np.asarray(self.starts, dtype="datetime64[us]")
+        ends = np.asarray(self.ends, dtype="datetime64[us]")
+        i = np.searchsorted(starts, ts, side="right") - 1
+        return (i >= 0) & (ts <= ends[np.maximum(i, 0)])
+
+
+class EconomicCalendar:
+    """
+    Scheduled economic events tagged with currency and impact, bulk-imported
+    from a CSV (`time,currency,impact,title` header) or JSON list of the same
+    fields. Events without a currency apply to every symbol.
+    """
+
+    def __init__(self, before_minutes=15, after_minutes=15, min_impact="high"):
+        self.events = []  # (time, currency, impact, title)
+        self.before_minutes = before_minutes
+        self.after_minutes = after_minutes
+        self.min_impact = _parse_impact(min_impact)
+        self.version = 0  # bumped on every change so filters know to rebuild their index
+
+    def configure(self, before_minutes=15, after_minutes=15, min_impact="high"):
+        self.before_minutes = before_minutes
+        self.after_minutes = after_minutes
+        self.min_impact = _parse_impact(min_impact)
+        self.version += 1
+
+    def add_event(self, event_time, currency="", impact="high", title=""):
+        self.events.append((_parse_time(event_time), currency.upper(), _parse_impact(impact), title))
+        self.version += 1
+
+    def load_file(self, path):
+        """Imports every event in a CSV or JSON calendar file; returns the number loaded."""
+        with open(path, 'r', newline='') as f:
+            if path.lower().endswith(".json"):
+                rows = json.load(f)
+                if isinstance(rows, dict):
+                    rows = rows.get("events", [])
+            else:
+                rows = list(csv.DictReader(f))
+
+        for row in rows:
+            self.events.append((
+                _parse_time(row["time"]),
+                (row.get("currency") or "").strip().upper(),
+                _parse_impact(row.get("impact") or "high"),
+                row.get("title") or "",
+            ))
+        self.version += 1
+        return len(rows)
+
+    def blackouts(self, currencies=None, before_minutes=None, after_minutes=None, min_impact=None):
+        """Builds the blackout index for events matching `currencies` and the impact floor."""
+        before = timedelta(minutes=self.before_minutes if before_minutes is None else before_minutes)
+        after = timedelta(minutes=self.after_minutes if after_minutes is None else after_minutes)
+        floor = self.min_impact if min_impact is None else _parse_impact(min_impact)
+        return BlackoutIndex(
+            (event_time - before, event_time + after)
+            for event_time, currency, impact, _ in self.events
+            if impact >= floor and (not currency or currencies is None or currency in currencies)
+        )
+
+
+CALENDAR = EconomicCalendar()
+
+
+def load_calendar(config):
+    """Loads the configured calendar file into the shared calendar; returns the event count."""
+    news = config.get('news', {})
+    CALENDAR.configure(
+        before_minutes=news.get('before_minutes', 15),
+        after_minutes=news.get('after_minutes', 15),
+        min_impact=news.get('min_impact', 'high'),
+    )
+    path = news.get('calendar_file')
+    if not path:
+        return 0
+    count = CALENDAR.load_file(path)
+    logging.info(f"Loaded {count} calendar events from {path}")
+    return count
+
 
 class NewsFilter:
-    def __init__(self, buffer_minutes=15):
+    def __init__(self, buffer_minutes=None, symbol=None, calendar=None):
         self.buffer_minutes = buffer_minutes
-        self.news_events = []
+        self.currencies = symbol_currencies(symbol) if symbol else None
+        self.calendar = calendar if calendar is not None else CALENDAR
+        self._index = None
+        self._version = None
+
+    @property
+    def index(self):
+        """Blackout index for this filter's currencies, rebuilt only when the calendar changes."""
+        if self._version != self.calendar.version:
+            self._index = self.calendar.blackouts(self.currencies, self.buffer_minutes, self.buffer_minutes)
+            self._version = self.calendar.version
+        return self._index
 
     def is_news_active(self, current_time=None):
         if current_time is None:
-            current_time = datetime.now()
-        for event_time in self.news_events:
-            start_block = event_time - timedelta(minutes=self.buffer_minutes)
-            end_block = event_time + timedelta(minutes=self.buffer_minutes)
-            if start_block <= current_time <= end_block:
-                return True
-        return False
-
-    def add_event(self, event_time):
-        self.news_events.append(event_time)
+            current_time = datetime.now(timezone.utc)
+        return self.index.is_active(_parse_time(current_time))
+
+    def mask(self, timestamps):
+        return self.index.mask(timestamps)
+
+    def add_event(self, event_time, currency="", impact="high"):
+        self.calendar.add_event(event_time, currency, impact)
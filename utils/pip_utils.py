@@ -1,12 +1,13 @@
+from utils.symbol_spec import get_spec
+
+
+# Convenience wrappers for one-off conversions (reports, logging). Hot paths
+# should hold a SymbolSpec and precompute their thresholds in price units.
 def get_pip_value(symbol: str) -> float:
-    if "JPY" in symbol:
-        return 0.01
-    if "XAU" in symbol:
-        return 0.1  # IC Markets Gold pip is 0.1
-    return 0.0001
+    return get_spec(symbol).pip
 
 def price_to_pips(price_diff: float, symbol: str = "EURUSD") -> float:
-    return price_diff / get_pip_value(symbol)
+    return price_diff / get_spec(symbol).pip
 
 def pips_to_price(pips: float, symbol: str = "EURUSD") -> float:
-    return pips * get_pip_value(symbol)
+    return pips * get_spec(symbol).pip
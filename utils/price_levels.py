@@ -0,0 +1,124 @@
+import bisect
+import heapq
+
+ABOVE = "ABOVE"  # fires when price >= level
+BELOW = "BELOW"  # fires when price <= level
+
+
+class PriceLevelIndex:
+    """
+    Armed price levels for a single price feed (bid or ask), kept sorted per side
+    so that each price update only compares against the nearest level on each side.
+
+    Both sides are stored as ascending lists with the level closest to the market
+    at the end: ABOVE levels under their negated price, BELOW levels as-is.
+    Crossed levels are disarmed before their callbacks run, so a callback may
+    re-arm a level without it firing again on the same price.
+    """
+
+    def __init__(self):
+        self._above = []
+        self._below = []
+        self._entries = {}  # key -> (side, sort entry)
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def arm(self, key, price, side, callback):
+        """Arms `callback(key, price)` to fire once when the feed crosses `price`."""
+        if key in self._entries:
+            self.disarm(key)
+        self._seq += 1
+        if side == ABOVE:
+            entry = (-price, self._seq, key, callback)
+            bisect.insort(self._above, entry)
+        else:
+            entry = (price, self._seq, key, callback)
+            bisect.insort(self._below, entry)
+        self._entries[key] = (side, entry)
+
+    def disarm(self, key):
+        found = self._entries.pop(key, None)
+        if found is None:
+            return False
+        side, entry = found
+        levels = self._above if side == ABOVE else self._below
+        i = bisect.bisect_left(levels, entry[:2])
+        del levels[i]
+        return True
+
+    def nearest(self, side):
+        """Closest armed level on `side`, or None."""
+        if side == ABOVE:
+            return -self._above[-1][0] if self._above else None
+        return self._below[-1][0] if self._below else None
+
+    def check(self, price):
+        """Fires every level crossed by `price`. Returns the number fired."""
+        fired = None
+        above = self._above
+        while above and price >= -above[-1][0]:
+            entry = above.pop()
+            del self._entries[entry[2]]
+            if fired is None:
+                fired = []
+            fired.append((entry[2], -entry[0], entry[3]))
+
+        below = self._below
+        while below and price <= below[-1][0]:
+            entry = below.pop()
+            del self._entries[entry[2]]
+            if fired is None:
+                fired = []
+            fired.append((entry[2], entry[0], entry[3]))
+
+        if fired is None:
+            return 0
+        for key, level, callback in fired:
+            callback(key, level)
+        return len(fired)
+
+
+class DeadlineQueue:
+    """
+    Time stops keyed by a monotonically increasing counter (candles elapsed,
+    timestamps, ...). Cancelled entries are dropped lazily when they reach the head.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._live = {}  # key -> seq of the armed entry
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._live)
+
+    def __contains__(self, key):
+        return key in self._live
+
+    def arm(self, key, deadline, callback):
+        self._seq += 1
+        self._live[key] = self._seq
+        heapq.heappush(self._heap, (deadline, self._seq, key, callback))
+
+    def disarm(self, key):
+        return self._live.pop(key, None) is not None
+
+    def advance(self, now):
+        """Fires every entry whose deadline is <= `now`. Returns the number fired."""
+        heap = self._heap
+        if not heap or heap[0][0] > now:
+            return 0
+        due = []
+        while heap and heap[0][0] <= now:
+            deadline, seq, key, callback = heapq.heappop(heap)
+            if self._live.get(key) == seq:
+                del self._live[key]
+                due.append((key, deadline, callback))
+        for key, deadline, callback in due:
+            callback(key, deadline)
+        return len(due)
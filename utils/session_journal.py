@@ -0,0 +1,188 @@
+import logging
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from datetime import datetime
+
+# File layout: magic | format version (uint16) | created_at (float64, unix time) | flags (uint8),
+# then frames of length (uint32) | pickled (optionally zlib-compressed) list of records.
+# A record is `(wall_ns, kind, symbol, data)`.
+JOURNAL_MAGIC = b"VOLJRNL\x00"
+JOURNAL_VERSION = 1
+COMPRESSED = 1
+_HEADER = struct.Struct("<8sHdB")
+_FRAME = struct.Struct("<I")
+
+# What the strategy decided; `scripts/replay_journal.py` diffs these
+DECISIONS = ("candle", "indicators", "transition", "signal")
+
+
+class SessionJournal:
+    """
+    Append-only binary record of one process's run: the session's config and
+    symbol specs, each pipeline's starting state, then every ingested tick,
+    repeated quote, candle, indicator snapshot, state transition, signal and
+    broker response in the order they happened.
+
+    `record()` only appends a tuple to a deque. A background thread drains it
+    every `flush_interval_s`, then pickles, compresses and writes the batch as
+    one frame. Records are pickled after the call returns, so pass data that
+    is not mutated afterwards. A crash loses at most the last interval; a
+    truncated final frame is skipped when reading.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self.records = 0
+        self.bytes = 0
+        self._pending = deque()
+        self._append = self._pending.append
+        self._file = None
+        self._compress = True
+        self._stop = threading.Event()
+        self._thread = None
+
+    def record(self, kind, symbol, data=None):
+        self._append((time.time_ns(), kind, symbol, data))
+
+    def open(self, path, config=None, pipelines=(), flush_interval_s=0.25, compress=True):
+        """Starts a new journal file with the session record and the pipelines' starting state."""
+        self.close()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "wb")
+        self._file.write(_HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION, time.time(), COMPRESSED if compress else 0))
+        self._compress = compress
+        self.path = path
+        self.records = self.bytes = 0
+        self._pending.clear()
+        self.enabled = True
+        self.record("session", None, {
+            # Credentials stay out of the journal
+            "config": {key: value for key, value in (config or {}).items() if key != 'mt5'},
+            "specs": [p.spec.to_dict() for p in pipelines],
+            "pid": os.getpid(),
+        })
+        self.snapshot(pipelines)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(flush_interval_s,), name="session-journal", daemon=True)
+        self._thread.start()
+        return self
+
+    def capture(self):
+        """Keeps records in memory instead of writing them; returns the list they go to."""
+        self.close()
+        captured = []
+        self._append = captured.append
+        self.enabled = True
+        return captured
+
+    def snapshot(self, pipelines):
+        """Records each pipeline's full state, which a replay starts from."""
+        for pipeline in pipelines:
+            # get_state() shares lists the strategy keeps mutating (e.g. the pullback candles), and the
+            # writer thread pickles later; freeze the state as of now
+            state = pickle.loads(pickle.dumps(pipeline.get_state(), protocol=pickle.HIGHEST_PROTOCOL))
+            self.record("state", pipeline.symbol, state)
+
+    def _run(self, interval):
+        while not self._stop.wait(interval):
+            self._write()
+        self._write()
+
+    def _write(self):
+        pending = self._pending
+        count = len(pending)
+        if not count:
+            return
+        batch = [pending.popleft() for _ in range(count)]
+        payload = pickle.dumps(batch, protocol=pickle.HIGHEST_PROTOCOL)
+        if self._compress:
+            payload = zlib.compress(payload, 1)
+        try:
+            self._file.write(_FRAME.pack(len(payload)))
+            self._file.write(payload)
+            self._file.flush()
+        except (OSError, ValueError) as e:
+            logging.error(f"Session journal write to {self.path} failed: {e}")
+            return
+        self.records += count
+        self.bytes += _FRAME.size + len(payload)
+
+    def close(self):
+        self.enabled = False
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            logging.info(f"Session journal {self.path}: {self.records} records, {self.bytes / 1e6:.1f} MB")
+        self._pending.clear()
+        self._append = self._pending.append
+
+
+JOURNAL = SessionJournal()
+
+
+def read_journal(path):
+    """Yields the records of a journal file in order. Stops quietly at a truncated final frame."""
+    with open(path, "rb") as f:
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError(f"{path}: truncated header")
+        magic, version, _, flags = _HEADER.unpack(header)
+        if magic != JOURNAL_MAGIC:
+            raise ValueError(f"{path}: not a session journal")
+        if version != JOURNAL_VERSION:
+            raise ValueError(f"{path}: format version {version} != {JOURNAL_VERSION}")
+        while True:
+            head = f.read(_FRAME.size)
+            if len(head) < _FRAME.size:
+                return
+            payload = f.read(_FRAME.unpack(head)[0])
+            try:
+                if flags & COMPRESSED:
+                    payload = zlib.decompress(payload)
+                batch = pickle.loads(payload)
+            except (zlib.error, pickle.UnpicklingError, EOFError) as e:
+                logging.warning(f"{path}: stopping at unreadable frame ({e})")
+                return
+            yield from batch
+
+
+def _prune(directory, keep):
+    files = sorted((os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".bin")),
+                   key=os.path.getmtime)
+    for path in files[:max(0, len(files) - keep)]:
+        try:
+            os.remove(path)
+        except OSError as e:
+            logging.warning(f"Could not remove old journal {path}: {e}")
+
+
+def load_journal(config, name="main", pipelines=()):
+    """
+    Opens a new journal file `<dir>/<name>-<start time>-<pid>.bin` from the `journal:`
+    config section, after removing the oldest files beyond `keep_files`.
+    """
+    journal_cfg = config.get('journal', {})
+    if not journal_cfg.get('enabled', False):
+        return JOURNAL
+    directory = journal_cfg.get('dir', 'logs/journal')
+    try:
+        os.makedirs(directory, exist_ok=True)
+        _prune(directory, max(0, journal_cfg.get('keep_files', 50) - 1))
+        path = os.path.join(directory, f"{name}-{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}.bin")
+        JOURNAL.open(path, config, pipelines, flush_interval_s=journal_cfg.get('flush_interval_s', 0.25),
+                     compress=journal_cfg.get('compress', True))
+    except OSError as e:
+        logging.error(f"Session journal disabled: {e}")
+        return JOURNAL
+    logging.info(f"Recording session journal to {path}")
+    return JOURNAL
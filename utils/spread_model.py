@@ -0,0 +1,190 @@
+import math
+from utils.symbol_spec import get_spec
+
+
+class SpreadModel:
+    """
+    Rolling spread distribution for one symbol, used as the spread gate.
+
+    Spreads are quantized to the symbol's point and counted in a Fenwick tree
+    over the last `window` accepted ticks, so recording a tick and asking
+    "is this spread above the rolling percentile" are both O(log n).
+
+    A tick is rejected when it is wider than the absolute cap, or, once
+    `min_samples` ticks have been seen, wider than the `percentile` of the
+    window. Ticks over the cap are not recorded, so spikes don't drag the
+    percentile up. `percentile=100` leaves only the cap.
+    """
+
+    def __init__(self, spec=None, max_spread_pips=0.8, percentile=95.0, window=2000, min_samples=200, max_tracked_pips=20.0):
+        self.spec = spec or get_spec()
+        self.max_spread_pips = max_spread_pips
+        self.percentile = percentile
+        self.window = window
+        self.min_samples = min_samples
+        self.cap = self.spec.pips_to_price(max_spread_pips)
+        self.resolution = self.spec.point
+        self.buckets = int(round(self.spec.pips_to_price(max(max_tracked_pips, max_spread_pips)) / self.resolution)) + 1
+        self.reset()
+
+    @classmethod
+    def from_config(cls, spec, config):
+        gate = config.get('spread_filter', {})
+        return cls(
+            spec,
+            max_spread_pips=config['trading'].get('max_spread_pips', 0.8),
+            percentile=gate.get('percentile', 95.0),
+            window=gate.get('window', 2000),
+            min_samples=gate.get('min_samples', 200),
+        )
+
+    def reset(self):
+        self.tree = [0] * (self.buckets + 1)
+        self.recent = [0] * self.window  # ring of bucket indices, oldest overwritten first
+        self.count = 0
+        self.total = 0
+        self.k = 1  # rank of the percentile within the current window
+        self.rejects = 0
+
+    def _bucket(self, spread):
+        q = int(spread / self.resolution + 0.5)
+        if q < 0:
+            return 0
+        return q if q < self.buckets else self.buckets - 1
+
+    def _add(self, q, delta):
+        tree = self.tree
+        i = q + 1
+        n = self.buckets
+        while i <= n:
+            tree[i] += delta
+            i += i & -i
+
+    def _count_below(self, q):
+        """Ticks in the window with a bucket strictly below `q`."""
+        tree = self.tree
+        total = 0
+        i = q
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def update(self, spread):
+        """Records a tick's spread and returns whether the gate accepts it."""
+        if spread > self.cap:
+            self.rejects += 1
+            return False
+        q = self._bucket(spread)
+        slot = self.total % self.window
+        if self.count == self.window:
+            self._add(self.recent[slot], -1)
+        else:
+            self.count += 1
+            self.k = max(1, math.ceil(self.percentile * self.count / 100.0))
+        self.recent[slot] = q
+        self.total += 1
+        self._add(q, 1)
+
+        if self.count >= self.min_samples and self._count_below(q) >= self.k:
+            self.rejects += 1
+            return False
+        return True
+
+    def allows(self, spread):
+        """Gate decision for `spread` against the current window, without recording it."""
+        if spread > self.cap:
+            return False
+        return self.count < self.min_samples or self._count_below(self._bucket(spread)) < self.k
+
+    def quantile(self, percentile):
+        """Spread at the given percentile of the window, to the symbol's point."""
+        if not self.count:
+            return None
+        k = max(1, math.ceil(percentile * self.count / 100.0))
+        # Fenwick descent to the first bucket whose prefix count reaches k
+        pos = 0
+        step = 1 << self.buckets.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= self.buckets and self.tree[nxt] < k:
+                pos = nxt
+                k -= self.tree[nxt]
+            step >>= 1
+        return pos * self.resolution
+
+    def threshold(self):
+        """Spread above which ticks are currently rejected, in price units."""
+        if self.count < self.min_samples:
+            return self.cap
+        return min(self.cap, self.quantile(self.percentile))
+
+    def seed(self, spreads):
+        """Loads the window a streaming run over `spreads` would end with."""
+        self.reset()
+        kept = [s for s in spreads if s <= self.cap]
+        start = max(0, len(kept) - self.window)
+        for j in range(start, len(kept)):
+            q = self._bucket(kept[j])
+            self.recent[j % self.window] = q
+            self._add(q, 1)
+        self.total = len(kept)
+        self.count = len(kept) - start
+        if self.count:
+            self.k = max(1, math.ceil(self.percentile * self.count / 100.0))
+
+    def get_state(self):
+        # Oldest first, so the window can be rebuilt under a different ring alignment
+        start = self.total - self.count
+        return {"window": [self.recent[j % self.window] for j in range(start, self.total)]}
+
+    def load_state(self, state):
+        self.reset()
+        for q in state["window"][-self.window:]:
+            self.recent[self.total % self.window] = q
+            self.total += 1
+            self._add(q, 1)
+        self.count = self.total
+        if self.count:
+            self.k = max(1, math.ceil(self.percentile * self.count / 100.0))
+
+    def mask(self, spreads):
+        """
+        Vectorized gate over an array of spreads, as `update` would answer when
+        fed them in order starting from an empty window.
+        """
+        # Used by warm start and the backtest, not per tick; the live loop loads numpy only when it warm-starts
+        import numpy as np
+        spreads = np.asarray(spreads, dtype=np.float64)
+        keep = spreads <= self.cap
+        kept = spreads[keep]
+        q = np.clip((kept / self.resolution + 0.5).astype(np.int64), 0, self.buckets - 1)
+        n = len(q)
+        count = np.minimum(np.arange(1, n + 1), self.window)
+        k = np.maximum(1, np.ceil(self.percentile * count / 100.0)).astype(np.int64)
+
+        # Rolling count of window entries strictly below each tick's bucket,
+        # accumulated one distinct bucket at a time
+        below = np.zeros(n, dtype=np.int64)
+        for value in np.unique(q)[:-1]:
+            seen = np.cumsum(q == value)
+            in_window = seen.copy()
+            in_window[self.window:] -= seen[:-self.window]
+            below += np.where(q > value, in_window, 0)
+
+        accepted = ~((count >= self.min_samples) & (below >= k))
+        result = np.zeros(len(spreads), dtype=bool)
+        result[keep] = accepted
+        return result
+
+    def snapshot(self):
+        """Model state for the dashboard, in pips."""
+        to_pips = self.spec.price_to_pips
+        median = self.quantile(50.0)
+        return {
+            "samples": self.count,
+            "median_pips": to_pips(median) if median is not None else None,
+            "threshold_pips": to_pips(self.threshold()),
+            "cap_pips": self.max_spread_pips,
+            "rejects": self.rejects,
+        }
@@ -0,0 +1,118 @@
+import logging
+import yaml
+
+
+def _guess_pip(symbol):
+    """Naming-convention fallback for symbols without broker or file metadata."""
+    if "JPY" in symbol:
+        return 0.01
+    if "XAU" in symbol:
+        return 0.1  # IC Markets Gold pip is 0.1
+    return 0.0001
+
+
+def _derive_pip(symbol, digits, point):
+    if "XAU" in symbol:
+        return 0.1
+    # 3/5-digit quotes carry a fractional pip
+    return round(point * 10, 10) if digits in (3, 5) else point
+
+
+class SymbolSpec:
+    """
+    Contract metadata for one symbol. Strategy components convert their pip
+    parameters into price units with it once, at construction.
+    """
+
+    __slots__ = ("symbol", "digits", "point", "pip", "tick_size", "tick_value", "stops_level")
+
+    def __init__(self, symbol, digits, point, pip=None, tick_size=None, tick_value=None, stops_level=0):
+        self.symbol = symbol
+        self.digits = digits
+        self.point = point
+        self.pip = pip if pip is not None else _derive_pip(symbol, digits, point)
+        self.tick_size = tick_size if tick_size is not None else point
+        self.tick_value = tick_value
+        self.stops_level = stops_level  # minimum SL/TP distance in points
+
+    @classmethod
+    def guess(cls, symbol):
+        pip = _guess_pip(symbol)
+        digits, point = {0.01: (3, 0.001), 0.1: (2, 0.01)}.get(pip, (5, 0.00001))
+        return cls(symbol, digits, point, pip=pip)
+
+    @classmethod
+    def from_symbol_info(cls, symbol, info):
+        """Builds a spec from the broker's `get_symbol_info` dict."""
+        return cls(
+            symbol,
+            digits=info["digits"],
+            point=info["point"],
+            tick_size=info.get("tick_size"),
+            tick_value=info.get("tick_value"),
+            stops_level=info.get("stops_level", 0),
+        )
+
+    def pips_to_price(self, pips):
+        return pips * self.pip
+
+    def price_to_pips(self, price_diff):
+        return price_diff / self.pip
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+class SymbolSpecRegistry:
+    """
+    Specs by symbol, loaded once at startup from the broker or a local YAML/JSON
+    file. Unknown symbols fall back to a naming-convention guess (logged once).
+    """
+
+    def __init__(self):
+        self.specs = {}
+
+    def register(self, spec):
+        self.specs[spec.symbol] = spec
+        return spec
+
+    def get(self, symbol):
+        spec = self.specs.get(symbol)
+        if spec is None:
+            spec = self.register(SymbolSpec.guess(symbol))
+            if symbol != "EURUSD":
+                logging.warning(f"No symbol spec for {symbol}; guessed pip size {spec.pip}")
+        return spec
+
+    def load_file(self, path):
+        """
+        Loads `{symbol: {digits, point, ...}}` entries; `pip` may be given explicitly.
+        Returns the number of specs loaded.
+        """
+        with open(path, 'r') as f:
+            entries = yaml.safe_load(f) or {}
+        for symbol, fields in entries.items():
+            self.register(SymbolSpec(symbol, **fields))
+        return len(entries)
+
+    def load_from_broker(self, broker, symbols):
+        """Queries the broker's symbol metadata; returns the symbols it couldn't describe."""
+        missing = []
+        for symbol in symbols:
+            info = broker.get_symbol_info(symbol)
+            if info is None:
+                missing.append(symbol)
+                continue
+            self.register(SymbolSpec.from_symbol_info(symbol, info))
+        return missing
+
+
+SPECS = SymbolSpecRegistry()
+
+
+def get_spec(symbol="EURUSD"):
+    return SPECS.get(symbol)
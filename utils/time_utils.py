@@ -1,4 +1,15 @@
 from datetime import datetime, time, timedelta, timezone  # ✅ FIXED: Added timezone import
+from zoneinfo import ZoneInfo
+
+IST = timezone(timedelta(hours=5, minutes=30))
+_EPS = timedelta(microseconds=1)
+
+# Venue-local session hours. In winter they match the original IST windows
+# (London 12:30-16:30, New York 18:30-21:30); in summer they follow each venue's DST.
+DEFAULT_SESSIONS = {
+    "london": {"timezone": "Europe/London", "start": "07:00", "end": "11:00"},
+    "new_york": {"timezone": "America/New_York", "start": "08:00", "end": "11:00"},
+}
 
 def get_ist_time(dt=None):
     """
@@ -12,25 +23,115 @@ def get_ist_time(dt=None):
     if dt.tzinfo is None:
         dt = dt.replace(tzinfo=timezone.utc)
 
-    return dt.astimezone(timezone(timedelta(hours=5, minutes=30)))
+    return dt.astimezone(IST)
 
-def is_session_active(dt=None) -> bool:
+def _to_utc_naive(dt):
+    if dt is None:
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+    if dt.tzinfo is not None:
+        return dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+class SessionCalendar:
     """
-    Check if given datetime (or current time) falls within tradeable sessions.
-    
-    Trading Sessions (IST):
-    - London: 12:30 - 16:30
-    - New York: 18:30 - 21:30
+    DST-aware trading sessions per venue, resolved to naive-UTC intervals
+    (naive datetimes are treated as UTC throughout). Session ends are inclusive.
+
+    The segment around the last lookup (an open session, or the gap to the next
+    one) is cached, so repeated checks and `next_transition` are O(1) until the
+    next open/close.
     """
-    now_ist = get_ist_time(dt).time()
 
-    london_start = time(12, 30)
-    london_end = time(16, 30)
+    def __init__(self, sessions=None):
+        self.configure(sessions)
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config.get('sessions'))
+
+    def configure(self, sessions=None):
+        self.sessions = [
+            (name, ZoneInfo(spec["timezone"]), time.fromisoformat(spec["start"]), time.fromisoformat(spec["end"]))
+            for name, spec in (sessions or DEFAULT_SESSIONS).items()
+        ]
+        self._lo = self._hi = None
+        self._active = False
+
+    def intervals(self, first_day, last_day):
+        """Merged half-open UTC intervals `[open, close + 1us)` for local dates in the range."""
+        windows = []
+        day = first_day - timedelta(days=1)
+        while day <= last_day + timedelta(days=1):
+            for _, tz, start, end in self.sessions:
+                open_utc = datetime.combine(day, start, tzinfo=tz).astimezone(timezone.utc).replace(tzinfo=None)
+                close_utc = datetime.combine(day, end, tzinfo=tz).astimezone(timezone.utc).replace(tzinfo=None)
+                windows.append((open_utc, close_utc + _EPS))
+            day += timedelta(days=1)
 
-    ny_start = time(18, 30)
-    ny_end = time(21, 30)
+        merged = []
+        for start, end in sorted(windows):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        return merged
 
-    is_london = london_start <= now_ist <= london_end
-    is_ny = ny_start <= now_ist <= ny_end
+    def _locate(self, dt):
+        day = dt.date()
+        # Without a neighbouring open/close the segment stops at a day boundary and is re-resolved there
+        lo = datetime.combine(day, time())
+        hi = lo + timedelta(days=1)
+        active = False
+        for start, end in self.intervals(day, day):
+            if end <= dt:
+                lo = max(lo, end)
+            elif start <= dt:
+                lo, hi, active = start, end, True
+                break
+            else:
+                hi = min(hi, start)
+                break
+        self._lo, self._hi, self._active = lo, hi, active
 
-    return is_london or is_ny
\ No newline at end of file
+    def is_active(self, dt=None) -> bool:
+        dt = _to_utc_naive(dt)
+        if self._lo is None or not (self._lo <= dt < self._hi):
+            self._locate(dt)
+        return self._active
+
+    def next_transition(self, dt=None):
+        """UTC time of the next session open or close after `dt`."""
+        self.is_active(dt)
+        return self._hi
+
+    def seconds_to_transition(self, dt=None):
+        dt = _to_utc_naive(dt)
+        return (self.next_transition(dt) - dt).total_seconds()
+
+    def mask(self, timestamps):
+        """Boolean array, True where a timestamp falls inside a session."""
+        # The session filter calls `is_active` per tick; only masking a series needs numpy
+        import numpy as np
+        ts = np.asarray([_to_utc_naive(t) for t in timestamps], dtype="datetime64[us]")
+        if len(ts) == 0:
+            return np.zeros(0, dtype=bool)
+        first = ts.min().astype(datetime).date()
+        last = ts.max().astype(datetime).date()
+        intervals = self.intervals(first, last)
+        starts = np.asarray([s for s, _ in intervals], dtype="datetime64[us]")
+        ends = np.asarray([e for _, e in intervals], dtype="datetime64[us]")
+        i = np.searchsorted(starts, ts, side="right") - 1
+        return (i >= 0) & (ts < ends[np.maximum(i, 0)])
+
+SESSIONS = SessionCalendar()
+
+def load_sessions(config):
+    """Applies the configured session hours to the shared calendar."""
+    SESSIONS.configure(config.get('sessions'))
+
+def is_session_active(dt=None) -> bool:
+    """
+    Check if given datetime (or current time) falls within tradeable sessions.
+    Sessions come from the shared `SessionCalendar` (London and New York by default).
+    """
+    return SESSIONS.is_active(dt)